@@ -0,0 +1,93 @@
+"""
+JWT authentication that remembers resolved users between requests.
+
+``JWTAuthentication`` loads the user row on every request. Here the first
+request of a user loads it as usual and caches ``id``, ``username`` and
+``is_active`` (plus the token's revoke claim when ``CHECK_REVOKE_TOKEN`` is
+on); later requests rebuild the user from that entry without a query.
+Other fields are deferred, so code that does read them still gets them
+from the database.
+
+Saving or deleting a user evicts their entry (see ``accounts.signals``),
+which covers deactivation and password changes made through the ORM. The
+cache is per process, so other workers notice such a change within
+``AUTH_USER_CACHE['TIMEOUT']`` seconds. ``QuerySet.update()`` sends no
+signals and is likewise only picked up after the timeout.
+"""
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from healthcare.cache import LocalLRUBackend
+
+CACHED_FIELDS = ('id', 'username', 'is_active')
+
+
+class UserCache:
+    def __init__(self):
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            config = settings.AUTH_USER_CACHE
+            self._backend = LocalLRUBackend(timeout=config['TIMEOUT'], max_entries=config['MAX_ENTRIES'])
+        return self._backend
+
+    @property
+    def enabled(self):
+        return settings.AUTH_USER_CACHE['TIMEOUT'] > 0
+
+    def get(self, user_model, validated_token):
+        """Return the cached user for ``validated_token``, or ``None``."""
+        if not self.enabled:
+            return None
+        entry = self.backend.get(user_key(validated_token))
+        if entry is None:
+            return None
+        values, generation = entry
+        if generation != token_generation(validated_token):
+            return None
+        return user_model.from_db(None, CACHED_FIELDS, values)
+
+    def store(self, user, validated_token):
+        if self.enabled and user.is_active:
+            generation = (
+                get_md5_hash_password(user.password) if api_settings.CHECK_REVOKE_TOKEN else None
+            )
+            values = tuple(getattr(user, name) for name in CACHED_FIELDS)
+            self.backend.set(user_key(validated_token), (values, generation))
+        return user
+
+    def evict(self, user):
+        if self._backend is not None:
+            self._backend.delete(str(getattr(user, api_settings.USER_ID_FIELD)))
+
+    def reset(self):
+        self._backend = None
+
+
+user_cache = UserCache()
+
+
+def user_key(validated_token):
+    try:
+        return str(validated_token[api_settings.USER_ID_CLAIM])
+    except KeyError as e:
+        raise InvalidToken('Token contained no recognizable user identification') from e
+
+
+def token_generation(validated_token):
+    if api_settings.CHECK_REVOKE_TOKEN:
+        return validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+    return None
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user = user_cache.get(self.user_model, validated_token)
+        if user is None:
+            user = user_cache.store(super().get_user(validated_token), validated_token)
+        return user
@@ -0,0 +1,25 @@
+"""
+Password hashers with their cost taken from ``settings.PASSWORD_HASH_COST``.
+
+They keep Django's algorithm names, so existing hashes still verify, and
+Django re-hashes a user's password on their next login whenever the
+configured cost differs from the one stored in their hash.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, BCryptSHA256PasswordHasher, PBKDF2PasswordHasher,
+)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = settings.PASSWORD_HASH_COST['PBKDF2_ITERATIONS']
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    time_cost = settings.PASSWORD_HASH_COST['ARGON2_TIME_COST']
+    memory_cost = settings.PASSWORD_HASH_COST['ARGON2_MEMORY_COST']
+    parallelism = settings.PASSWORD_HASH_COST['ARGON2_PARALLELISM']
+
+
+class TunedBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    rounds = settings.PASSWORD_HASH_COST['BCRYPT_ROUNDS']
@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_duplicates(apps, schema_editor):
+    """
+    Stop before creating the index if registration already let in emails
+    that differ only in case, listing them so they can be merged or fixed.
+    """
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').annotate(email_lower=Lower('email'))
+        .values('email_lower').annotate(users=Count('id')).filter(users__gt=1)
+        .values_list('email_lower', flat=True).order_by('email_lower')
+    )
+    if not duplicates:
+        return
+    lines = []
+    for email in duplicates:
+        users = User.objects.annotate(email_lower=Lower('email')).filter(email_lower=email).order_by('id')
+        lines.append(f"  {email}: " + ', '.join(f'#{user.pk} {user.username} <{user.email}>' for user in users))
+    raise RuntimeError(
+        'Cannot make emails case-insensitively unique: these accounts share an email '
+        'up to case. Change or remove all but one of each, then run migrate again.\n'
+        + '\n'.join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    # auth.User belongs to django.contrib.auth, so the index is created with
+    # SQL rather than Meta.indexes. Blank emails (e.g. superusers created
+    # without one) are left out of the uniqueness check.
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.RunSQL(
+            sql="CREATE UNIQUE INDEX user_email_lower_uniq ON auth_user (LOWER(email)) WHERE email <> ''",
+            reverse_sql='DROP INDEX user_email_lower_uniq',
+        ),
+    ]
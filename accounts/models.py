@@ -0,0 +1,12 @@
+from django.contrib.auth.models import User
+from django.db.models.functions import Lower
+
+
+def users_by_email(email):
+    """Case-insensitive email lookup served by the user_email_lower_uniq index."""
+    # Excluding blank emails matches the partial index predicate.
+    return (
+        User.objects.alias(email_lower=Lower('email'))
+        .filter(email_lower=email.lower())
+        .exclude(email='')
+    )
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 
+from .models import users_by_email
+
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
@@ -10,7 +12,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'password']
 
     def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
+        if users_by_email(value).exists():
             raise serializers.ValidationError("A user with this email already exists.")
         return value
 
@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    # Covers deactivation and password changes; the next request reloads the row.
+    user_cache.evict(instance)
+
+
+@receiver(setting_changed)
+def reset_user_cache(setting, **kwargs):
+    if setting == 'AUTH_USER_CACHE':
+        user_cache.reset()
@@ -0,0 +1,138 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from healthcare.testing import make_user
+
+from . import authentication
+from .authentication import user_cache
+from .throttles import LoginEmailThrottle, LoginIPThrottle, TokenBucketThrottle
+
+
+class BucketThrottle(TokenBucketThrottle):
+    scope = 'test'
+    rate = '3/min'
+
+    def get_cache_key(self, request, view):
+        return 'test_bucket'
+
+
+def login_request(email=None, ip='10.0.0.1'):
+    body = {} if email is None else {'email': email, 'password': 'x'}
+    request = APIRequestFactory().post('/api/auth/login/', body, format='json', REMOTE_ADDR=ip)
+    return Request(request, parsers=[JSONParser()])
+
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 1000.0
+
+    def attempt(self):
+        # A new throttle per request, as DRF creates them
+        throttle = BucketThrottle()
+        throttle.timer = lambda: self.now
+        return throttle.allow_request(None, None), throttle
+
+    def test_burst_then_refill(self):
+        self.assertEqual([self.attempt()[0] for _ in range(4)], [True, True, True, False])
+        self.assertAlmostEqual(self.attempt()[1].wait(), 20)
+
+        self.now += 20  # one token back at 3 per minute
+        self.assertEqual([self.attempt()[0] for _ in range(2)], [True, False])
+
+    def test_idle_bucket_holds_at_most_the_burst(self):
+        self.attempt()
+        self.now += 3600
+        self.assertEqual([self.attempt()[0] for _ in range(4)], [True, True, True, False])
+
+
+class LoginThrottleKeyTests(SimpleTestCase):
+    def key(self, throttle_class, request):
+        return throttle_class().get_cache_key(request, None)
+
+    def test_ip_key(self):
+        self.assertEqual(self.key(LoginIPThrottle, login_request(ip='10.0.0.1')),
+                         self.key(LoginIPThrottle, login_request('other@example.com', ip='10.0.0.1')))
+        self.assertNotEqual(self.key(LoginIPThrottle, login_request(ip='10.0.0.1')),
+                            self.key(LoginIPThrottle, login_request(ip='10.0.0.2')))
+
+    def test_email_key_ignores_case_address_and_whitespace(self):
+        key = self.key(LoginEmailThrottle, login_request('ann@example.com', ip='10.0.0.1'))
+        self.assertEqual(self.key(LoginEmailThrottle, login_request(' Ann@Example.COM ', ip='10.0.0.2')), key)
+        self.assertNotEqual(self.key(LoginEmailThrottle, login_request('bob@example.com')), key)
+        self.assertNotIn('ann', key)
+
+    def test_no_email_is_not_throttled_by_email(self):
+        self.assertIsNone(self.key(LoginEmailThrottle, login_request()))
+        self.assertIsNone(self.key(LoginEmailThrottle, login_request('  ')))
+
+
+class LoginThrottleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        make_user('ann')
+
+    def test_too_many_attempts_for_one_email(self):
+        body = {'email': 'ann@example.com', 'password': 'wrong'}
+        for i in range(5):
+            response = self.client.post('/api/auth/login/', body, format='json', REMOTE_ADDR=f'10.0.0.{i}')
+            self.assertEqual(response.status_code, 401)
+
+        response = self.client.post('/api/auth/login/', {**body, 'email': 'ANN@example.com'},
+                                    format='json', REMOTE_ADDR='10.0.0.9')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        # Other accounts are unaffected
+        response = self.client.post('/api/auth/login/', {'email': 'bob@example.com', 'password': 'x'},
+                                    format='json', REMOTE_ADDR='10.0.0.9')
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(AUTH_USER_CACHE={'TIMEOUT': 60, 'MAX_ENTRIES': 100})
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def user_queries(self):
+        """Status of ``GET /api/patients/`` and the ``auth_user`` queries it ran."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/patients/')
+        return response.status_code, sum('FROM "auth_user"' in query['sql'] for query in queries)
+
+    def test_cached_user_costs_no_query(self):
+        self.assertEqual(self.user_queries(), (200, 1))
+        self.assertEqual(self.user_queries(), (200, 0))
+        self.assertEqual(self.user_queries(), (200, 0))
+
+    def test_deactivated_user_is_evicted(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.user_queries(), (401, 1))
+
+    def test_deleted_user_is_rejected(self):
+        self.user_queries()
+        self.user.delete()
+        self.assertEqual(self.user_queries(), (401, 1))
+
+    def test_password_change_revokes_tokens(self):
+        # simplejwt's modules keep the api_settings they imported, so
+        # overriding SIMPLE_JWT would not reach them
+        with mock.patch.object(authentication.api_settings, 'CHECK_REVOKE_TOKEN', True):
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+            self.assertEqual(self.user_queries(), (200, 1))
+            self.assertEqual(self.user_queries(), (200, 0))
+
+            self.user.set_password('Changed@1234')
+            self.user.save()
+            self.assertIsNone(user_cache.backend.get(str(self.user.pk)))
+            self.assertEqual(self.user_queries(), (401, 1))
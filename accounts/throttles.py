@@ -0,0 +1,57 @@
+import hashlib
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket over the Django cache, configured like DRF's rate throttles.
+
+    A rate of ``'5/min'`` gives each key a bucket of 5 tokens that refills
+    at 5 per minute: a burst of 5 attempts is allowed, after which requests
+    are rejected until tokens come back. Only a ``(tokens, timestamp)`` pair
+    is stored per key. Like ``SimpleRateThrottle`` the read-modify-write is
+    not atomic, so concurrent requests can slip a token or two past the
+    limit; use a shared cache (CACHES) so the limit holds across workers.
+    """
+    cache_format = 'throttle_bucket_%(scope)s_%(ident)s'
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        refill = self.num_requests / self.duration
+        tokens, stamp = self.cache.get(self.key, (self.num_requests, now))
+        self.tokens = min(self.num_requests, tokens + (now - stamp) * refill)
+        allowed = self.tokens >= 1
+        if allowed:
+            self.tokens -= 1
+        self.cache.set(self.key, (self.tokens, now), self.duration)
+        return allowed
+
+    def wait(self):
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginEmailThrottle(TokenBucketThrottle):
+    """Limits attempts per account, however many addresses they come from."""
+    scope = 'login_email'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        ident = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
@@ -6,7 +6,9 @@ from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .models import users_by_email
 from .serializers import RegisterSerializer, LoginSerializer
+from .throttles import LoginEmailThrottle, LoginIPThrottle
 
 
 class RegisterView(APIView):
@@ -29,6 +31,8 @@ class RegisterView(APIView):
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
+    # Rejects floods before they reach the (deliberately slow) password hasher
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
 
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -37,7 +41,7 @@ class LoginView(APIView):
             password = serializer.validated_data['password']
 
             try:
-                user_obj = User.objects.get(email=email)
+                user_obj = users_by_email(email).get()
             except User.DoesNotExist:
                 return Response(
                     {'error': 'Invalid email or password.'},
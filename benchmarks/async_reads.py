@@ -0,0 +1,96 @@
+"""
+Compare throughput and tail latency of the sync (WSGI) and async (ASGI)
+read endpoints.
+
+Start the same project under both servers against the same seeded
+database, then point the benchmark at both:
+
+    pip install -r benchmarks/requirements.txt
+    gunicorn healthcare.wsgi -w 4 -b 127.0.0.1:8000
+    uvicorn healthcare.asgi:application --workers 4 --port 8001
+
+    python benchmarks/async_reads.py \\
+        --email load_user_0@healthcare.com --password Load@1234 \\
+        --target wsgi=http://127.0.0.1:8000/api/patients/ \\
+        --target asgi=http://127.0.0.1:8001/api/async/patients/ \\
+        --concurrency 500 --requests 20000
+
+Each target gets ``--requests`` GETs issued by ``--concurrency`` clients;
+``--delay`` makes every client pause between requests, which is how slow
+or idle clients hold connections open.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urljoin
+
+import httpx
+
+
+async def login(base_url, email, password):
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            urljoin(base_url, '/api/auth/login/'), json={'email': email, 'password': password}
+        )
+        response.raise_for_status()
+        return response.json()['tokens']['access']
+
+
+async def run_target(url, token, total, concurrency, delay):
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(headers={'Authorization': f'Bearer {token}'}, limits=limits,
+                                 timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+                if delay:
+                    await asyncio.sleep(delay)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p99': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'errors': errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', action='append', required=True, metavar='NAME=URL')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds each client waits between requests.')
+    args = parser.parse_args()
+
+    targets = [target.split('=', 1) for target in args.target]
+    token = await login(targets[0][1], args.email, args.password)
+
+    print(f'{"target":<10} {"req/s":>10} {"p50 ms":>10} {"p99 ms":>10} {"errors":>8}')
+    for name, url in targets:
+        result = await run_target(url, token, args.requests, args.concurrency, args.delay)
+        print(f'{name:<10} {result["rps"]:>10.1f} {result["p50"]:>10.1f} {result["p99"]:>10.1f} '
+              f'{result["errors"]:>8}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
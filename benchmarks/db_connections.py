@@ -0,0 +1,89 @@
+"""
+Requests per second with a new PostgreSQL connection per request,
+persistent connections and a psycopg 3 connection pool.
+
+For each mode the benchmark starts gunicorn with the matching environment
+(DB_CONN_MAX_AGE, DB_POOL), then sends GET requests to a light endpoint, so
+connection setup is a large share of each request:
+
+    pip install -r benchmarks/requirements.txt
+    python manage.py seed_data --patients 10000
+    SECRET_KEY=x python benchmarks/db_connections.py --requests 5000 --concurrency 50
+
+The pool mode is skipped unless psycopg_pool is installed.
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from async_reads import login, run_target
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODES = {
+    'reconnect': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'False'},
+    'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_POOL': 'False'},
+    'pool': {'DB_POOL': 'True'},
+}
+
+
+def start_server(mode, port, workers, threads):
+    env = {**os.environ, **MODES[mode]}
+    server = subprocess.Popen(
+        ['gunicorn', 'healthcare.wsgi', '-w', str(workers), '--threads', str(threads),
+         '-b', f'127.0.0.1:{port}', '--log-level', 'warning'],
+        cwd=ROOT, env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f'http://127.0.0.1:{port}/api/auth/login/', timeout=1)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.terminate()
+    sys.exit(f'gunicorn did not start for mode {mode}.')
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--email', default='load_user_0@healthcare.com')
+    parser.add_argument('--password', default='Load@1234')
+    parser.add_argument('--path', default='/api/patients/?page_size=1')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8100)
+    args = parser.parse_args()
+
+    modes = list(MODES)
+    if importlib.util.find_spec('psycopg_pool') is None:
+        modes.remove('pool')
+
+    print(f'{"mode":<12} {"req/s":>10} {"p50 ms":>10} {"p99 ms":>10} {"errors":>8}')
+    token = None
+    for mode in modes:
+        server = start_server(mode, args.port, args.workers, args.threads)
+        try:
+            base_url = f'http://127.0.0.1:{args.port}'
+            token = token or await login(base_url, args.email, args.password)
+            url = base_url + args.path
+            await run_target(url, token, min(args.requests, 500), args.concurrency, 0)  # warm up
+            result = await run_target(url, token, args.requests, args.concurrency, 0)
+        finally:
+            server.terminate()
+            server.wait()
+        print(f'{mode:<12} {result["rps"]:>10.1f} {result["p50"]:>10.1f} {result["p99"]:>10.1f} '
+              f'{result["errors"]:>8}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
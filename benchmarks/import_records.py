@@ -0,0 +1,91 @@
+"""
+Records per second for each stage of ``manage.py import_records``.
+
+Writes ``--rows`` synthetic patients to a temporary CSV and NDJSON file,
+then times reading and batch validation, which need no database. With
+``--write`` it also runs the whole command against the configured database
+(``--copy`` to load with COPY), owned by the first load-test user from
+``seed_data``:
+
+    SECRET_KEY=x python benchmarks/import_records.py --rows 200000 --write --copy
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'healthcare.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+
+from healthcare.importer import BatchValidator, read_records  # noqa: E402
+from patients.management.commands.seed_data import Command as SeedCommand  # noqa: E402
+from patients.serializers import PatientSerializer  # noqa: E402
+
+COLUMNS = ['name', 'age', 'gender', 'phone', 'address', 'medical_history']
+
+
+def write_files(directory, rows):
+    rng = random.Random(0)
+    fake = SeedCommand()
+    paths = {'csv': directory / 'patients.csv', 'ndjson': directory / 'patients.ndjson'}
+    with open(paths['csv'], 'w', newline='') as csv_file, open(paths['ndjson'], 'w') as ndjson_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(COLUMNS)
+        for _ in range(rows):
+            record = fake.fake_patient(rng, [None])
+            writer.writerow([record[name] for name in COLUMNS])
+            ndjson_file.write(json.dumps({name: record[name] for name in COLUMNS}) + '\n')
+    return paths
+
+
+def per_second(rows, started):
+    return rows / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--write', action='store_true', help='Also import into the database.')
+    parser.add_argument('--copy', action='store_true', help='Import with COPY (PostgreSQL).')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(Path(directory), args.rows)
+        print(f'{"stage":<24} {"records/s":>12}')
+        for file_format, path in paths.items():
+            started = time.perf_counter()
+            records = [record for _, record, _, _ in read_records(path, file_format)]
+            print(f'{"read " + file_format:<24} {per_second(len(records), started):>12,.0f}')
+
+            validator = BatchValidator(PatientSerializer, blank_is_null=file_format == 'csv')
+            started = time.perf_counter()
+            for offset in range(0, len(records), args.batch_size):
+                validator.validate(records[offset:offset + args.batch_size])
+            print(f'{"validate " + file_format:<24} {per_second(len(records), started):>12,.0f}')
+
+        if args.write:
+            owner = User.objects.filter(username__startswith='load_user_').order_by('id').first()
+            if owner is None:
+                sys.exit('Run manage.py seed_data --patients 1 first to create the load-test users.')
+            started = time.perf_counter()
+            call_command('import_records', 'patients', str(paths['csv']), owner=owner.username,
+                         batch_size=args.batch_size, copy=args.copy, stdout=open(os.devnull, 'w'))
+            label = 'import csv (copy)' if args.copy else 'import csv (bulk_create)'
+            print(f'{label:<24} {per_second(args.rows, started):>12,.0f}')
+
+
+if __name__ == '__main__':
+    main()
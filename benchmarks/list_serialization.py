@@ -0,0 +1,99 @@
+"""
+Time DRF serializers against the ``values()`` fast path for list pages.
+
+Builds ``--rows`` in-memory rows per endpoint (no database needed), renders
+them both ways, checks that the bytes are identical and prints the time
+each path spends turning rows into a JSON body:
+
+    SECRET_KEY=x python benchmarks/list_serialization.py --rows 10000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'healthcare.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from doctors.models import Doctor  # noqa: E402
+from doctors.serializers import DoctorSerializer, doctor_values  # noqa: E402
+from healthcare.renderers import FastJSONRenderer  # noqa: E402
+from mappings.models import PatientDoctorMapping  # noqa: E402
+from mappings.serializers import MappingDetailSerializer, mapping_values  # noqa: E402
+from patients.models import Patient  # noqa: E402
+from patients.serializers import PatientSerializer, patient_values  # noqa: E402
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def fake_patient(i):
+    stamp = START + timedelta(seconds=i, microseconds=i)
+    return Patient(id=i, name=f'Patient {i}', age=i % 90, gender='Female', phone=f'555{i:07d}',
+                   address=f'{i} Main Street', medical_history=None, created_at=stamp, updated_at=stamp)
+
+
+def fake_doctor(i):
+    stamp = START + timedelta(seconds=i)
+    return Doctor(id=i, name=f'Doctor {i}', specialization='Cardiology', phone=None,
+                  email=f'doctor{i}@example.com', experience_years=i % 40, created_at=stamp, updated_at=stamp)
+
+
+def fake_mapping(i):
+    return PatientDoctorMapping(id=i, patient=fake_patient(i), doctor=fake_doctor(i),
+                                assigned_at=START + timedelta(minutes=i))
+
+
+def as_row(instance, columns):
+    """The dict ``queryset.values(*columns)`` would return for ``instance``."""
+    row = {}
+    for column in columns:
+        *path, name = column.split('__')
+        obj = instance
+        for step in path:
+            obj = getattr(obj, step)
+        row[column] = getattr(obj, obj._meta.get_field(name).attname)
+    return row
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        ('patients', fake_patient, PatientSerializer, patient_values),
+        ('doctors', fake_doctor, DoctorSerializer, doctor_values),
+        ('mappings', fake_mapping, MappingDetailSerializer, mapping_values),
+    ]
+    print(f'{"list":<10} {"DRF ms":>10} {"fast ms":>10} {"speedup":>8}  identical')
+    for name, factory, serializer_class, values in cases:
+        instances = [factory(i) for i in range(1, args.rows + 1)]
+        rows = [as_row(instance, values.columns) for instance in instances]
+
+        slow, expected = timed(
+            lambda: JSONRenderer().render(serializer_class(instances, many=True).data), args.repeat)
+        fast, body = timed(
+            lambda: FastJSONRenderer().render(values.to_representation(rows)), args.repeat)
+        print(f'{name:<10} {slow * 1000:>10.1f} {fast * 1000:>10.1f} {slow / fast:>7.1f}x  {body == expected}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Logins per second per core for each password hasher, and the cost of a
+login attempt the throttle rejects.
+
+A login is dominated by one password check, so each hasher is timed with
+its cost read from the usual settings (PBKDF2_ITERATIONS, ARGON2_*,
+BCRYPT_ROUNDS). The throttled case posts to LoginView with an exhausted
+bucket, which never reaches the database or the hasher:
+
+    SECRET_KEY=x python benchmarks/login_throughput.py --seconds 5
+
+Run one copy per core to see the whole machine's capacity.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'healthcare.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.utils.module_loading import import_string  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from accounts.throttles import LoginEmailThrottle  # noqa: E402
+from accounts.views import LoginView  # noqa: E402
+
+PASSWORD = 'Load@1234'
+
+
+def rate(fn, seconds):
+    count = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        fn()
+        count += 1
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f'{"case":<32} {"per second":>12}')
+    for name, path in settings.PASSWORD_HASHER_CLASSES.items():
+        hasher = import_string(path)()
+        try:
+            encoded = hasher.encode(PASSWORD, hasher.salt())
+        except ValueError as exc:
+            print(f'{name:<32} {"skipped":>12}  ({exc})')
+            continue
+        per_second = rate(lambda: hasher.verify(PASSWORD, encoded), args.seconds)
+        print(f'{name + " password check":<32} {per_second:>12.1f}')
+
+    factory = APIRequestFactory()
+    view = LoginView.as_view()
+    body = {'email': 'attacker-target@example.com', 'password': 'guess'}
+    # A bucket so far in debt that it stays empty for the whole run
+    throttle = LoginEmailThrottle()
+    key = throttle.get_cache_key(SimpleNamespace(data=body), view)
+    throttle.cache.set(key, (-1e9, throttle.timer()), throttle.duration)
+    per_second = rate(lambda: view(factory.post('/api/auth/login/', body, format='json')), args.seconds)
+    print(f'{"throttled attempt (429)":<32} {per_second:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Per-user patient list latency on the flat and the hash-partitioned
+patients table (PostgreSQL).
+
+Seed the database, partition it keeping the flat table, then run the
+first-page query of GET /api/patients/ for random load-test users against
+both tables:
+
+    python manage.py seed_data --patients 100000000 --users 1000 --copy
+    python manage.py partition_patients --partitions 64 --keep-old
+    SECRET_KEY=x python benchmarks/patient_partitioning.py --queries 5000
+
+Without ``patients_patient_unpartitioned`` only the current table is
+timed. The output also shows how many partitions the plan touches, which
+should be one.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'healthcare.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from healthcare.pagination import KeysetPagination  # noqa: E402
+from patients.models import Patient  # noqa: E402
+from patients.serializers import patient_values  # noqa: E402
+
+
+def list_sql(page_size):
+    """The list query's SQL, its parameters and the position of the owner among them."""
+    queryset = patient_values.values(Patient.objects.filter(created_by_id=-1))
+    queryset = queryset.order_by(*KeysetPagination.ordering)[:page_size]
+    sql, params = queryset.query.sql_with_params()
+    return sql, list(params), list(params).index(-1)
+
+
+def with_owner(params, position, owner):
+    params = list(params)
+    params[position] = owner
+    return params
+
+
+def run(cursor, sql, params, position, owners, queries):
+    latencies = []
+    for _ in range(queries):
+        params = with_owner(params, position, random.choice(owners))
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def scanned_relations(cursor, sql, params):
+    cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+    plan = cursor.fetchone()[0]
+    plan = plan[0]['Plan'] if isinstance(plan, list) else plan
+    relations, stack = set(), [plan]
+    while stack:
+        node = stack.pop()
+        if 'Relation Name' in node:
+            relations.add(node['Relation Name'])
+        stack.extend(node.get('Plans', []))
+    return len(relations)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args()
+    if connection.vendor != 'postgresql':
+        sys.exit('This benchmark needs the PostgreSQL backend.')
+
+    owners = list(User.objects.filter(username__startswith='load_user_').values_list('pk', flat=True))
+    if not owners:
+        sys.exit('Run manage.py seed_data first to create the load-test users.')
+    sql, params, position = list_sql(args.page_size + 1)
+    table = connection.ops.quote_name(Patient._meta.db_table)
+    flat = connection.ops.quote_name(f'{Patient._meta.db_table}_unpartitioned')
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [flat.strip('"')])
+        targets = {'current': sql}
+        if cursor.fetchone()[0]:
+            targets['flat'] = sql.replace(table, flat)
+
+        print(f'{"table":<10} {"p50 ms":>9} {"p99 ms":>9} {"relations":>10}')
+        for label, target in targets.items():
+            run(cursor, target, params, position, owners, min(args.queries, 200))  # warm the cache
+            p50, p99 = run(cursor, target, params, position, owners, args.queries)
+            relations = scanned_relations(cursor, target, with_owner(params, position, owners[0]))
+            print(f'{label:<10} {p50:>9.2f} {p99:>9.2f} {relations:>10}')
+
+
+if __name__ == '__main__':
+    main()
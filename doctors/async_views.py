@@ -0,0 +1,40 @@
+from django.shortcuts import aget_object_or_404
+from rest_framework.request import Request
+
+from healthcare.async_api import async_api_view, render_json
+from healthcare.conditional import acollection_etag, check_preconditions, object_etag
+from healthcare.pagination import KeysetPagination, RankedPagination
+from healthcare.search import search_queryset
+from .models import Doctor
+from .serializers import doctor_values
+from .views import DoctorListCreateView
+
+
+@async_api_view
+async def doctor_list(request):
+    values = doctor_values.project(request)
+    doctors = Doctor.objects.all()
+    etag = await acollection_etag(request, doctors, 'updated_at')
+    response = check_preconditions(request, etag)
+    if response is not None:
+        return response
+
+    paginator = KeysetPagination()
+    q = request.GET.get('q', '').strip()
+    if q:
+        doctors = search_queryset(doctors, q, DoctorListCreateView.search_fields)
+        paginator = RankedPagination()
+    page = await paginator.apaginate_queryset(values.values(doctors, *paginator.ordering), Request(request))
+    data = paginator.get_paginated_response(values.to_representation(page)).data
+    return render_json(data, headers={'ETag': etag})
+
+
+@async_api_view
+async def doctor_detail(request, pk):
+    values = doctor_values.project(request)
+    doctor = await aget_object_or_404(Doctor.objects.only('updated_at', *values.columns), pk=pk)
+    etag = object_etag(doctor, values.projection)
+    response = check_preconditions(request, etag)
+    if response is not None:
+        return response
+    return render_json(values.serializer(doctor).data, headers={'ETag': etag})
@@ -0,0 +1,137 @@
+"""
+Cache for doctor directory reads.
+
+Doctor list pages and detail payloads are stored as rendered JSON bytes
+together with their ETag, so a hit skips the database, the serializer and
+the renderer. Entries are dropped whenever any doctor is written (see
+``doctors.signals``).
+
+The storage backend is chosen with ``settings.DOCTOR_CACHE['BACKEND']``:
+
+* ``LocalLRUBackend`` (default) - bounded in-process LRU with a TTL. Each
+  worker process has its own copy, so the TTL bounds how stale another
+  worker can be after a write.
+* ``DjangoCacheBackend`` - any Django cache (e.g. Redis), shared by all
+  workers, invalidated by bumping a generation number.
+
+List bodies are shared by every host the API is reached through, so their
+``next`` link is stored as a path and made absolute again for each hit.
+"""
+import json
+import threading
+from urllib.parse import urlsplit, urlunsplit
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+
+from healthcare.cache import LocalLRUBackend  # noqa: F401 (DOCTOR_CACHE['BACKEND'] path)
+from healthcare.conditional import check_preconditions
+from healthcare.renderers import FastJSONRenderer
+
+
+# Stands in for the next link in stored bodies
+NEXT_LINK = 'doctors:directory:next'
+NEXT_LINK_JSON = json.dumps(NEXT_LINK).encode()
+
+
+class DjangoCacheBackend:
+    # Renamed whenever the entry layout changes, so a deploy never reads
+    # entries stored by the previous release
+    generation_key = 'doctors:directory:generation:2'
+
+    def __init__(self, timeout, cache_alias='default', **options):
+        self.timeout = timeout
+        self.cache = caches[cache_alias]
+
+    def get(self, key):
+        return self.cache.get(f'doctors:directory:{key}', version=self._generation())
+
+    def set(self, key, value):
+        self.cache.set(f'doctors:directory:{key}', value, self.timeout, version=self._generation())
+
+    def clear(self):
+        self.cache.set(self.generation_key, uuid4().hex, None)
+
+    def _generation(self):
+        return self.cache.get_or_set(self.generation_key, uuid4().hex, None)
+
+
+class DirectoryCache:
+    def __init__(self):
+        self._backend = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            config = settings.DOCTOR_CACHE
+            backend_class = import_string(config['BACKEND'])
+            self._backend = backend_class(
+                timeout=config['TIMEOUT'],
+                max_entries=config['MAX_ENTRIES'],
+                cache_alias=config['CACHE_ALIAS'],
+            )
+        return self._backend
+
+    @property
+    def enabled(self):
+        return settings.DOCTOR_CACHE['TIMEOUT'] > 0
+
+    def respond(self, request, key):
+        """Return a response from the cache, or ``None`` on a miss."""
+        if not self.enabled or request.accepted_renderer.format != 'json':
+            return None
+        entry = self.backend.get(key)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is None:
+            return None
+        body, etag, next_path = entry
+        response = check_preconditions(request, etag)
+        if response is None:
+            if next_path is not None:
+                next_link = json.dumps(request.build_absolute_uri(next_path)).encode()
+                body = body.replace(NEXT_LINK_JSON, next_link, 1)
+            response = HttpResponse(body, content_type='application/json', headers={'ETag': etag})
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def store(self, request, key, response):
+        if self.enabled and request.accepted_renderer.format == 'json':
+            data, next_path = response.data, None
+            if isinstance(data, dict) and data.get('next'):
+                next_path = urlunsplit(urlsplit(data['next'])._replace(scheme='', netloc=''))
+                data = {**data, 'next': NEXT_LINK}
+            body = FastJSONRenderer().render(data)
+            self.backend.set(key, (body, response['ETag'], next_path))
+            response['X-Cache'] = 'MISS'
+        return response
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+    def reset(self):
+        with self.lock:
+            self._backend = None
+            self.hits = 0
+            self.misses = 0
+
+
+directory_cache = DirectoryCache()
+
+
+@receiver(setting_changed)
+def reset_directory_cache(setting, **kwargs):
+    if setting == 'DOCTOR_CACHE':
+        directory_cache.reset()
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:13
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+from healthcare.operations import PostgresOnly
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0003_search'),
+        ('doctors', '0002_doctor_doctor_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        PostgresOnly(migrations.AddIndex(
+            model_name='doctor',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='doctor_search_idx'),
+        )),
+        PostgresOnly(migrations.AddIndex(
+            model_name='doctor',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='doctor_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        )),
+        PostgresOnly(migrations.AddIndex(
+            model_name='doctor',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['specialization'], name='doctor_specialization_trgm_idx', opclasses=['gin_trgm_ops']),
+        )),
+        PostgresOnly(migrations.RunSQL(
+            sql=[
+                """
+                CREATE TRIGGER doctor_search_vector_trigger
+                BEFORE INSERT OR UPDATE OF name, specialization ON doctors_doctor
+                FOR EACH ROW EXECUTE FUNCTION
+                tsvector_update_trigger(search_vector, 'pg_catalog.simple', name, specialization)
+                """,
+                "UPDATE doctors_doctor SET search_vector = to_tsvector('pg_catalog.simple', coalesce(name, '') || ' ' || coalesce(specialization, ''))",
+            ],
+            reverse_sql="DROP TRIGGER IF EXISTS doctor_search_vector_trigger ON doctors_doctor",
+        )),
+    ]
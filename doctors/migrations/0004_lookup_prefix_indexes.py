@@ -0,0 +1,27 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:17
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+from healthcare.operations import PostgresOnly
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0003_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        PostgresOnly(migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('name'), name='text_pattern_ops'), name='doctor_name_prefix_idx'),
+        )),
+        PostgresOnly(migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('specialization'), name='text_pattern_ops'), name='doctor_spec_prefix_idx'),
+        )),
+    ]
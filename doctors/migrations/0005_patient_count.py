@@ -0,0 +1,20 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:36
+
+from django.db import migrations, models
+
+from healthcare.operations import AddFieldInPlace
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0004_lookup_prefix_indexes'),
+    ]
+
+    operations = [
+        AddFieldInPlace(
+            model_name='doctor',
+            name='patient_count',
+            field=models.PositiveIntegerField(db_default=0, default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:40
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+from healthcare.operations import PostgresOnly
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0005_patient_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['created_at', 'id'], name='doctor_live_created_idx'),
+        ),
+        PostgresOnly(migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('name'), name='text_pattern_ops'), condition=models.Q(('deleted_at__isnull', True)), name='doctor_live_name_prefix_idx'),
+        )),
+        PostgresOnly(migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('specialization'), name='text_pattern_ops'), condition=models.Q(('deleted_at__isnull', True)), name='doctor_live_spec_prefix_idx'),
+        )),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='doctor_deleted_idx'),
+        ),
+        # Drop the old indexes once their partial replacements exist.
+        migrations.RemoveIndex(
+            model_name='doctor',
+            name='doctor_created_idx',
+        ),
+        PostgresOnly(migrations.RemoveIndex(
+            model_name='doctor',
+            name='doctor_name_prefix_idx',
+        )),
+        PostgresOnly(migrations.RemoveIndex(
+            model_name='doctor',
+            name='doctor_spec_prefix_idx',
+        )),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+from healthcare.operations import AddFieldInPlace, PostgresOnly
+
+# The writing transaction's id. Unlike a sequence value it tells /api/sync/
+# which rows may still be uncommitted: every transaction older than the
+# snapshot's xmin has finished.
+CHANGE_SEQ_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0006_soft_delete'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddFieldInPlace(
+            model_name='doctor',
+            name='change_seq',
+            field=models.BigIntegerField(db_default=0, default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(fields=['change_seq', 'id'], name='doctor_sync_idx'),
+        ),
+        # Updates that leave updated_at alone, like the patient_count
+        # triggers', do not change what the API shows.
+        PostgresOnly(migrations.RunSQL(
+            sql=[
+                CHANGE_SEQ_FUNCTION,
+                """
+                CREATE TRIGGER doctor_change_seq_insert BEFORE INSERT ON doctors_doctor
+                FOR EACH ROW EXECUTE FUNCTION record_change_seq()
+                """,
+                """
+                CREATE TRIGGER doctor_change_seq_update BEFORE UPDATE ON doctors_doctor
+                FOR EACH ROW WHEN (OLD.updated_at IS DISTINCT FROM NEW.updated_at
+                                   OR OLD.deleted_at IS DISTINCT FROM NEW.deleted_at)
+                EXECUTE FUNCTION record_change_seq()
+                """,
+            ],
+            reverse_sql=[
+                "DROP TRIGGER IF EXISTS doctor_change_seq_insert ON doctors_doctor",
+                "DROP TRIGGER IF EXISTS doctor_change_seq_update ON doctors_doctor",
+                "DROP FUNCTION IF EXISTS record_change_seq()",
+            ],
+        )),
+    ]
@@ -1,5 +1,11 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
+from django.db.models.functions import Lower
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+
+from healthcare.softdelete import SoftDeleteManager
 
 
 class Doctor(models.Model):
@@ -11,6 +17,36 @@ class Doctor(models.Model):
     experience_years = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger from name and specialization (PostgreSQL only)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Assigned patients, maintained by database triggers on mappings (PostgreSQL only)
+    patient_count = models.PositiveIntegerField(default=0, db_default=0, editable=False)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Id of the last transaction that wrote the row, for /api/sync/ (PostgreSQL only)
+    change_seq = models.BigIntegerField(default=0, db_default=0, editable=False)
+
+    objects = SoftDeleteManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        # Queries go through ``objects``, so the btree indexes skip deleted rows.
+        indexes = [
+            models.Index(fields=['created_at', 'id'], condition=Q(deleted_at__isnull=True), name='doctor_live_created_idx'),
+            GinIndex(fields=['search_vector'], name='doctor_search_idx'),
+            GinIndex(fields=['name'], name='doctor_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['specialization'], name='doctor_specialization_trgm_idx', opclasses=['gin_trgm_ops']),
+            models.Index(
+                OpClass(Lower('name'), name='text_pattern_ops'),
+                condition=Q(deleted_at__isnull=True), name='doctor_live_name_prefix_idx',
+            ),
+            models.Index(
+                OpClass(Lower('specialization'), name='text_pattern_ops'),
+                condition=Q(deleted_at__isnull=True), name='doctor_live_spec_prefix_idx',
+            ),
+            models.Index(fields=['deleted_at'], condition=Q(deleted_at__isnull=False), name='doctor_deleted_idx'),
+            # Deleted rows included: they are the tombstones /api/sync/ reports
+            models.Index(fields=['change_seq', 'id'], name='doctor_sync_idx'),
+        ]
 
     def __str__(self):
         return f"Dr. {self.name} ({self.specialization})"
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from healthcare.serializers import ValuesSerializer
 from .models import Doctor
 
 
@@ -8,3 +10,6 @@ class DoctorSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'specialization', 'phone', 'email',
                   'experience_years', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+doctor_values = ValuesSerializer(DoctorSerializer)
@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from healthcare.signals import bulk_write
+
+from .cache import directory_cache
+from .models import Doctor
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+@receiver(bulk_write, sender=Doctor)
+def invalidate_directory_cache(sender, **kwargs):
+    # Wait for commit so a concurrent read cannot re-cache the old rows.
+    transaction.on_commit(directory_cache.clear)
@@ -0,0 +1,192 @@
+import json
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from healthcare.signals import bulk_write
+from healthcare.testing import AuthenticatedTestCase, QueryCountTestCase, assign, make_doctors, make_patients
+from mappings.models import PatientDoctorMapping
+
+from .cache import directory_cache
+from .models import Doctor
+
+NO_DIRECTORY_CACHE = {
+    'BACKEND': 'doctors.cache.LocalLRUBackend', 'TIMEOUT': 0, 'MAX_ENTRIES': 0, 'CACHE_ALIAS': 'default',
+}
+
+
+@override_settings(DOCTOR_CACHE=NO_DIRECTORY_CACHE)
+class DoctorListQueryCountTests(QueryCountTestCase):
+    def add_doctors(self, count):
+        make_doctors(self.user, count, start=Doctor.objects.count())
+
+    def test_list(self):
+        response = self.assertConstantQueries('/api/doctors/?page_size=100', self.add_doctors)
+        self.assertEqual(len(response.data['results']), 50)
+
+    def test_caseload(self):
+        def add_doctors(count):
+            assign(make_patients(self.user, 2), make_doctors(self.user, count, start=Doctor.objects.count()))
+
+        response = self.assertConstantQueries('/api/doctors/caseload/', add_doctors)
+        self.assertEqual(len(response.data), 50)
+
+    def test_lookup(self):
+        self.assertConstantQueries('/api/doctors/lookup/?q=Doctor', self.add_doctors)
+
+
+class DoctorCaseloadTests(AuthenticatedTestCase):
+    """Assigned patient counts as writes go through the API."""
+
+    def setUp(self):
+        super().setUp()
+        self.doctors = make_doctors(self.user, 2)
+        self.patients = make_patients(self.user, 3)
+
+    def caseload(self):
+        response = self.client.get('/api/doctors/caseload/')
+        self.assertEqual(response.status_code, 200)
+        return [doctor['patient_count'] for doctor in response.data]
+
+    def assign(self, patient, doctor):
+        response = self.client.post('/api/mappings/', {'patient': patient.pk, 'doctor': doctor.pk}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def test_assign_and_unassign(self):
+        self.assertEqual(self.caseload(), [0, 0])
+        first = self.assign(self.patients[0], self.doctors[0])
+        self.assign(self.patients[1], self.doctors[0])
+        self.assign(self.patients[1], self.doctors[1])
+        self.assertEqual(self.caseload(), [2, 1])
+
+        self.client.delete(f'/api/mappings/{first}/')
+        self.assertEqual(self.caseload(), [1, 1])
+
+    @override_settings(SOFT_DELETE=True)
+    def test_soft_deleted_patient_leaves_caseload(self):
+        for patient in self.patients:
+            self.assign(patient, self.doctors[0])
+        self.client.delete(f'/api/patients/{self.patients[0].pk}/')
+        self.assertEqual(self.caseload(), [2, 0])
+
+        response = self.client.delete('/api/patients/bulk/', [self.patients[1].pk], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.caseload(), [1, 0])
+
+    @override_settings(SOFT_DELETE=False)
+    def test_deleted_patient_leaves_caseload(self):
+        for patient in self.patients:
+            self.assign(patient, self.doctors[0])
+        self.client.delete(f'/api/patients/{self.patients[0].pk}/')
+        self.assertEqual(self.caseload(), [2, 0])
+
+    def test_specialization_filter(self):
+        self.assign(self.patients[0], self.doctors[0])
+        response = self.client.get('/api/doctors/caseload/?specialization=cardiology')
+        self.assertEqual([doctor['patient_count'] for doctor in response.data], [1, 0])
+        response = self.client.get('/api/doctors/caseload/?specialization=neurology')
+        self.assertEqual(response.data, [])
+
+
+@override_settings(SOFT_DELETE=False)
+class DoctorHardDeleteTests(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.signals = []
+        self.record = lambda signal: lambda sender, **kwargs: self.signals.append((signal, sender))
+        post_delete.connect(self.record('post_delete'), weak=False, dispatch_uid='test_post_delete')
+        bulk_write.connect(self.record('bulk_write'), weak=False, dispatch_uid='test_bulk_write')
+        self.addCleanup(post_delete.disconnect, dispatch_uid='test_post_delete')
+        self.addCleanup(bulk_write.disconnect, dispatch_uid='test_bulk_write')
+
+    def delete_doctor(self, assignments):
+        doctor = make_doctors(self.user, 1, start=Doctor.objects.count())[0]
+        assign(make_patients(self.user, assignments), [doctor])
+        self.signals.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(f'/api/doctors/{doctor.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Doctor.all_objects.filter(pk=doctor.pk).exists())
+        self.assertFalse(PatientDoctorMapping.all_objects.filter(doctor=doctor.pk).exists())
+        return len(queries)
+
+    def test_mappings_are_not_loaded(self):
+        self.assertEqual(self.delete_doctor(3), self.delete_doctor(30))
+        self.assertEqual(self.signals, [('bulk_write', Doctor)])
+        self.assertEqual(PatientDoctorMapping.all_objects.count(), 0)
+
+
+class DirectoryCacheTests(AuthenticatedTestCase):
+    """The directory cache on the per-process LRU."""
+    backend = 'doctors.cache.LocalLRUBackend'
+
+    def setUp(self):
+        super().setUp()
+        settings = override_settings(DOCTOR_CACHE={
+            'BACKEND': self.backend, 'TIMEOUT': 60, 'MAX_ENTRIES': 100, 'CACHE_ALIAS': 'default',
+        })
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.clear()
+        self.doctors = make_doctors(self.user, 3)
+
+    def get(self, url='/api/doctors/', **headers):
+        response = self.client.get(url, **headers)
+        self.assertIn(response.status_code, (200, 304))
+        return response
+
+    def assertHit(self, url='/api/doctors/'):
+        with self.assertNumQueries(0):
+            response = self.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        return response
+
+    def test_miss_then_hit(self):
+        for url in ['/api/doctors/', f'/api/doctors/{self.doctors[0].pk}/']:
+            with self.subTest(url):
+                first = self.get(url)
+                self.assertEqual(first['X-Cache'], 'MISS')
+                self.assertEqual(self.assertHit(url).content, first.content)
+        self.assertEqual((directory_cache.hits, directory_cache.misses), (2, 2))
+
+    def test_cached_etag_answers_304(self):
+        etag = self.get()['ETag']
+        with self.assertNumQueries(0):
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_writes_invalidate(self):
+        doctor = self.doctors[0]
+        writes = [
+            ('save', lambda: Doctor.objects.filter(pk=doctor.pk).get().save()),
+            ('bulk write', lambda: self.client.post('/api/doctors/bulk/', [
+                {'name': 'Bulk', 'specialization': 'ENT'},
+            ], format='json')),
+            ('delete', lambda: Doctor.objects.get(pk=doctor.pk).delete()),
+        ]
+        for name, write in writes:
+            with self.subTest(name):
+                self.get()
+                self.assertHit()
+                with self.captureOnCommitCallbacks(execute=True):
+                    write()
+                self.assertEqual(self.get()['X-Cache'], 'MISS')
+
+    def test_next_link_follows_the_request_host(self):
+        url = '/api/doctors/?page_size=1'
+        self.assertTrue(self.client.get(url, HTTP_HOST='a.example').data['next'].startswith('http://a.example/'))
+        response = self.client.get(url, HTTP_HOST='b.example')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        next_link = json.loads(response.content)['next']
+        self.assertTrue(next_link.startswith('http://b.example/api/doctors/?'))
+        self.assertEqual(self.client.get(next_link).status_code, 200)
+
+
+class SharedDirectoryCacheTests(DirectoryCacheTests):
+    """The same on a Django cache (locmem here, Redis in production)."""
+    backend = 'doctors.cache.DjangoCacheBackend'
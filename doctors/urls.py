@@ -1,7 +1,15 @@
 from django.urls import path
-from .views import DoctorListCreateView, DoctorDetailView
+from mappings.views import DoctorPatientsView
+from .views import (
+    DoctorListCreateView, DoctorDetailView, DoctorBulkView, DoctorLookupView,
+    DoctorCaseloadView,
+)
 
 urlpatterns = [
     path('', DoctorListCreateView.as_view(), name='doctor-list-create'),
     path('<int:pk>/', DoctorDetailView.as_view(), name='doctor-detail'),
+    path('bulk/', DoctorBulkView.as_view(), name='doctor-bulk'),
+    path('lookup/', DoctorLookupView.as_view(), name='doctor-lookup'),
+    path('caseload/', DoctorCaseloadView.as_view(), name='doctor-caseload'),
+    path('<int:pk>/patients/', DoctorPatientsView.as_view(), name='doctor-patients'),
 ]
@@ -1,20 +1,56 @@
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from django.db import connection, transaction
+from django.db.models import CharField, Count, F, Q, Value
+from django.db.models.functions import Concat, Lower
 from django.shortcuts import get_object_or_404
 
+from healthcare.bulk import (
+    bulk_delete, bulk_response, create_valid, get_bulk_items,
+    update_valid, validate_items, validate_updates,
+)
+from healthcare.conditional import check_preconditions, collection_etag, make_etag, object_etag
+from healthcare.lookup import lookup_response
+from healthcare.pagination import KeysetPagination, RankedPagination
+from healthcare.renderers import FastJSONRenderer
+from healthcare.search import search_queryset
+from healthcare.softdelete import delete_object
+from .cache import directory_cache
 from .models import Doctor
-from .serializers import DoctorSerializer
+from .serializers import DoctorSerializer, doctor_values
 
 
 class DoctorListCreateView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    search_fields = ['name', 'specialization']
 
     def get(self, request):
+        cache_key = f'list:{request.get_full_path()}'
+        response = directory_cache.respond(request, cache_key)
+        if response is not None:
+            return response
+
+        values = doctor_values.project(request)
         doctors = Doctor.objects.all()
-        serializer = DoctorSerializer(doctors, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        etag = collection_etag(request, doctors, 'updated_at')
+        response = check_preconditions(request, etag)
+        if response is not None:
+            return response
+
+        paginator = self.pagination_class()
+        q = request.query_params.get('q', '').strip()
+        if q:
+            doctors = search_queryset(doctors, q, self.search_fields)
+            paginator = RankedPagination()
+        page = paginator.paginate_queryset(values.values(doctors, *paginator.ordering), request, view=self)
+        response = paginator.get_paginated_response(values.to_representation(page))
+        response['ETag'] = etag
+        return directory_cache.store(request, cache_key, response)
 
     def post(self, request):
         serializer = DoctorSerializer(data=request.data)
@@ -27,26 +63,109 @@ class DoctorListCreateView(APIView):
 class DoctorDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get_object(self, pk):
-        return get_object_or_404(Doctor, pk=pk)
+    def get_object(self, pk, queryset=Doctor.objects):
+        return get_object_or_404(queryset, pk=pk)
 
     def get(self, request, pk):
-        doctor = self.get_object(pk)
-        serializer = DoctorSerializer(doctor)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        values = doctor_values.project(request)
+        cache_key = f'detail:{pk}:{values.projection}'
+        response = directory_cache.respond(request, cache_key)
+        if response is not None:
+            return response
+
+        doctor = self.get_object(pk, Doctor.objects.only('updated_at', *values.columns))
+        etag = object_etag(doctor, values.projection)
+        response = check_preconditions(request, etag)
+        if response is not None:
+            return response
+        response = Response(values.serializer(doctor).data, status=status.HTTP_200_OK, headers={'ETag': etag})
+        return directory_cache.store(request, cache_key, response)
 
+    @transaction.atomic
     def put(self, request, pk):
-        doctor = self.get_object(pk)
+        # Locked until commit: a concurrent write waits, then fails If-Match
+        doctor = self.get_object(pk, Doctor.objects.select_for_update())
+        response = check_preconditions(request, object_etag(doctor))
+        if response is not None:
+            return response
         serializer = DoctorSerializer(doctor, data=request.data)
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return Response(serializer.data, status=status.HTTP_200_OK, headers={'ETag': object_etag(doctor)})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @transaction.atomic
     def delete(self, request, pk):
-        doctor = self.get_object(pk)
-        doctor.delete()
+        doctor = self.get_object(pk, Doctor.objects.select_for_update())
+        response = check_preconditions(request, object_etag(doctor))
+        if response is not None:
+            return response
+        delete_object(doctor)
         return Response(
             {'message': 'Doctor record deleted successfully.'},
             status=status.HTTP_204_NO_CONTENT
         )
+
+
+class DoctorBulkView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        items = get_bulk_items(request)
+        results, valid = validate_items(DoctorSerializer, items)
+        create_valid(Doctor, valid, results, created_by=request.user)
+        return bulk_response(results, status.HTTP_201_CREATED)
+
+    def put(self, request):
+        items = get_bulk_items(request)
+        queryset = Doctor.objects.all()
+        results, valid = validate_updates(queryset, DoctorSerializer, items)
+        update_valid(Doctor, valid, results)
+        return bulk_response(results)
+
+    def delete(self, request):
+        ids = get_bulk_items(request)
+        results = bulk_delete(Doctor.objects.all(), ids)
+        return bulk_response(results)
+
+
+class DoctorLookupView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        label = Concat(
+            Value('Dr. '), 'name', Value(' - '), 'specialization',
+            output_field=CharField(),
+        )
+        return lookup_response(request, Doctor.objects.all(), label, ['name', 'specialization'])
+
+
+class DoctorCaseloadView(APIView):
+    """Assigned patient counts for every doctor, optionally one specialization."""
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request):
+        doctors = Doctor.objects.order_by('id')
+        specialization = request.query_params.get('specialization', '').strip()
+        if specialization:
+            # Matches doctor_live_spec_prefix_idx on lower(specialization)
+            doctors = doctors.alias(specialization_lower=Lower('specialization')).filter(
+                specialization_lower=specialization.lower()
+            )
+        if connection.vendor == 'postgresql':
+            count = F('patient_count')
+        else:
+            # No counter triggers elsewhere: count with one GROUP BY instead
+            count = Count('patient_mappings', filter=Q(patient_mappings__patient__deleted_at__isnull=True))
+        rows = list(doctors.values_list('id', 'name', 'specialization').annotate(count=count))
+
+        etag = make_etag(request.get_full_path(), rows)
+        response = check_preconditions(request, etag)
+        if response is not None:
+            return response
+        caseload = [
+            {'id': pk, 'name': name, 'specialization': spec, 'patient_count': count}
+            for pk, name, spec, count in rows
+        ]
+        return Response(caseload, status=status.HTTP_200_OK, headers={'ETag': etag})
@@ -0,0 +1,138 @@
+"""
+Publish/subscribe behind the change stream at ``/api/events/``.
+
+``events.signals`` publishes an ``Event`` once each write commits, and every
+open stream holds a subscription. The broker is chosen with
+``settings.EVENT_STREAM['BROKER']``:
+
+* ``LocalBroker`` (default) - fans events out inside the process. Streams
+  only see writes made by the same worker, which covers a single ASGI
+  worker, development and in-process tests.
+* Anything else with the same ``publish(event)`` and ``subscribe()``
+  methods, e.g. one relaying events between workers through Redis pub/sub
+  or PostgreSQL LISTEN/NOTIFY.
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import cached_property
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from healthcare.renderers import FastJSONRenderer
+
+
+@dataclass(frozen=True)
+class Event:
+    """
+    A change to ``model`` ('patients', 'doctors' or 'mappings'), sent to
+    ``owner`` only, or to every user when ``owner`` is ``None``.
+
+    ``action`` is 'created', 'updated' or 'deleted' for one row, with the
+    row (or just its id) in ``data``, or 'reload' after a bulk write.
+    """
+    model: str
+    action: str
+    data: dict | None = None
+    owner: int | None = None
+
+    @cached_property
+    def frame(self):
+        payload = FastJSONRenderer().render({'action': self.action, 'data': self.data})
+        return b'event: %s\ndata: %s\n\n' % (self.model.encode(), payload)
+
+    def visible_to(self, user_id):
+        return self.owner is None or self.owner == user_id
+
+
+# Sent to a subscriber that fell behind and lost events: reload everything
+OVERFLOW = Event('stream', 'reload')
+
+
+class LocalSubscription:
+    def __init__(self, queue_size):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+        self.overflowed = False
+
+    def put(self, event):
+        # Runs on self.loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.queue.get()
+        if self.overflowed:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.overflowed = False
+            return OVERFLOW
+        return event
+
+
+class LocalBroker:
+    def __init__(self, queue_size):
+        self.queue_size = queue_size
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+
+    def publish(self, event):
+        """Queue ``event`` for every subscriber; safe to call from any thread."""
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                pass  # its event loop has closed
+
+    @asynccontextmanager
+    async def subscribe(self):
+        """Yields an async iterator over the events published from now on."""
+        subscription = LocalSubscription(self.queue_size)
+        with self.lock:
+            self.subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self.lock:
+                self.subscriptions.discard(subscription)
+
+
+class ChangeStream:
+    def __init__(self):
+        self._broker = None
+
+    @property
+    def broker(self):
+        if self._broker is None:
+            config = settings.EVENT_STREAM
+            broker_class = import_string(config['BROKER'])
+            self._broker = broker_class(queue_size=config['QUEUE_SIZE'])
+        return self._broker
+
+    def publish(self, event):
+        # Listeners must not see rows that may still roll back
+        transaction.on_commit(lambda: self.broker.publish(event))
+
+    def subscribe(self):
+        return self.broker.subscribe()
+
+
+change_stream = ChangeStream()
+
+
+@receiver(setting_changed)
+def reset_broker(setting, **kwargs):
+    if setting == 'EVENT_STREAM':
+        change_stream._broker = None
@@ -0,0 +1,72 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from doctors.models import Doctor
+from doctors.serializers import DoctorSerializer
+from healthcare.signals import bulk_write
+from mappings.models import PatientDoctorMapping
+from mappings.serializers import mapping_compact_values
+from patients.models import Patient
+from patients.serializers import PatientSerializer
+
+from .broker import Event, change_stream
+
+MODEL_NAMES = {Patient: 'patients', Doctor: 'doctors', PatientDoctorMapping: 'mappings'}
+
+
+def mapping_row(mapping):
+    """The mapping as ``GET /api/mappings/?view=compact`` lists it."""
+    row = {
+        'id': mapping.pk, 'patient': mapping.patient_id, 'patient_name': mapping.patient.name,
+        'doctor': mapping.doctor_id, 'doctor_name': mapping.doctor.name,
+        'doctor_specialization': mapping.doctor.specialization, 'assigned_at': mapping.assigned_at,
+    }
+    return mapping_compact_values.to_representation([row])[0]
+
+
+def row_events(instance, action):
+    name = MODEL_NAMES[type(instance)]
+    if action == 'deleted':
+        # Everyone: a deleted patient also leaves other users' mapping pages
+        return [Event(name, action, {'id': instance.pk})]
+    if isinstance(instance, Patient):
+        events = [Event(name, action, PatientSerializer(instance).data, owner=instance.created_by_id)]
+        if action == 'updated':
+            # Other users only see a patient's name, on the mappings page
+            events.append(Event(name, 'renamed', {'id': instance.pk, 'name': instance.name}))
+        return events
+    if isinstance(instance, Doctor):
+        return [Event(name, action, DoctorSerializer(instance).data)]
+    return [Event(name, action, mapping_row(instance))]
+
+
+@receiver(post_save, sender=Patient)
+@receiver(post_save, sender=Doctor)
+@receiver(post_save, sender=PatientDoctorMapping)
+def publish_save(sender, instance, created, **kwargs):
+    if getattr(instance, 'deleted_at', None) is not None:
+        action = 'deleted'  # soft delete
+    else:
+        action = 'created' if created else 'updated'
+    for event in row_events(instance, action):
+        change_stream.publish(event)
+
+
+@receiver(post_delete, sender=Patient)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_delete, sender=PatientDoctorMapping)
+def publish_delete(sender, instance, **kwargs):
+    for event in row_events(instance, 'deleted'):
+        change_stream.publish(event)
+
+
+@receiver(bulk_write)
+def publish_bulk_write(sender, deleted=None, **kwargs):
+    if sender not in MODEL_NAMES:
+        return
+    if deleted is not None:
+        for pk in deleted:
+            change_stream.publish(Event(MODEL_NAMES[sender], 'deleted', {'id': pk}))
+    else:
+        # Bulk inserts and updates do not say which rows changed: clients refetch the model
+        change_stream.publish(Event(MODEL_NAMES[sender], 'reload'))
@@ -0,0 +1,98 @@
+import asyncio
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from healthcare.testing import make_user
+from patients.models import Patient
+
+from .broker import OVERFLOW, Event, change_stream
+from .views import event_frames
+
+
+class Listener:
+    """A subscription to the change stream, read from synchronous tests."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.context = change_stream.subscribe()
+        self.subscription = self.loop.run_until_complete(self.context.__aenter__())
+
+    def events(self):
+        async def drain():
+            events = []
+            while True:
+                try:
+                    events.append(await asyncio.wait_for(anext(self.subscription), 0.05))
+                except TimeoutError:
+                    return events
+        return self.loop.run_until_complete(drain())
+
+    def close(self):
+        self.loop.run_until_complete(self.context.__aexit__(None, None, None))
+        self.loop.close()
+
+
+class ChangeStreamTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.listener = Listener()
+        self.addCleanup(self.listener.close)
+
+    def test_publishes_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            patient = Patient.objects.create(created_by=self.user, name='Ann', age=30, gender='Female')
+            self.assertEqual(self.listener.events(), [])
+        for callback in callbacks:
+            callback()
+
+        [event] = self.listener.events()
+        self.assertEqual((event.model, event.action, event.owner), ('patients', 'created', self.user.pk))
+        self.assertEqual(event.data['id'], patient.pk)
+
+    def test_nothing_sent_on_rollback(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    Patient.objects.create(created_by=self.user, name='Ann', age=30, gender='Female')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.listener.events(), [])
+
+    @override_settings(EVENT_STREAM={'BROKER': 'events.broker.LocalBroker', 'QUEUE_SIZE': 2, 'HEARTBEAT': 15})
+    def test_full_queue_sends_overflow(self):
+        listener = Listener()
+        self.addCleanup(listener.close)
+        for pk in range(5):
+            change_stream.broker.publish(Event('doctors', 'created', {'id': pk}))
+        self.assertEqual(listener.events(), [OVERFLOW])
+
+        # Caught up: events flow again
+        change_stream.broker.publish(Event('doctors', 'deleted', {'id': 1}))
+        self.assertEqual(listener.events(), [Event('doctors', 'deleted', {'id': 1})])
+
+
+class EventFramesTests(TestCase):
+    def test_ready_then_visible_frames(self):
+        owner, other = make_user(), make_user('other')
+        mine = Event('patients', 'created', {'id': 1}, owner=owner.pk)
+        theirs = Event('patients', 'created', {'id': 2}, owner=other.pk)
+        doctor = Event('doctors', 'created', {'id': 3})
+
+        async def stream():
+            frames = event_frames(owner.pk)
+            try:
+                received = [await anext(frames)]
+                for event in (theirs, mine, doctor):
+                    change_stream.broker.publish(event)
+                received += [await anext(frames), await anext(frames)]
+                return received
+            finally:
+                await frames.aclose()
+
+        self.assertEqual(asyncio.run(stream()), [b'event: ready\ndata: {}\n\n', mine.frame, doctor.frame])
+        self.assertTrue(mine.frame.startswith(b'event: patients\ndata: {"action":"created"'))
+        self.assertFalse(theirs.visible_to(owner.pk))
+        self.assertTrue(doctor.visible_to(other.pk))
@@ -0,0 +1,52 @@
+"""
+``GET /api/events/``: a Server-Sent Events stream of patient, doctor and
+mapping changes, so pages can patch their tables instead of refetching.
+
+Each event is named after the model and carries
+``{"action": ..., "data": ...}`` (see ``events.broker.Event``). The stream
+opens with a ``ready`` event; clients that reconnect, or receive
+``stream``/``reload``, should reload their data, since events sent in
+between are lost. Comment lines every ``EVENT_STREAM['HEARTBEAT']``
+seconds keep idle connections open through proxies.
+
+A stream holds its connection for as long as the client stays, which only
+an ASGI server can afford, so under WSGI the endpoint answers 501.
+"""
+import asyncio
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import status
+
+from healthcare.async_api import async_api_view, render_json
+
+from .broker import change_stream
+
+
+async def event_frames(user_id):
+    heartbeat = settings.EVENT_STREAM['HEARTBEAT']
+    async with change_stream.subscribe() as subscription:
+        yield b'event: ready\ndata: {}\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(anext(subscription), heartbeat)
+            except TimeoutError:
+                yield b': keep-alive\n\n'
+                continue
+            if event.visible_to(user_id):
+                yield event.frame
+
+
+@async_api_view
+async def event_stream(request):
+    if not isinstance(request, ASGIRequest):
+        return render_json(
+            {'error': 'The event stream needs an ASGI server.'},
+            status.HTTP_501_NOT_IMPLEMENTED,
+        )
+    return StreamingHttpResponse(
+        event_frames(request.user.pk),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
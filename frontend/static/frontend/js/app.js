@@ -63,6 +63,87 @@ async function apiRequest(url, method = 'GET', body = null) {
     return data;
 }
 
+// Follow the `next` cursor of a paginated list endpoint and collect every page
+async function apiRequestAll(url) {
+    let results = [];
+    let next = url;
+    while (next) {
+        const page = await apiRequest(next);
+        if (page._status !== 200) return page;
+        results = results.concat(page.results || []);
+        next = null;
+        if (page.next) {
+            const nextUrl = new URL(page.next);
+            next = nextUrl.pathname.slice(API_BASE.length) + nextUrl.search;
+        }
+    }
+    return { _status: 200, results };
+}
+
+// ===== Change Stream =====
+// Calls handlers[model]({action, data}) for each event from /api/events/
+// (Server-Sent Events, read with fetch so the JWT can be sent), and
+// handlers.resync() when events may have been missed. There is no stream
+// under a WSGI server, so pages show their own writes from the responses.
+function subscribeChanges(handlers) {
+    let delay = 1000;
+    let opened = false;
+
+    function dispatch(frame) {
+        let name = 'message';
+        let data = '';
+        frame.split('\n').forEach(line => {
+            if (line.startsWith('event: ')) name = line.slice(7);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+        });
+        if (!data) return;  // keep-alive comment
+        if (name === 'ready') {
+            delay = 1000;
+            // Changes made while disconnected were not delivered
+            if (opened && handlers.resync) handlers.resync();
+            opened = true;
+        } else if (name === 'stream') {
+            if (handlers.resync) handlers.resync();
+        } else if (handlers[name]) {
+            handlers[name](JSON.parse(data));
+        }
+    }
+
+    async function connect() {
+        try {
+            const response = await fetch(API_BASE + '/events/', {
+                headers: { 'Authorization': `Bearer ${getToken()}` }
+            });
+            if (response.status !== 200) return;  // no ASGI server, or logged out
+            const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+            let buffer = '';
+            for (;;) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += value;
+                let end;
+                while ((end = buffer.indexOf('\n\n')) >= 0) {
+                    dispatch(buffer.slice(0, end));
+                    buffer = buffer.slice(end + 2);
+                }
+            }
+        } catch (err) {
+            // Connection dropped: retry below
+        }
+        setTimeout(connect, delay);
+        delay = Math.min(delay * 2, 30000);
+    }
+
+    connect();
+}
+
+// Replace the row with the same id in `rows`, or append it
+function upsertRow(rows, row) {
+    const index = rows.findIndex(r => r.id === row.id);
+    if (index >= 0) rows[index] = row;
+    else rows.push(row);
+}
+
 // ===== Alert Helpers =====
 function showAlert(elementId, message, type = 'error') {
     const el = document.getElementById(elementId);
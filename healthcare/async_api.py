@@ -0,0 +1,94 @@
+"""
+Helpers for the native async (ASGI) read endpoints under ``/api/async/``.
+
+DRF's ``APIView`` is synchronous, so under an ASGI server every request to
+it is pushed onto a worker thread. These views are plain ``async def``
+Django views instead: authentication, queries and pagination are awaited
+through Django's async ORM, and the response body is rendered with the
+same ``FastJSONRenderer`` so it is byte-identical to the sync endpoints.
+"""
+from functools import wraps
+
+from django.http import Http404, HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from accounts.authentication import CachedJWTAuthentication, user_cache
+
+from .renderers import FastJSONRenderer
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user = user_cache.get(self.user_model, validated_token)
+        if user is not None:
+            return user
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken('Token contained no recognizable user identification') from e
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed('User not found', code='user_not_found') from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+        return user_cache.store(user, validated_token)
+
+
+def render_json(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        FastJSONRenderer().render(data),
+        status=status_code,
+        content_type='application/json',
+        headers=headers,
+    )
+
+
+def async_api_view(view):
+    """Authenticate a GET-only async view with JWT and map API errors to JSON."""
+    authentication = AsyncJWTAuthentication()
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return render_json(
+                {'detail': f'Method "{request.method}" not allowed.'},
+                status.HTTP_405_METHOD_NOT_ALLOWED,
+                headers={'Allow': 'GET, HEAD'},
+            )
+        try:
+            result = await authentication.aauthenticate(request)
+            if result is None:
+                raise NotAuthenticated()
+            request.user, request.auth = result
+            return await view(request, *args, **kwargs)
+        except Http404 as exc:
+            return render_json({'detail': str(exc)}, status.HTTP_404_NOT_FOUND)
+        except APIException as exc:
+            headers = None
+            if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                headers = {'WWW-Authenticate': authentication.authenticate_header(request)}
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return render_json(data, exc.status_code, headers=headers)
+
+    return wrapper
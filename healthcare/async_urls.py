@@ -0,0 +1,13 @@
+from django.urls import path
+
+from doctors.async_views import doctor_detail, doctor_list
+from mappings.async_views import mapping_list
+from patients.async_views import patient_detail, patient_list
+
+urlpatterns = [
+    path('patients/', patient_list, name='async-patient-list'),
+    path('patients/<int:pk>/', patient_detail, name='async-patient-detail'),
+    path('doctors/', doctor_list, name='async-doctor-list'),
+    path('doctors/<int:pk>/', doctor_detail, name='async-doctor-detail'),
+    path('mappings/', mapping_list, name='async-mapping-list'),
+]
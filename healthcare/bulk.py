@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+
+from .signals import bulk_write
+from .softdelete import hard_delete, soft_deletes
+
+
+def is_pk(value):
+    # JSON true/false are ints to Python; {"id": true} must not mean id 1
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def get_bulk_items(request):
+    items = request.data
+    if not isinstance(items, list):
+        raise ParseError('Expected a list of items.')
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise ParseError(f'At most {settings.BULK_MAX_ITEMS} items are allowed per request.')
+    return items
+
+
+def error_result(errors, status_code=status.HTTP_400_BAD_REQUEST):
+    return {'status': status_code, 'errors': errors}
+
+
+def validate_items(serializer_class, items, context=None):
+    """
+    Validate every item of a bulk payload.
+
+    Returns the per-item results (``None`` for items that passed) and the
+    ``(index, serializer)`` pairs that are ready to be written.
+    """
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item, context=context or {})
+        if serializer.is_valid():
+            valid.append((index, serializer))
+        else:
+            results[index] = error_result(serializer.errors)
+    return results, valid
+
+
+def validate_updates(queryset, serializer_class, items):
+    """Like ``validate_items`` but for items that carry the ``id`` to update."""
+    ids = [item.get('id') for item in items if isinstance(item, dict)]
+    instances = queryset.in_bulk([pk for pk in ids if is_pk(pk)])
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        pk = item.get('id') if isinstance(item, dict) else None
+        instance = instances.get(pk) if is_pk(pk) else None
+        if instance is None:
+            results[index] = error_result({'error': 'Not found.'}, status.HTTP_404_NOT_FOUND)
+            continue
+        serializer = serializer_class(instance, data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer))
+        else:
+            results[index] = error_result(serializer.errors)
+    return results, valid
+
+
+def create_valid(model, valid, results, **extra_fields):
+    objects = [model(**serializer.validated_data, **extra_fields) for _, serializer in valid]
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(objects, batch_size=settings.BULK_BATCH_SIZE)
+    except IntegrityError:
+        # A concurrent write conflicts with some item (e.g. the same
+        # assignment): insert one by one to find which and keep the rest.
+        valid, objects = create_each(model, valid, objects, results)
+    for (index, serializer), obj in zip(valid, objects):
+        serializer.instance = obj
+        results[index] = {'status': status.HTTP_201_CREATED, 'data': serializer.data}
+    if objects:
+        bulk_write.send(sender=model)
+    return results
+
+
+def create_each(model, valid, objects, results):
+    created = []
+    with transaction.atomic():
+        for (index, serializer), obj in zip(valid, objects):
+            obj.pk = None
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create([obj])
+            except IntegrityError:
+                results[index] = error_result(
+                    {'error': 'Conflicts with a record written at the same time.'}, status.HTTP_409_CONFLICT,
+                )
+            else:
+                created.append(((index, serializer), obj))
+    return [pair for pair, _ in created], [obj for _, obj in created]
+
+
+def update_valid(model, valid, results):
+    now = timezone.now()
+    auto_now_fields = [f.name for f in model._meta.concrete_fields if getattr(f, 'auto_now', False)]
+    fields = set(auto_now_fields)
+    objects = []
+    for _, serializer in valid:
+        obj = serializer.instance
+        for attr, value in serializer.validated_data.items():
+            setattr(obj, attr, value)
+            fields.add(attr)
+        for name in auto_now_fields:
+            setattr(obj, name, now)
+        objects.append(obj)
+
+    with transaction.atomic():
+        model.objects.bulk_update(objects, sorted(fields), batch_size=settings.BULK_BATCH_SIZE)
+    for index, serializer in valid:
+        results[index] = {'status': status.HTTP_200_OK, 'data': serializer.data}
+    if objects:
+        bulk_write.send(sender=model)
+    return results
+
+
+def bulk_delete(queryset, ids):
+    requested = [pk for pk in ids if is_pk(pk)]
+    with transaction.atomic():
+        existing = set(queryset.filter(pk__in=requested).values_list('pk', flat=True))
+        if soft_deletes(queryset.model):
+            queryset.filter(pk__in=existing).soft_delete()
+        else:
+            hard_delete(queryset.model, existing)
+    if existing and soft_deletes(queryset.model):
+        bulk_write.send(sender=queryset.model)
+    return [
+        {'id': pk, 'status': status.HTTP_204_NO_CONTENT} if pk in existing
+        else {'id': pk, 'status': status.HTTP_404_NOT_FOUND, 'errors': {'error': 'Not found.'}}
+        for pk in ids
+    ]
+
+
+def bulk_response(results, success_status=status.HTTP_200_OK):
+    if all(result['status'] < 400 for result in results):
+        return Response({'results': results}, status=success_status)
+    return Response({'results': results}, status=status.HTTP_207_MULTI_STATUS)
@@ -0,0 +1,40 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LocalLRUBackend:
+    """Bounded in-process LRU with a TTL, private to each worker process."""
+
+    def __init__(self, timeout, max_entries, **options):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
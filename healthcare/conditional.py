@@ -0,0 +1,50 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+
+
+def make_etag(*parts):
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode(), usedforsecurity=False)
+    return f'"{digest.hexdigest()}"'
+
+
+def object_etag(obj, projection=None):
+    """ETag for one object; a ``?fields=``/``?exclude=`` projection gets its own."""
+    if projection is None:
+        return make_etag(obj._meta.label, obj.pk, obj.updated_at.isoformat())
+    return make_etag(obj._meta.label, obj.pk, obj.updated_at.isoformat(), projection)
+
+
+def collection_etag(request, queryset, *timestamp_fields):
+    """
+    ETag for a list response: changes whenever a row is added, removed or
+    updated, and differs per page, search and page size.
+    """
+    state = queryset.order_by().aggregate(**collection_state(timestamp_fields))
+    return make_etag(request.get_full_path(), *state.values())
+
+
+async def acollection_etag(request, queryset, *timestamp_fields):
+    state = await queryset.order_by().aaggregate(**collection_state(timestamp_fields))
+    return make_etag(request.get_full_path(), *state.values())
+
+
+def collection_state(timestamp_fields):
+    return {
+        'count': Count('pk'),
+        **{f'latest_{i}': Max(field) for i, field in enumerate(timestamp_fields)},
+    }
+
+
+def check_preconditions(request, etag):
+    """
+    Evaluate If-None-Match / If-Match against ``etag``.
+
+    Returns a 304 (safe methods) or 412 (unsafe methods) response when the
+    request should not proceed, otherwise ``None``.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response['ETag'] = etag
+    return response
@@ -0,0 +1,15 @@
+"""Helpers for raw PostgreSQL access that work with psycopg2 and psycopg 3."""
+
+COPY_CHUNK_SIZE = 1 << 16
+
+
+def copy_from(cursor, sql, buffer):
+    """Run ``COPY ... FROM STDIN`` on a Django cursor, reading from the file-like ``buffer``."""
+    raw = cursor.cursor
+    if hasattr(raw, 'copy_expert'):
+        raw.copy_expert(sql, buffer)
+        return
+    # psycopg 3, used by DB_POOL
+    with raw.copy(sql) as copy:
+        while data := buffer.read(COPY_CHUNK_SIZE):
+            copy.write(data)
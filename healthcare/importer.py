@@ -0,0 +1,383 @@
+"""
+Streaming CSV/NDJSON import, used by ``manage.py import_records``.
+
+Files are read one record at a time and handled in batches, so memory
+depends on the batch size rather than the file size.
+
+``BatchValidator`` checks a batch column by column with rules compiled
+once from a serializer's fields:
+
+* type, blank, length, range and choice checks run inline;
+* related fields cost one query per batch;
+* unique-together sets cost one query per batch.
+
+Records a rule does not accept are run through the serializer itself,
+which has the final say and supplies the error messages. ``insert_rows``
+writes the valid rows with ``bulk_create``, or with ``COPY`` on PostgreSQL.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import (
+    MaxLengthValidator, MaxValueValidator, MinLengthValidator, MinValueValidator,
+    ProhibitNullCharactersValidator,
+)
+from django.db import connection
+from django.db.models import Model, Q
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.validators import ProhibitSurrogateCharactersValidator, UniqueTogetherValidator
+
+from healthcare.db import copy_from
+
+FORMATS = ('csv', 'ndjson')
+MISSING = object()
+
+
+class Fallback(Exception):
+    """Raised by a rule when only the serializer can decide."""
+
+
+def read_records(path, file_format, offset=0, line=0):
+    """
+    Yield ``(line, record, error, end)`` for every record in ``path``.
+
+    ``end`` is the byte offset just past the record; passing it back as
+    ``offset`` (with ``line``) resumes reading after that record. ``error``
+    is set instead of ``record`` for lines that cannot be parsed, including
+    lines that are not valid UTF-8.
+    """
+    with open(path, 'rb') as handle:
+        header = None
+        if file_format == 'csv':
+            first = handle.readline()
+            header = next(csv.reader([first.decode('utf-8-sig', errors='replace')]), [])
+            if offset < len(first):
+                offset, line = len(first), 1
+        handle.seek(offset)
+        position = offset
+        # Set when a line of the record being read is not valid UTF-8
+        bad_encoding = None
+
+        def lines():
+            nonlocal position, line, bad_encoding
+            for raw in handle:
+                position += len(raw)
+                line += 1
+                try:
+                    yield raw.decode('utf-8')
+                except UnicodeDecodeError as exc:
+                    bad_encoding = bad_encoding or f'Invalid UTF-8 at byte {exc.start + 1} of line {line}.'
+                    yield raw.decode('utf-8', errors='replace')
+
+        def encoding_error():
+            nonlocal bad_encoding
+            error, bad_encoding = bad_encoding, None
+            return error
+
+        if file_format == 'csv':
+            for values in csv.reader(lines()):
+                error = encoding_error()
+                if not values:
+                    continue
+                if error is None and len(values) != len(header):
+                    error = f'Expected {len(header)} columns, got {len(values)}.'
+                if error is not None:
+                    yield line, None, error, position
+                else:
+                    yield line, dict(zip(header, values)), None, position
+            return
+
+        for text in lines():
+            error = encoding_error()
+            if not text.strip():
+                continue
+            if error is not None:
+                yield line, None, error, position
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as exc:
+                yield line, None, f'Invalid JSON: {exc}', position
+                continue
+            if isinstance(record, dict):
+                yield line, record, None, position
+            else:
+                yield line, None, 'Expected a JSON object.', position
+
+
+def split_validators(field, handled):
+    """Limits of the ``handled`` validator types on ``field``, and the remaining validators."""
+    limits = {kind: [] for kind in handled}
+    others = []
+    for validator in field.validators:
+        kind = type(validator)
+        if kind in limits and not callable(getattr(validator, 'limit_value', None)):
+            limits[kind].append(getattr(validator, 'limit_value', None))
+        else:
+            others.append(validator)
+    return limits, others
+
+
+def run_others(validators, value):
+    for validator in validators:
+        try:
+            validator(value)
+        except (DjangoValidationError, ValidationError) as exc:
+            raise Fallback from exc
+    return value
+
+
+def as_int(value):
+    if type(value) is int:
+        return value
+    if type(value) is not str:
+        raise Fallback
+    try:
+        return int(value)
+    except ValueError:
+        raise Fallback from None
+
+
+def char_rule(field):
+    limits, others = split_validators(field, (
+        MaxLengthValidator, MinLengthValidator,
+        ProhibitNullCharactersValidator, ProhibitSurrogateCharactersValidator,
+    ))
+    max_length = min(limits[MaxLengthValidator], default=None)
+    min_length = max(limits[MinLengthValidator], default=0)
+    trim, allow_blank = field.trim_whitespace, field.allow_blank
+
+    def rule(value):
+        if type(value) is not str:
+            raise Fallback
+        if trim:
+            value = value.strip()
+        if not value:
+            if not allow_blank:
+                raise Fallback
+            return value
+        if (max_length is not None and len(value) > max_length) or len(value) < min_length:
+            raise Fallback
+        # NUL and lone surrogates: the two characters-level validators
+        if not value.isascii() and any('\ud800' <= c <= '\udfff' for c in value):
+            raise Fallback
+        if '\x00' in value:
+            raise Fallback
+        return run_others(others, value)
+    return rule
+
+
+def integer_rule(field):
+    limits, others = split_validators(field, (MaxValueValidator, MinValueValidator))
+    high = min(limits[MaxValueValidator], default=None)
+    low = max(limits[MinValueValidator], default=None)
+
+    def rule(value):
+        value = as_int(value)
+        if (high is not None and value > high) or (low is not None and value < low):
+            raise Fallback
+        return run_others(others, value)
+    return rule
+
+
+def choice_rule(field):
+    choices = field.choice_strings_to_values
+    others = field.validators
+
+    def rule(value):
+        if type(value) not in (str, int):
+            raise Fallback
+        try:
+            value = choices[str(value)]
+        except KeyError:
+            raise Fallback from None
+        return run_others(others, value)
+    return rule
+
+
+def generic_rule(field):
+    def rule(value):
+        try:
+            value = field.run_validation(value)
+        except ValidationError as exc:
+            raise Fallback from exc
+        return value.pk if isinstance(value, Model) else value
+    return rule
+
+
+def compile_rule(field):
+    if type(field) is serializers.ChoiceField:
+        return choice_rule(field)
+    if type(field) in (serializers.CharField, serializers.EmailField):
+        return char_rule(field)
+    if type(field) is serializers.IntegerField:
+        return integer_rule(field)
+    if type(field) is serializers.PrimaryKeyRelatedField and field.pk_field is None:
+        return as_int
+    return generic_rule(field)
+
+
+def has_custom_validation(serializer):
+    if type(serializer).validate is not serializers.Serializer.validate:
+        return True
+    if any(hasattr(serializer, f'validate_{name}') for name in serializer.fields):
+        return True
+    return any(not isinstance(v, UniqueTogetherValidator) for v in serializer.get_validators())
+
+
+class BatchValidator:
+    def __init__(self, serializer_class, blank_is_null=False):
+        """
+        ``blank_is_null`` treats empty strings as missing values, for CSV
+        files: nullable fields get ``None`` and optional ones are left out.
+        """
+        self.serializer_class = serializer_class
+        serializer = serializer_class()
+        self.model = serializer.Meta.model
+        self.blank_is_null = blank_is_null
+        self.columns = []
+        self.related = []
+        for name, field in serializer.fields.items():
+            if field.read_only:
+                continue
+            attname = self.model._meta.get_field(field.source).attname
+            self.columns.append((name, attname, field, compile_rule(field)))
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+                self.related.append((attname, field.get_queryset()))
+        self.unique_together = [
+            [self.model._meta.get_field(name).attname for name in names]
+            for names in self.model._meta.unique_together
+        ]
+        # Serializer-level hooks the rules cannot reproduce: validate every record with it.
+        self.exact = not has_custom_validation(serializer)
+
+    def validate(self, records):
+        """
+        Returns ``(rows, rejects)``: rows are dicts keyed by model attname,
+        ready to insert; rejects are ``(index, errors)`` pairs.
+        """
+        rows = [{} for _ in records]
+        suspect = set() if self.exact else set(range(len(records)))
+
+        for name, attname, field, rule in self.columns:
+            for index, record in enumerate(records):
+                if index in suspect:
+                    continue
+                value = record.get(name, MISSING)
+                if value == '' and self.blank_is_null:
+                    value = None if field.allow_null else MISSING
+                if value is MISSING:
+                    if field.required:
+                        suspect.add(index)
+                    continue
+                if value is None:
+                    if field.allow_null:
+                        rows[index][attname] = None
+                    else:
+                        suspect.add(index)
+                    continue
+                try:
+                    rows[index][attname] = rule(value)
+                except Fallback:
+                    suspect.add(index)
+
+        for attname, queryset in self.related:
+            wanted = {row[attname] for index, row in enumerate(rows) if index not in suspect and row.get(attname)}
+            existing = set(queryset.filter(pk__in=wanted).values_list('pk', flat=True)) if wanted else set()
+            suspect.update(
+                index for index, row in enumerate(rows)
+                if index not in suspect and row.get(attname) is not None and row[attname] not in existing
+            )
+
+        rejects = []
+        for index in sorted(suspect):
+            serializer = self.serializer_class(data=self.clean(records[index]))
+            if serializer.is_valid():
+                rows[index] = {
+                    self.model._meta.get_field(key).attname: value.pk if isinstance(value, Model) else value
+                    for key, value in serializer.validated_data.items()
+                }
+            else:
+                rejects.append((index, serializer.errors))
+        rejected = {index for index, _ in rejects}
+
+        for attnames in self.unique_together:
+            rejects += self.duplicates(rows, rejected, attnames)
+        return [row for index, row in enumerate(rows) if index not in rejected], sorted(rejects, key=lambda r: r[0])
+
+    def clean(self, record):
+        """``record`` with CSV blanks turned into what the serializer expects."""
+        if not self.blank_is_null:
+            return record
+        record = dict(record)
+        for name, _, field, _ in self.columns:
+            if record.get(name) == '':
+                if field.allow_null:
+                    record[name] = None
+                elif not field.required:
+                    del record[name]
+        return record
+
+    def duplicates(self, rows, rejected, attnames):
+        """Reject rows whose ``attnames`` values exist already, in the database or earlier in the batch."""
+        keys = {
+            index: tuple(row.get(name) for name in attnames)
+            for index, row in enumerate(rows) if index not in rejected
+        }
+        taken = set()
+        if keys:
+            conditions = Q(**{
+                f'{name}__in': {key[position] for key in keys.values()}
+                for position, name in enumerate(attnames)
+            })
+            taken = set(self.model._base_manager.filter(conditions).values_list(*attnames))
+        names = ', '.join(self.model._meta.get_field(name).name for name in attnames)
+        errors = {'non_field_errors': [f'The fields {names} must make a unique set.']}
+        rejects = []
+        for index, key in keys.items():
+            if key in taken:
+                rejects.append((index, errors))
+                rejected.add(index)
+            taken.add(key)
+        return rejects
+
+
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
+
+
+def insert_rows(model, rows, use_copy=False):
+    if not rows:
+        return
+    if not use_copy:
+        model.objects.bulk_create([model(**row) for row in rows], batch_size=settings.BULK_BATCH_SIZE)
+        return
+
+    now = timezone.now()
+    fields = [f for f in model._meta.concrete_fields if not f.primary_key]
+    defaults = {
+        f.attname: now if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False) else f.get_default()
+        for f in fields
+    }
+    buffer = io.StringIO()
+    buffer.writelines(
+        '\t'.join(copy_value(row.get(f.attname, defaults[f.attname])) for f in fields) + '\n'
+        for row in rows
+    )
+    buffer.seek(0)
+    columns = ', '.join(connection.ops.quote_name(f.column) for f in fields)
+    with connection.cursor() as cursor:
+        copy_from(cursor, f'COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN', buffer)
@@ -0,0 +1,36 @@
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.functions import Lower
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def lookup_response(request, queryset, label, prefix_fields):
+    """
+    Autocomplete payload: ``[[id, label], ...]`` for rows where any of
+    ``prefix_fields`` starts with ``?q=`` (case-insensitive).
+
+    Rows are read with ``values_list``, so no model instances are built,
+    and matching is served by the ``LOWER(field) text_pattern_ops`` indexes.
+    """
+    q = request.query_params.get('q', '').strip().lower()
+    try:
+        limit = int(request.query_params.get('limit', settings.LOOKUP_LIMIT))
+    except ValueError:
+        limit = settings.LOOKUP_LIMIT
+    limit = max(1, min(limit, settings.LOOKUP_LIMIT))
+
+    aliases = {f'{field}_lower': Lower(field) for field in prefix_fields}
+    queryset = queryset.alias(**aliases)
+    if q:
+        queryset = queryset.filter(reduce(or_, (Q(**{f'{alias}__startswith': q}) for alias in aliases)))
+
+    rows = (
+        queryset.annotate(label=label)
+        .order_by(f'{prefix_fields[0]}_lower', 'id')
+        .values_list('id', 'label')[:limit]
+    )
+    return Response(list(rows), status=status.HTTP_200_OK)
@@ -0,0 +1,271 @@
+"""
+Per-endpoint request metrics in the Prometheus text format.
+
+``MetricsMiddleware`` times every request and splits it into:
+
+* DB time and query count, recorded by a wrapper installed on every
+  database connection;
+* view time: time inside the view not spent in the database, which
+  covers authentication, view logic and serialization;
+* render time: turning a DRF ``Response`` into bytes.
+
+Streaming responses (exports, the event stream) produce their body after
+the middleware returns, so their timings would read near zero: only their
+status is counted.
+
+Histograms are labelled by method and URL route and served by
+``metrics_view`` at ``/metrics``, which needs ``METRICS_TOKEN`` or a staff
+session unless ``DEBUG`` is on. Each worker process keeps its own
+numbers, so scrape every worker (or sum them) rather than a load balancer.
+
+Requests over ``PERFORMANCE_BUDGET`` (query count or latency) are logged
+with their SQL, grouped by statement. Parameters are never logged.
+"""
+import hmac
+import logging
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+# Statements kept per request for the budget log
+MAX_STATEMENTS = 200
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets, label_names=('method', 'route')):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.label_names = label_names
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(series):
+            prefix = format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{prefix}}} {total}')
+            lines.append(f'{self.name}_count{{{prefix}}} {cumulative}')
+        return lines
+
+
+class CounterMetric:
+    def __init__(self, name, documentation, label_names):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values = Counter()
+        self._lock = threading.Lock()
+
+    def inc(self, labels):
+        with self._lock:
+            self._values[labels] += 1
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self._values.items())
+        lines += [f'{self.name}{{{format_labels(self.label_names, labels)}}} {value}' for labels, value in values]
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Total time spent handling the request.', LATENCY_BUCKETS)
+DB_SECONDS = Histogram(
+    'http_request_db_seconds', 'Time spent executing SQL.', LATENCY_BUCKETS)
+QUERIES = Histogram(
+    'http_request_queries', 'SQL statements executed.', QUERY_BUCKETS)
+VIEW_SECONDS = Histogram(
+    'http_request_view_seconds',
+    'Time in the view outside SQL: authentication, view logic and serialization.', LATENCY_BUCKETS)
+RENDER_SECONDS = Histogram(
+    'http_request_render_seconds', 'Time spent rendering DRF responses to bytes.', LATENCY_BUCKETS)
+RESPONSES = CounterMetric(
+    'http_responses_total', 'Responses sent, by status code.', ('method', 'route', 'status'))
+
+REGISTRY = (REQUEST_SECONDS, DB_SECONDS, QUERIES, VIEW_SECONDS, RENDER_SECONDS, RESPONSES)
+
+
+def format_labels(names, values):
+    return ','.join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'view_started', 'render_started', 'db_seconds', 'queries', 'statements')
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.view_started = None
+        self.render_started = None
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.statements = []
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = perf_counter() - started
+        metrics.db_seconds += elapsed
+        metrics.queries += 1
+        if len(metrics.statements) < MAX_STATEMENTS:
+            metrics.statements.append((sql, elapsed))
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # Installed once per connection rather than per request, so queries the
+    # async ORM runs on other threads are still attributed to their request.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def mark(phase):
+    metrics = _current.get()
+    if metrics is not None:
+        setattr(metrics, phase, perf_counter())
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Connections opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(None, connection)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Coroutine hooks keep Django from running them in a thread.
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        mark('view_started')
+
+    def process_template_response(self, request, response):
+        mark('render_started')
+        return response
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        mark('view_started')
+
+    async def aprocess_template_response(self, request, response):
+        mark('render_started')
+        return response
+
+    def finish(self, request, response, metrics):
+        finished = perf_counter()
+        total = finished - metrics.started
+        match = request.resolver_match
+        labels = (request.method, match.route if match is not None else 'unmatched')
+        RESPONSES.inc(labels + (response.status_code,))
+        if response.streaming:
+            return
+
+        render = finished - metrics.render_started if metrics.render_started is not None else 0.0
+        view_ended = metrics.render_started or finished
+        in_view = view_ended - metrics.view_started if metrics.view_started is not None else 0.0
+
+        REQUEST_SECONDS.observe(labels, total)
+        DB_SECONDS.observe(labels, metrics.db_seconds)
+        QUERIES.observe(labels, metrics.queries)
+        VIEW_SECONDS.observe(labels, max(in_view - metrics.db_seconds, 0.0))
+        RENDER_SECONDS.observe(labels, render)
+
+        budget = settings.PERFORMANCE_BUDGET
+        if metrics.queries > budget['MAX_QUERIES'] or total * 1000 > budget['MAX_MS']:
+            log_over_budget(request, labels, total, metrics)
+
+
+def log_over_budget(request, labels, total, metrics):
+    by_statement = defaultdict(lambda: [0, 0.0])
+    for sql, elapsed in metrics.statements:
+        entry = by_statement[sql]
+        entry[0] += 1
+        entry[1] += elapsed
+    worst = sorted(by_statement.items(), key=lambda item: item[1][1], reverse=True)[:10]
+    statements = '\n'.join(
+        f'  {count}x {seconds * 1000:.1f} ms  {sql}' for sql, (count, seconds) in worst
+    )
+    logger.warning(
+        'Request over budget: %s %s (%s) took %.1f ms with %d queries (%.1f ms in SQL)\n%s',
+        request.method, request.path, labels[1], total * 1000, metrics.queries,
+        metrics.db_seconds * 1000, statements,
+    )
+
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        allowed = hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        allowed = settings.DEBUG or request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.expose()
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
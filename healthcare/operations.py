@@ -0,0 +1,65 @@
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.operations import AddField
+from django.db.migrations.operations.base import Operation
+
+
+class PostgresOnly(Operation):
+    """
+    Apply the wrapped migration operation's schema change on PostgreSQL only.
+
+    The migration state is always updated, so models can declare
+    PostgreSQL-specific indexes while SQLite development databases still
+    migrate cleanly.
+    """
+    reversible = True
+    vendor = 'postgresql'
+
+    def __init__(self, operation):
+        self.operation = operation
+
+    def deconstruct(self):
+        return (self.__class__.__qualname__, [self.operation], {})
+
+    def state_forwards(self, app_label, state):
+        self.operation.state_forwards(app_label, state)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            self.operation.database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            self.operation.database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return f'{self.operation.describe()} (PostgreSQL only)'
+
+    @property
+    def migration_name_fragment(self):
+        return self.operation.migration_name_fragment
+
+
+class SQLiteOnly(PostgresOnly):
+    """Apply the wrapped operation's schema change on SQLite only."""
+    vendor = 'sqlite'
+
+    def describe(self):
+        return f'{self.operation.describe()} (SQLite only)'
+
+
+class AddFieldInPlace(AddField):
+    """
+    ``AddField`` that adds the column with ALTER TABLE on SQLite as well.
+
+    SQLite otherwise adds NOT NULL columns by rebuilding the table, which
+    recreates every index in the migration state, including the
+    PostgreSQL-only ones it cannot build. Only for fields with a constant
+    ``db_default``.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'sqlite':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            BaseDatabaseSchemaEditor.add_field(schema_editor, model, model._meta.get_field(self.name))
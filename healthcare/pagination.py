@@ -0,0 +1,132 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque-cursor pagination over a ``(timestamp, id)`` key.
+
+    Every page is a range scan that starts right after the last row of the
+    previous page, so deep pages cost the same as the first one.
+    """
+    ordering = ('created_at', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE
+        if self.page_size_query_param in request.query_params:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+            except ValueError:
+                pass
+        return max(1, min(page_size, settings.MAX_PAGE_SIZE))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.set_page([row async for row in self.get_page_queryset(queryset, request)])
+
+    def get_page_queryset(self, queryset, request):
+        """Slice of ``queryset`` holding this page plus one row to detect a next page."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        time_field, id_field = self.ordering
+
+        queryset = queryset.order_by(time_field, id_field)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            timestamp, pk = cursor
+            queryset = queryset.filter(
+                Q(**{f'{time_field}__gte': timestamp}),
+                Q(**{f'{time_field}__gt': timestamp}) | Q(**{f'{id_field}__gt': pk}),
+            )
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        time_field, id_field = self.ordering
+        last = self.page[-1]
+        if not isinstance(last, dict):
+            last = {time_field: getattr(last, time_field), id_field: getattr(last, id_field)}
+        return self.build_link([last[time_field].isoformat(), last[id_field]])
+
+    def decode_cursor(self, request):
+        position = self.read_cursor(request)
+        if position is None:
+            return None
+        try:
+            timestamp, pk = position
+            return datetime.fromisoformat(timestamp), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def build_link(self, position):
+        payload = json.dumps(position).encode()
+        cursor = base64.urlsafe_b64encode(payload).decode().rstrip('=')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def read_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            return json.loads(base64.urlsafe_b64decode(padded))
+        except (binascii.Error, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class RankedPagination(KeysetPagination):
+    """
+    Pagination for relevance-ordered results such as search.
+
+    Relevance has no stable key to seek on, so the cursor holds an offset.
+    People rarely page deep into search results, so the OFFSET stays cheap.
+    """
+
+    def get_page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.offset = self.decode_offset(request)
+        return queryset[self.offset:self.offset + self.page_size + 1]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.build_link([self.offset + self.page_size])
+
+    def decode_offset(self, request):
+        position = self.read_cursor(request)
+        if position is None:
+            return 0
+        try:
+            (offset,) = position
+            return max(0, int(offset))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
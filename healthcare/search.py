@@ -0,0 +1,41 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+SEARCH_CONFIG = 'pg_catalog.simple'
+
+
+def search_queryset(queryset, q, fields):
+    """
+    Filter ``queryset`` to rows matching ``q`` and order them by relevance.
+
+    On PostgreSQL this combines prefix full-text search on the model's
+    ``search_vector`` with typo-tolerant trigram matching on ``fields``;
+    both are served by GIN indexes. Other databases fall back to
+    ``icontains``. Either way ties are broken by id, so the offsets
+    ``RankedPagination`` pages with always see the same order.
+    """
+    terms = re.findall(r'\w+', q)
+    if not terms:
+        return queryset.none()
+
+    if connection.vendor != 'postgresql':
+        matches = reduce(or_, (Q(**{f'{field}__icontains': q}) for field in fields))
+        return queryset.filter(matches).order_by('created_at', 'id')
+
+    query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config=SEARCH_CONFIG, search_type='raw')
+    similar = reduce(or_, (Q(**{f'{field}__trigram_similar': q}) for field in fields))
+    similarity = [TrigramSimilarity(field, q) for field in fields]
+    return (
+        queryset.filter(Q(search_vector=query) | similar)
+        .annotate(
+            rank=SearchRank(F('search_vector'), query),
+            similarity=Greatest(*similarity) if len(similarity) > 1 else similarity[0],
+        )
+        .order_by('-rank', '-similarity', 'id')
+    )
@@ -0,0 +1,243 @@
+from datetime import timezone
+from operator import itemgetter
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import ISO_8601, api_settings
+
+# Distinct ?fields=/?exclude= combinations compiled per ValuesSerializer
+MAX_PROJECTIONS = 256
+
+# Fields whose ``to_representation`` returns database values from
+# ``values()`` unchanged, so they can be copied without a call. Choice
+# fields qualify as long as their choices are strings (checked below).
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+)
+
+
+def is_passthrough(field):
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        return field.pk_field is None
+    return isinstance(field, PASSTHROUGH_FIELDS)
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for rendering a ``ModelSerializer`` over many rows.
+
+    The serializer's fields are compiled once into a column list for
+    ``queryset.values()`` and a plan that turns each row dict into the same
+    dict the serializer would produce. Plain columns are copied as-is and
+    other fields go through their own ``to_representation``, except UTC
+    datetimes: those are left as ``datetime`` objects, which DRF's JSON
+    encoder (and ``FastJSONRenderer``) format exactly as ``DateTimeField``
+    would. Nested serializers become joined columns.
+    """
+
+    def __init__(self, serializer_class, fields=None, exclude=()):
+        self.serializer_class = serializer_class
+        self.fields = fields
+        self.exclude = exclude
+        self.projections = {}
+
+    @cached_property
+    def plan(self):
+        return compile_plan(select_fields(self.serializer_class(), self.fields, self.exclude))
+
+    @property
+    def columns(self):
+        return self.plan[0]
+
+    @property
+    def projection(self):
+        """``(fields, exclude)`` this serializer was narrowed to, or ``None``."""
+        return None if self.fields is None and not self.exclude else (self.fields, self.exclude)
+
+    def serializer(self, instance):
+        """The DRF serializer for ``instance``, narrowed to the same fields."""
+        return select_fields(self.serializer_class(instance), self.fields, self.exclude)
+
+    def values(self, queryset, *keep):
+        """``queryset.values()`` of the rendered columns, plus ``keep`` (e.g. a pagination key)."""
+        return queryset.values(*dict.fromkeys([*self.columns, *keep]))
+
+    def project(self, request):
+        """
+        This serializer narrowed to the request's ``?fields=`` and
+        ``?exclude=``, so unrequested columns are not even selected.
+        """
+        key = projection(request)
+        if key is None:
+            return self
+        projected = self.projections.get(key)
+        if projected is None:
+            projected = ValuesSerializer(self.serializer_class, *key)
+            projected.columns  # compile now, so unknown fields raise before anything is cached
+            if len(self.projections) >= MAX_PROJECTIONS:
+                self.projections.clear()
+            self.projections[key] = projected
+        return projected
+
+    def to_representation(self, rows):
+        build = self.plan[1]()
+        return [build(row) for row in rows]
+
+
+def datetime_representation(field):
+    """
+    ``DateTimeField.to_representation`` for ISO 8601 output, with the time
+    zone resolved once rather than per value. Anything unusual (naive
+    values, overflow) is left to the field itself.
+
+    When both the value and the output zone are UTC the value is returned
+    as is: converting would not change it and the JSON encoder formats it
+    much faster than ``isoformat()`` does here.
+    """
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return lambda: field.to_representation
+
+    def bind():
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if field_timezone is None:
+            return field.to_representation
+        utc_output = field_timezone is timezone.utc or getattr(field_timezone, 'key', None) == 'UTC'
+
+        def to_representation(value):
+            if utc_output and value.tzinfo is timezone.utc:
+                return value
+            if isinstance(value, str) or value.utcoffset() is None:
+                return field.to_representation(value)
+            try:
+                value = value.astimezone(field_timezone).isoformat()
+            except OverflowError:
+                return field.to_representation(value)
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return to_representation
+    return bind
+
+
+def compile_plan(serializer, prefix=''):
+    """
+    Return ``(columns, bind)`` for ``serializer``'s readable fields.
+
+    ``bind()`` returns the function that builds one row's dict; it is called
+    once per batch so per-request state such as the time zone is read once.
+    """
+    columns, keys, sources, converters, nested = [], [], [], [], []
+
+    for field in serializer._readable_fields:
+        if field.source == '*' or '.' in field.source:
+            raise ImproperlyConfigured(f'{field.field_name!r} has no column to read from.')
+        column = prefix + field.source
+        keys.append(field.field_name)
+
+        if isinstance(field, serializers.BaseSerializer):
+            if isinstance(field, serializers.ListSerializer):
+                raise ImproperlyConfigured(f'{field.field_name!r} is a to-many relation.')
+            sub_columns, sub_bind = compile_plan(field, column + '__')
+            # The foreign key column tells a missing related row apart.
+            columns.append(column)
+            columns += sub_columns
+            sources.append(column)
+            nested.append((field.field_name, sub_bind))
+            continue
+
+        if isinstance(field, serializers.ManyRelatedField):
+            raise ImproperlyConfigured(f'{field.field_name!r} is a to-many relation.')
+        if isinstance(field, serializers.ChoiceField) and any(
+            key != str(key) for key in field.choices
+        ):
+            raise ImproperlyConfigured(f'{field.field_name!r} has non-string choices.')
+
+        columns.append(column)
+        sources.append(column)
+        if isinstance(field, serializers.DateTimeField):
+            converters.append((field.field_name, datetime_representation(field)))
+        elif not is_passthrough(field):
+            converters.append((field.field_name, lambda field=field: field.to_representation))
+
+    if len(sources) > 1:
+        getter = itemgetter(*sources)
+    else:
+        getter = lambda row: tuple(row[source] for source in sources)  # noqa: E731
+
+    def bind():
+        bound = [(key, bind_converter()) for key, bind_converter in converters]
+        bound_nested = [(key, sub_bind()) for key, sub_bind in nested]
+
+        def build(row):
+            data = dict(zip(keys, getter(row)))
+            for key, to_representation in bound:
+                value = data[key]
+                if value is not None:
+                    data[key] = to_representation(value)
+            for key, sub_build in bound_nested:
+                if data[key] is not None:
+                    data[key] = sub_build(row)
+            return data
+        return build
+
+    return list(dict.fromkeys(columns)), bind
+
+
+def projection(request):
+    """
+    ``(fields, exclude)`` from the ``?fields=`` and ``?exclude=`` query
+    parameters, or ``None`` without either. Both are sorted tuples of field
+    names, with dots for nested fields (``patient.name``); ``fields`` is
+    ``None`` when not given.
+    """
+    params = getattr(request, 'query_params', request.GET)
+
+    def paths(name):
+        return tuple(sorted({path.strip() for path in params.get(name, '').split(',') if path.strip()}))
+
+    fields, exclude = paths('fields') or None, paths('exclude')
+    if fields is None and not exclude:
+        return None
+    return fields, exclude
+
+
+def split_paths(paths):
+    """``{name: nested paths}`` for dotted ``paths``; ``None`` selects the whole field."""
+    heads = {}
+    for path in paths:
+        head, _, rest = path.partition('.')
+        if not rest:
+            heads[head] = None
+        elif heads.get(head, ()) is not None:
+            heads.setdefault(head, set()).add(rest)
+    return heads
+
+
+def select_fields(serializer, fields=None, exclude=(), prefix=''):
+    """
+    Remove the fields of ``serializer`` (in place, nested serializers
+    included) that ``fields`` does not select or ``exclude`` drops, and
+    return it. Unknown names are a ``ValidationError``.
+    """
+    wanted = split_paths(fields) if fields is not None else None
+    unwanted = split_paths(exclude)
+    for param, names in (('fields', wanted or {}), ('exclude', unwanted)):
+        for name, rest in names.items():
+            field = serializer.fields.get(name)
+            if field is None or (rest and not isinstance(field, serializers.BaseSerializer)):
+                path = f'{prefix}{name}.{sorted(rest)[0]}' if field is not None else f'{prefix}{name}'
+                raise ValidationError({param: [f'Unknown field: {path}.']})
+
+    for name, field in list(serializer.fields.items()):
+        if (wanted is not None and name not in wanted) or (name in unwanted and unwanted[name] is None):
+            del serializer.fields[name]
+            continue
+        nested_fields = wanted.get(name) if wanted is not None else None
+        nested_exclude = unwanted.get(name) or ()
+        if nested_fields or nested_exclude:
+            select_fields(field, nested_fields, nested_exclude, f'{prefix}{name}.')
+    return serializer
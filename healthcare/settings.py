@@ -1,6 +1,8 @@
+import os
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -19,6 +21,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third party
     'rest_framework',
@@ -29,10 +32,14 @@ INSTALLED_APPS = [
     'patients',
     'doctors',
     'mappings',
+    'stats',
+    'sync',
+    'events',
     'frontend',
 ]
 
 MIDDLEWARE = [
+    'healthcare.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,6 +71,18 @@ WSGI_APPLICATION = 'healthcare.wsgi.application'
 
 # Database - PostgreSQL
 
+# healthcare/wsgi.py and healthcare/asgi.py set DJANGO_SERVER_INTERFACE
+# before loading the settings. A WSGI worker serves one request per thread
+# at a time, so it keeps its connection for 60 seconds by default. Under
+# ASGI, sync code runs in a thread pool and each thread would hold its own
+# connection, so Django advises against persistent connections there and
+# they are refused; use the pool or PgBouncer. Anything else (runserver,
+# management commands, tests) reconnects unless DB_CONN_MAX_AGE is set.
+SERVER_INTERFACE = os.environ.get('DJANGO_SERVER_INTERFACE')
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60 if SERVER_INTERFACE == 'wsgi' else 0, cast=int)
+if SERVER_INTERFACE == 'asgi' and DB_CONN_MAX_AGE:
+    raise ImproperlyConfigured('DB_CONN_MAX_AGE must be 0 under ASGI; set DB_POOL=True instead.')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -72,9 +91,26 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Reuse a worker's connection across requests for this many seconds
+        # (0 reconnects for every request), checking it is still alive
+        # before a request reuses it.
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'OPTIONS': {},
     }
 }
 
+# Alternatively, a psycopg 3 connection pool per worker process, shared by
+# its threads (needs `pip install "psycopg[binary,pool]"`). Django requires
+# CONN_MAX_AGE 0 with a pool.
+if config('DB_POOL', default=False, cast=bool):
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+    }
+
 
 # Password validation
 
@@ -93,6 +129,32 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# PASSWORD_HASHER picks the algorithm for new hashes (pbkdf2, argon2 or
+# bcrypt; argon2 needs argon2-cffi, bcrypt needs bcrypt). The others still
+# verify old hashes, which are upgraded on the user's next login.
+PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'accounts.hashers.TunedPBKDF2PasswordHasher',
+    'argon2': 'accounts.hashers.TunedArgon2PasswordHasher',
+    'bcrypt': 'accounts.hashers.TunedBCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2')
+if PASSWORD_HASHER not in PASSWORD_HASHER_CLASSES:
+    raise ImproperlyConfigured(
+        f'PASSWORD_HASHER must be one of: {", ".join(PASSWORD_HASHER_CLASSES)} (got {PASSWORD_HASHER!r}).'
+    )
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+]
+
+# Hashing cost; defaults match Django's. Raising it slows every login.
+PASSWORD_HASH_COST = {
+    'PBKDF2_ITERATIONS': config('PBKDF2_ITERATIONS', default=1_000_000, cast=int),
+    'ARGON2_TIME_COST': config('ARGON2_TIME_COST', default=2, cast=int),
+    'ARGON2_MEMORY_COST': config('ARGON2_MEMORY_COST', default=102400, cast=int),
+    'ARGON2_PARALLELISM': config('ARGON2_PARALLELISM', default=8, cast=int),
+    'BCRYPT_ROUNDS': config('BCRYPT_ROUNDS', default=12, cast=int),
+}
+
 
 # Internationalization
 
@@ -113,13 +175,84 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'healthcare.pagination.KeysetPagination',
+    'PAGE_SIZE': config('API_PAGE_SIZE', default=50, cast=int),
+    # Login attempts: token buckets per client IP and per email address
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('LOGIN_IP_RATE', default='20/min'),
+        'login_email': config('LOGIN_EMAIL_RATE', default='5/min'),
+    },
+}
+
+MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=500, cast=int)
+
+# Maximum rows returned by the /lookup/ autocomplete endpoints
+LOOKUP_LIMIT = config('LOOKUP_LIMIT', default=20, cast=int)
+
+# Bulk endpoints: items accepted per request and rows per INSERT/UPDATE
+BULK_MAX_ITEMS = config('BULK_MAX_ITEMS', default=5000, cast=int)
+BULK_BATCH_SIZE = config('BULK_BATCH_SIZE', default=500, cast=int)
+
+# When on, deleting a patient or doctor only stamps deleted_at and the row
+# (with any patient data) stays until purge_deleted removes it; off deletes
+# at once, as the API always did.
+SOFT_DELETE = config('SOFT_DELETE', default=False, cast=bool)
+
+# Hash partitions of the patients table by owner, created by migrations on
+# PostgreSQL; 0 keeps one table. Existing tables: manage.py partition_patients
+PATIENT_PARTITIONS = config('PATIENT_PARTITIONS', default=0, cast=int)
+
+# /api/sync/: changes returned per model per request, and how long a sync
+# token stays valid. purge_deleted keeps deletions at least this long.
+SYNC_PAGE_SIZE = config('SYNC_PAGE_SIZE', default=500, cast=int)
+SYNC_TOKEN_MAX_DAYS = config('SYNC_TOKEN_MAX_DAYS', default=7, cast=int)
+
+# Change stream at /api/events/ (ASGI only). LocalBroker reaches the streams
+# of the same worker process only; see events.broker for other brokers.
+# QUEUE_SIZE bounds the events buffered per stream before it must reload.
+EVENT_STREAM = {
+    'BROKER': config('EVENT_BROKER', default='events.broker.LocalBroker'),
+    'QUEUE_SIZE': config('EVENT_QUEUE_SIZE', default=1000, cast=int),
+    'HEARTBEAT': config('EVENT_HEARTBEAT', default=15, cast=int),
+}
+
+# Rows fetched per server-side cursor round trip by the export endpoints
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Doctor directory cache; TIMEOUT 0 disables it. Use
+# doctors.cache.DjangoCacheBackend to share entries through CACHES[CACHE_ALIAS].
+DOCTOR_CACHE = {
+    'BACKEND': config('DOCTOR_CACHE_BACKEND', default='doctors.cache.LocalLRUBackend'),
+    'TIMEOUT': config('DOCTOR_CACHE_TIMEOUT', default=60, cast=int),
+    'MAX_ENTRIES': config('DOCTOR_CACHE_MAX_ENTRIES', default=1000, cast=int),
+    'CACHE_ALIAS': config('DOCTOR_CACHE_ALIAS', default='default'),
 }
 
+# Users resolved from JWTs, cached per worker; TIMEOUT 0 disables the cache.
+# Other workers see deactivations and password changes within TIMEOUT seconds.
+AUTH_USER_CACHE = {
+    'TIMEOUT': config('AUTH_USER_CACHE_TIMEOUT', default=30, cast=int),
+    'MAX_ENTRIES': config('AUTH_USER_CACHE_MAX_ENTRIES', default=10000, cast=int),
+}
+
+# Requests over either limit are logged with their SQL (healthcare.metrics)
+PERFORMANCE_BUDGET = {
+    'MAX_QUERIES': config('BUDGET_MAX_QUERIES', default=20, cast=int),
+    'MAX_MS': config('BUDGET_MAX_MS', default=500, cast=int),
+}
+
+# When set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>";
+# otherwise a staff session, unless DEBUG is on
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Seconds to cache per-user dashboard counts; 0 disables caching
+STATS_CACHE_TIMEOUT = config('STATS_CACHE_TIMEOUT', default=0, cast=int)
+
 
 # JWT settings
 
@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# bulk_create/bulk_update and plain SQL deletes skip post_save and
+# post_delete, so listeners that keep derived data fresh (caches, counters,
+# the change stream) subscribe to this instead. Deletes pass the ids they
+# removed as ``deleted``.
+bulk_write = Signal()
@@ -0,0 +1,79 @@
+"""
+Soft deletion for patients and doctors.
+
+With ``SOFT_DELETE`` on (off by default), deleting a patient or doctor through
+the API only stamps ``deleted_at``; nothing is loaded or cascaded in the
+request. The default ``objects`` manager hides those rows, and
+``all_objects`` still sees them. ``manage.py purge_deleted`` removes them
+for good later, in small batches.
+
+With it off, ``hard_delete`` removes them with plain SQL at once.
+"""
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from .signals import bulk_write
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def soft_delete(self):
+        now = timezone.now()
+        return self.update(deleted_at=now, updated_at=now)
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+def soft_deletes(model):
+    return settings.SOFT_DELETE and isinstance(model._default_manager, SoftDeleteManager)
+
+
+def delete_rows(model, column, values):
+    """
+    ``DELETE FROM <model's table> WHERE column IN values``, returning the row
+    count. Plain SQL skips Django's delete collector, which would load every
+    row and its relations first.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(column)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DELETE FROM {table} WHERE {column} = ANY(%s)', [list(values)])
+        else:
+            placeholders = ', '.join(['%s'] * len(values))
+            cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({placeholders})', list(values))
+        return cursor.rowcount
+
+
+def hard_delete(model, pks):
+    """
+    Delete ``model``'s rows ``pks`` and the rows that cascade from them.
+
+    PostgreSQL cascades to mappings itself (ON DELETE CASCADE, or the
+    triggers of a partitioned patients table); other databases have them
+    deleted here first. Nothing is loaded and no per-row signals are sent:
+    listeners hear one ``bulk_write`` with the deleted ids.
+    """
+    pks = list(pks)
+    if not pks:
+        return 0
+    with transaction.atomic():
+        if connection.vendor != 'postgresql':
+            for rel in model._meta.related_objects:
+                if rel.one_to_many and rel.on_delete is models.CASCADE:
+                    delete_rows(rel.related_model, rel.field.column, pks)
+        deleted = delete_rows(model, 'id', pks)
+    bulk_write.send(sender=model, deleted=pks)
+    return deleted
+
+
+def delete_object(instance):
+    if soft_deletes(type(instance)):
+        instance.deleted_at = timezone.now()
+        # post_save keeps caches and stats in step, as for any other edit
+        instance.save(update_fields=['deleted_at', 'updated_at'])
+    else:
+        hard_delete(type(instance), [instance.pk])
@@ -0,0 +1,68 @@
+"""Fixtures and assertions shared by the apps' ``tests.py`` modules."""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from doctors.models import Doctor
+from mappings.models import PatientDoctorMapping
+from patients.models import Patient
+
+
+def make_user(username='owner'):
+    return User.objects.create_user(username, f'{username}@example.com', 'Secret@1234')
+
+
+def make_patients(user, count, start=0):
+    return Patient.objects.bulk_create(
+        Patient(created_by=user, name=f'Patient {start + i}', age=30 + i % 50, gender='Female',
+                phone=f'555{start + i:07d}', address='1 Main St', medical_history='None')
+        for i in range(count)
+    )
+
+
+def make_doctors(user, count, start=0):
+    return Doctor.objects.bulk_create(
+        Doctor(created_by=user, name=f'Doctor {start + i}', specialization='Cardiology',
+               email=f'doctor{start + i}@example.com')
+        for i in range(count)
+    )
+
+
+def assign(patients, doctors):
+    return PatientDoctorMapping.objects.bulk_create(
+        PatientDoctorMapping(patient=patient, doctor=doctor) for patient in patients for doctor in doctors
+    )
+
+
+class AuthenticatedTestCase(APITestCase):
+    """An authenticated client for a fresh user."""
+
+    def setUp(self):
+        self.user = make_user()
+        self.client.force_authenticate(self.user)
+
+
+class QueryCountTestCase(AuthenticatedTestCase):
+    """
+    List endpoints must run a fixed number of queries per page, however
+    many rows the page holds: per-row queries show up as a higher count
+    once the rows grow tenfold.
+    """
+    rows = 5
+
+    def assertConstantQueries(self, url, add_rows):
+        """
+        Request ``url`` after ``add_rows(n)`` created ``rows`` rows, then
+        again with ten times as many, and require the same query count.
+        """
+        add_rows(self.rows)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        add_rows(self.rows * 9)
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response
@@ -0,0 +1,225 @@
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from doctors.models import Doctor
+from doctors.serializers import DoctorSerializer, doctor_values
+from mappings.models import MappingListing, PatientDoctorMapping
+from mappings.serializers import (
+    DoctorPatientSerializer, MappingCompactSerializer, MappingDetailSerializer,
+    doctor_patient_values, mapping_compact_values, mapping_values,
+)
+from patients.models import Patient
+from patients.serializers import PatientSerializer, patient_values
+
+from .importer import read_records
+from .metrics import DB_SECONDS, QUERIES, REQUEST_SECONDS, RESPONSES
+from .renderers import FastJSONRenderer
+from .serializers import ValuesSerializer
+from .testing import AuthenticatedTestCase, assign, make_doctors, make_patients, make_user
+
+# Aware UTC with and without microseconds, other zones and naive values
+DATETIMES = [
+    datetime(2024, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    datetime(2024, 1, 1, 12, 30, 15, tzinfo=timezone.utc),
+    datetime(2024, 3, 10, 23, 59, 59, 999999, tzinfo=ZoneInfo('Asia/Kolkata')),
+    datetime(2024, 7, 4, 6, 0, tzinfo=ZoneInfo('America/New_York')),
+    datetime(2024, 11, 3, 1, 30, tzinfo=timezone(timedelta(hours=-3, minutes=-30))),
+    datetime(2024, 5, 5, 5, 5, 5, 5),
+    datetime(2024, 5, 5, 5, 5, 5),
+]
+GENDERS = ['Male', 'Female', 'Other']
+
+
+def fake_patient(i):
+    stamp = DATETIMES[i % len(DATETIMES)]
+    return Patient(
+        id=i, name=f'Patient "{i}" é', age=i, gender=GENDERS[i % 3],
+        phone=None if i % 2 else f'555{i:07d}', address=None if i % 3 else 'Line 1\nLine 2',
+        medical_history=None, created_at=stamp, updated_at=DATETIMES[(i + 1) % len(DATETIMES)],
+    )
+
+
+def fake_doctor(i):
+    stamp = DATETIMES[(i + 2) % len(DATETIMES)]
+    return Doctor(
+        id=i, name=f'Doctor {i}', specialization='Cardiology', phone=None if i % 2 else '555',
+        email=None if i % 3 else f'doctor{i}@example.com', experience_years=i % 40,
+        created_at=stamp, updated_at=stamp,
+    )
+
+
+def fake_mapping(i):
+    return PatientDoctorMapping(
+        id=i, patient=fake_patient(i), doctor=fake_doctor(i), assigned_at=DATETIMES[(i + 3) % len(DATETIMES)],
+    )
+
+
+def fake_listing(i):
+    mapping = fake_mapping(i)
+    return MappingListing(
+        id=i, patient=mapping.patient, patient_name=mapping.patient.name, doctor=mapping.doctor,
+        doctor_name=mapping.doctor.name, doctor_specialization=mapping.doctor.specialization,
+        assigned_at=mapping.assigned_at, updated_at=mapping.assigned_at,
+    )
+
+
+def as_row(instance, columns):
+    """The dict ``queryset.values(*columns)`` would return for ``instance``."""
+    row = {}
+    for column in columns:
+        *path, name = column.split('__')
+        obj = instance
+        for step in path:
+            obj = getattr(obj, step)
+        row[column] = getattr(obj, obj._meta.get_field(name).attname)
+    return row
+
+
+class FastPathContractTests(SimpleTestCase):
+    """
+    The ``values()`` fast path (``ValuesSerializer`` + ``FastJSONRenderer``)
+    must render list bodies byte for byte as DRF's serializers and
+    ``JSONRenderer`` do.
+    """
+    cases = [
+        ('patients', fake_patient, PatientSerializer, patient_values),
+        ('doctors', fake_doctor, DoctorSerializer, doctor_values),
+        ('mappings', fake_mapping, MappingDetailSerializer, mapping_values),
+        ('doctor patients', fake_mapping, DoctorPatientSerializer, doctor_patient_values),
+        ('compact mappings', fake_listing, MappingCompactSerializer, mapping_compact_values),
+        ('projection', fake_mapping, MappingDetailSerializer,
+         ValuesSerializer(MappingDetailSerializer, ('id', 'patient.name', 'patient.phone', 'doctor.updated_at'))),
+        ('exclusion', fake_patient, PatientSerializer, ValuesSerializer(PatientSerializer, None, ('address',))),
+    ]
+
+    def assertRendersLikeDRF(self):
+        for name, factory, serializer_class, values in self.cases:
+            with self.subTest(name):
+                instances = [factory(i) for i in range(1, 3 * len(DATETIMES) + 1)]
+                if values.projection is None:
+                    data = serializer_class(instances, many=True).data
+                else:
+                    data = [values.serializer(instance).data for instance in instances]
+                rows = [as_row(instance, values.columns) for instance in instances]
+                body = FastJSONRenderer().render(values.to_representation(rows))
+                self.assertEqual(body, JSONRenderer().render(data))
+
+    def test_utc(self):
+        self.assertRendersLikeDRF()
+
+    @override_settings(TIME_ZONE='Asia/Kolkata')
+    def test_non_utc_time_zone(self):
+        self.assertRendersLikeDRF()
+
+
+class FastPathDatabaseContractTests(TestCase):
+    """The same check on rows read back from the database."""
+
+    def test_lists(self):
+        user = make_user()
+        patients = make_patients(user, 3)
+        Patient.objects.filter(pk=patients[0].pk).update(phone=None, address=None, medical_history=None)
+        doctors = make_doctors(user, 2)
+        Doctor.objects.filter(pk=doctors[0].pk).update(phone=None, email=None)
+        assign(patients, doctors)
+
+        cases = [
+            (Patient.objects.order_by('id'), PatientSerializer, patient_values),
+            (Doctor.objects.order_by('id'), DoctorSerializer, doctor_values),
+            (PatientDoctorMapping.objects.order_by('id'), MappingDetailSerializer, mapping_values),
+            (PatientDoctorMapping.objects.order_by('id'), DoctorPatientSerializer, doctor_patient_values),
+        ]
+        for queryset, serializer_class, values in cases:
+            with self.subTest(serializer_class.__name__):
+                expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+                body = FastJSONRenderer().render(values.to_representation(values.values(queryset)))
+                self.assertEqual(body, expected)
+
+
+class ReadRecordsTests(SimpleTestCase):
+    def read(self, content, file_format):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / f'records.{file_format}'
+            path.write_bytes(content)
+            return [(line, record, error) for line, record, error, _ in read_records(path, file_format)]
+
+    def test_invalid_utf8_line_is_rejected_alone(self):
+        records = self.read(b'{"name": "A"}\n{"name": "B\xff"}\n[1]\n{"name": "\xc3\xa9"}\n', 'ndjson')
+        self.assertEqual(records, [
+            (1, {'name': 'A'}, None),
+            (2, None, 'Invalid UTF-8 at byte 12 of line 2.'),
+            (3, None, 'Expected a JSON object.'),
+            (4, {'name': '\xe9'}, None),
+        ])
+
+    def test_invalid_utf8_csv_record_is_rejected_alone(self):
+        records = self.read(b'name,age\nA,1\n"B\xff\nb",2\nC\n\xc3\xa9,4\n', 'csv')
+        self.assertEqual(records, [
+            (2, {'name': 'A', 'age': '1'}, None),
+            (4, None, 'Invalid UTF-8 at byte 3 of line 3.'),
+            (5, None, 'Expected 2 columns, got 1.'),
+            (6, {'name': '\xe9', 'age': '4'}, None),
+        ])
+
+
+def observed(histogram, labels):
+    """``(observations, sum)`` of ``histogram`` for ``labels``."""
+    counts, total = histogram._series.get(labels, ([0], 0.0))
+    return sum(counts), total
+
+
+class MetricsTests(AuthenticatedTestCase):
+    labels = ('GET', 'api/patients/')
+
+    def setUp(self):
+        super().setUp()
+        make_patients(self.user, 3)
+
+    def test_records_queries_and_db_time(self):
+        queries_before, db_before = observed(QUERIES, self.labels), observed(DB_SECONDS, self.labels)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/patients/')
+
+        count, total = observed(QUERIES, self.labels)
+        self.assertEqual(count, queries_before[0] + 1)
+        self.assertEqual(total - queries_before[1], len(queries))
+        count, seconds = observed(DB_SECONDS, self.labels)
+        self.assertEqual(count, db_before[0] + 1)
+        self.assertGreater(seconds, db_before[1])
+
+    @override_settings(PERFORMANCE_BUDGET={'MAX_QUERIES': 1, 'MAX_MS': 60_000})
+    def test_over_budget_requests_are_logged(self):
+        with self.assertLogs('healthcare.metrics', 'WARNING') as logs:
+            self.client.get('/api/patients/')
+        self.assertIn('Request over budget: GET /api/patients/ (api/patients/)', logs.output[0])
+        self.assertIn('FROM "patients_patient"', logs.output[0])
+        # Placeholders, not parameters
+        self.assertIn('"created_by_id" = %s', logs.output[0])
+
+    def test_streaming_responses_are_only_counted(self):
+        labels = ('GET', 'api/patients/export/')
+        before = observed(REQUEST_SECONDS, labels)
+        b''.join(self.client.get('/api/patients/export/').streaming_content)
+        self.assertEqual(observed(REQUEST_SECONDS, labels), before)
+        self.assertGreater(RESPONSES._values[labels + (200,)], 0)
+
+    def test_metrics_access(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+        with self.settings(METRICS_TOKEN='s3cret'):
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'# TYPE http_request_view_seconds histogram', response.content)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
@@ -1,11 +1,18 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from .metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('accounts.urls')),
     path('api/patients/', include('patients.urls')),
     path('api/doctors/', include('doctors.urls')),
     path('api/mappings/', include('mappings.urls')),
+    path('api/stats/', include('stats.urls')),
+    path('api/sync/', include('sync.urls')),
+    path('api/events/', include('events.urls')),
+    path('api/async/', include('healthcare.async_urls')),
+    path('metrics', metrics_view, name='metrics'),
     path('', include('frontend.urls')),
 ]
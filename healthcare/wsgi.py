@@ -12,5 +12,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'healthcare.settings')
+# Selects the default database connection lifetime in settings
+os.environ['DJANGO_SERVER_INTERFACE'] = 'wsgi'
 
 application = get_wsgi_application()
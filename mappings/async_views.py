@@ -0,0 +1,27 @@
+from rest_framework.request import Request
+
+from healthcare.async_api import async_api_view, render_json
+from healthcare.conditional import acollection_etag, check_preconditions
+from .models import PatientDoctorMapping
+from .serializers import mapping_compact_values, mapping_values
+from .views import MAPPING_TIMESTAMPS, MappingPagination, compact_listing
+
+
+@async_api_view
+async def mapping_list(request):
+    if request.GET.get('view') == 'compact':
+        values = mapping_compact_values.project(request)
+        mappings, timestamps, rows = compact_listing(values)
+    else:
+        values = mapping_values.project(request)
+        mappings, timestamps = PatientDoctorMapping.objects.all(), MAPPING_TIMESTAMPS
+        rows = values.values(mappings, *MappingPagination.ordering)
+    etag = await acollection_etag(request, mappings, *timestamps)
+    response = check_preconditions(request, etag)
+    if response is not None:
+        return response
+
+    paginator = MappingPagination()
+    page = await paginator.apaginate_queryset(rows, Request(request))
+    data = paginator.get_paginated_response(values.to_representation(page)).data
+    return render_json(data, headers={'ETag': etag})
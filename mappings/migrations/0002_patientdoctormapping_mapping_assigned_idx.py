@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0002_doctor_doctor_created_idx'),
+        ('mappings', '0001_initial'),
+        ('patients', '0002_patient_patient_owner_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patientdoctormapping',
+            index=models.Index(fields=['assigned_at', 'id'], name='mapping_assigned_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0003_search'),
+        ('mappings', '0002_patientdoctormapping_mapping_assigned_idx'),
+        ('patients', '0004_query_pattern_indexes'),
+    ]
+
+    operations = [
+        # Build the replacement index before dropping the FK index it covers.
+        migrations.AddIndex(
+            model_name='patientdoctormapping',
+            index=models.Index(fields=['doctor', 'assigned_at', 'id'], include=('patient',), name='mapping_doctor_assigned_idx'),
+        ),
+        migrations.AlterField(
+            model_name='patientdoctormapping',
+            name='doctor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='patient_mappings', to='doctors.doctor'),
+        ),
+        migrations.AlterField(
+            model_name='patientdoctormapping',
+            name='patient',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='doctor_mappings', to='patients.patient'),
+        ),
+    ]
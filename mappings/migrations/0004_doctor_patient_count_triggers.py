@@ -0,0 +1,70 @@
+from django.db import migrations
+
+from healthcare.operations import PostgresOnly
+
+# Statement-level triggers read the affected rows from transition tables, so
+# a bulk insert or cascade updates each doctor once, in a single GROUP BY.
+SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION doctor_patient_count_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE doctors_doctor AS d SET patient_count = d.patient_count + c.n
+        FROM (SELECT doctor_id, count(*) AS n FROM new_rows GROUP BY doctor_id) AS c
+        WHERE d.id = c.doctor_id;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE doctors_doctor AS d SET patient_count = d.patient_count - c.n
+        FROM (SELECT doctor_id, count(*) AS n FROM old_rows GROUP BY doctor_id) AS c
+        WHERE d.id = c.doctor_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0005_patient_count'),
+        ('mappings', '0003_query_pattern_indexes'),
+    ]
+
+    operations = [
+        PostgresOnly(migrations.RunSQL(
+            sql=[
+                SYNC_FUNCTION,
+                """
+                CREATE TRIGGER doctor_patient_count_insert
+                AFTER INSERT ON mappings_patientdoctormapping
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION doctor_patient_count_sync()
+                """,
+                """
+                CREATE TRIGGER doctor_patient_count_update
+                AFTER UPDATE ON mappings_patientdoctormapping
+                REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION doctor_patient_count_sync()
+                """,
+                """
+                CREATE TRIGGER doctor_patient_count_delete
+                AFTER DELETE ON mappings_patientdoctormapping
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION doctor_patient_count_sync()
+                """,
+                """
+                UPDATE doctors_doctor AS d SET patient_count = c.n
+                FROM (
+                    SELECT doctor_id, count(*) AS n FROM mappings_patientdoctormapping GROUP BY doctor_id
+                ) AS c
+                WHERE d.id = c.doctor_id
+                """,
+            ],
+            reverse_sql=[
+                "DROP TRIGGER IF EXISTS doctor_patient_count_insert ON mappings_patientdoctormapping",
+                "DROP TRIGGER IF EXISTS doctor_patient_count_update ON mappings_patientdoctormapping",
+                "DROP TRIGGER IF EXISTS doctor_patient_count_delete ON mappings_patientdoctormapping",
+                "DROP FUNCTION IF EXISTS doctor_patient_count_sync()",
+            ],
+        )),
+    ]
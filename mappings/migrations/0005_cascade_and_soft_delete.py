@@ -0,0 +1,121 @@
+from importlib import import_module
+
+from django.db import migrations
+
+from healthcare.operations import PostgresOnly
+
+PREVIOUS = import_module('mappings.migrations.0004_doctor_patient_count_triggers')
+
+# Let PostgreSQL cascade deletes to mappings itself, so purge_deleted can
+# remove patients and doctors without Django loading their mappings first.
+CASCADE_FOREIGN_KEYS = [
+    """
+    DO $$
+    DECLARE
+        fk text;
+    BEGIN
+        FOR fk IN
+            SELECT conname FROM pg_constraint
+            WHERE conrelid = 'mappings_patientdoctormapping'::regclass AND contype = 'f'
+        LOOP
+            EXECUTE format('ALTER TABLE mappings_patientdoctormapping DROP CONSTRAINT %I', fk);
+        END LOOP;
+    END $$
+    """,
+    """
+    ALTER TABLE mappings_patientdoctormapping
+    ADD CONSTRAINT mapping_patient_cascade_fk FOREIGN KEY (patient_id)
+    REFERENCES patients_patient (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED
+    """,
+    """
+    ALTER TABLE mappings_patientdoctormapping
+    ADD CONSTRAINT mapping_doctor_cascade_fk FOREIGN KEY (doctor_id)
+    REFERENCES doctors_doctor (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED
+    """,
+]
+
+RESTRICT_FOREIGN_KEYS = [
+    "ALTER TABLE mappings_patientdoctormapping DROP CONSTRAINT mapping_patient_cascade_fk",
+    "ALTER TABLE mappings_patientdoctormapping DROP CONSTRAINT mapping_doctor_cascade_fk",
+    """
+    ALTER TABLE mappings_patientdoctormapping
+    ADD CONSTRAINT mapping_patient_fk FOREIGN KEY (patient_id)
+    REFERENCES patients_patient (id) DEFERRABLE INITIALLY DEFERRED
+    """,
+    """
+    ALTER TABLE mappings_patientdoctormapping
+    ADD CONSTRAINT mapping_doctor_fk FOREIGN KEY (doctor_id)
+    REFERENCES doctors_doctor (id) DEFERRABLE INITIALLY DEFERRED
+    """,
+]
+
+# Doctor.patient_count now counts live patients only: mappings of a
+# soft-deleted patient leave the count when the patient is deleted, and are
+# skipped when they are purged later (or cascaded away with the patient).
+SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION doctor_patient_count_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE doctors_doctor AS d SET patient_count = d.patient_count + c.n
+        FROM (
+            SELECT m.doctor_id, count(*) AS n FROM new_rows AS m
+            JOIN patients_patient AS p ON p.id = m.patient_id AND p.deleted_at IS NULL
+            GROUP BY m.doctor_id
+        ) AS c
+        WHERE d.id = c.doctor_id;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE doctors_doctor AS d SET patient_count = d.patient_count - c.n
+        FROM (
+            SELECT m.doctor_id, count(*) AS n FROM old_rows AS m
+            JOIN patients_patient AS p ON p.id = m.patient_id AND p.deleted_at IS NULL
+            GROUP BY m.doctor_id
+        ) AS c
+        WHERE d.id = c.doctor_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+PATIENT_DELETED_FUNCTION = """
+CREATE OR REPLACE FUNCTION patient_deleted_patient_count_sync() RETURNS trigger AS $$
+BEGIN
+    UPDATE doctors_doctor AS d
+    SET patient_count = d.patient_count + CASE WHEN NEW.deleted_at IS NULL THEN 1 ELSE -1 END
+    FROM mappings_patientdoctormapping AS m
+    WHERE m.patient_id = NEW.id AND d.id = m.doctor_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0006_soft_delete'),
+        ('mappings', '0004_doctor_patient_count_triggers'),
+        ('patients', '0006_soft_delete'),
+    ]
+
+    operations = [
+        PostgresOnly(migrations.RunSQL(sql=CASCADE_FOREIGN_KEYS, reverse_sql=RESTRICT_FOREIGN_KEYS)),
+        PostgresOnly(migrations.RunSQL(
+            sql=[
+                SYNC_FUNCTION,
+                PATIENT_DELETED_FUNCTION,
+                """
+                CREATE TRIGGER patient_deleted_patient_count
+                AFTER UPDATE OF deleted_at ON patients_patient
+                FOR EACH ROW WHEN ((OLD.deleted_at IS NULL) <> (NEW.deleted_at IS NULL))
+                EXECUTE FUNCTION patient_deleted_patient_count_sync()
+                """,
+            ],
+            reverse_sql=[
+                "DROP TRIGGER IF EXISTS patient_deleted_patient_count ON patients_patient",
+                "DROP FUNCTION IF EXISTS patient_deleted_patient_count_sync()",
+                PREVIOUS.SYNC_FUNCTION,
+            ],
+        )),
+    ]
@@ -0,0 +1,144 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from healthcare.operations import PostgresOnly
+
+# Rows for live assignments: both the patient and the doctor not deleted.
+LISTING_ROWS = """SELECT m.id, m.patient_id, p.name, m.doctor_id, d.name, d.specialization, m.assigned_at, now()
+FROM {mappings} AS m
+JOIN patients_patient AS p ON p.id = m.patient_id AND p.deleted_at IS NULL
+JOIN doctors_doctor AS d ON d.id = m.doctor_id AND d.deleted_at IS NULL"""
+
+INSERT_LISTING = """INSERT INTO mappings_mappinglisting
+    (id, patient_id, patient_name, doctor_id, doctor_name, doctor_specialization, assigned_at, updated_at)
+""" + LISTING_ROWS
+
+MAPPING_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION mapping_listing_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM mappings_mappinglisting WHERE id IN (SELECT id FROM old_rows);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {INSERT_LISTING.format(mappings='new_rows')};
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Deleting a patient or doctor drops their rows, restoring one brings them
+# back and renaming one rewrites them.
+PATIENT_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION patient_mapping_listing_sync() RETURNS trigger AS $$
+BEGIN
+    IF NEW.deleted_at IS NOT NULL THEN
+        DELETE FROM mappings_mappinglisting WHERE patient_id = NEW.id;
+    ELSIF OLD.deleted_at IS NOT NULL THEN
+        {INSERT_LISTING.format(mappings='mappings_patientdoctormapping')} WHERE m.patient_id = NEW.id;
+    ELSE
+        UPDATE mappings_mappinglisting SET patient_name = NEW.name, updated_at = now()
+        WHERE patient_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+DOCTOR_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION doctor_mapping_listing_sync() RETURNS trigger AS $$
+BEGIN
+    IF NEW.deleted_at IS NOT NULL THEN
+        DELETE FROM mappings_mappinglisting WHERE doctor_id = NEW.id;
+    ELSIF OLD.deleted_at IS NOT NULL THEN
+        {INSERT_LISTING.format(mappings='mappings_patientdoctormapping')} WHERE m.doctor_id = NEW.id;
+    ELSE
+        UPDATE mappings_mappinglisting
+        SET doctor_name = NEW.name, doctor_specialization = NEW.specialization, updated_at = now()
+        WHERE doctor_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0006_soft_delete'),
+        ('mappings', '0005_cascade_and_soft_delete'),
+        ('patients', '0007_partition_by_owner'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MappingListing',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('patient_name', models.CharField(max_length=200)),
+                ('doctor_name', models.CharField(max_length=200)),
+                ('doctor_specialization', models.CharField(max_length=200)),
+                ('assigned_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('doctor', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='doctors.doctor')),
+                ('patient', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='patients.patient')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['assigned_at', 'id'], name='listing_assigned_idx')],
+            },
+        ),
+        PostgresOnly(migrations.RunSQL(
+            sql=[
+                MAPPING_FUNCTION,
+                PATIENT_FUNCTION,
+                DOCTOR_FUNCTION,
+                """
+                CREATE TRIGGER mapping_listing_insert
+                AFTER INSERT ON mappings_patientdoctormapping
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION mapping_listing_sync()
+                """,
+                """
+                CREATE TRIGGER mapping_listing_update
+                AFTER UPDATE ON mappings_patientdoctormapping
+                REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION mapping_listing_sync()
+                """,
+                """
+                CREATE TRIGGER mapping_listing_delete
+                AFTER DELETE ON mappings_patientdoctormapping
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION mapping_listing_sync()
+                """,
+                """
+                CREATE TRIGGER patient_mapping_listing
+                AFTER UPDATE OF name, deleted_at ON patients_patient
+                FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name
+                                   OR (OLD.deleted_at IS NULL) <> (NEW.deleted_at IS NULL))
+                EXECUTE FUNCTION patient_mapping_listing_sync()
+                """,
+                """
+                CREATE TRIGGER doctor_mapping_listing
+                AFTER UPDATE OF name, specialization, deleted_at ON doctors_doctor
+                FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name
+                                   OR OLD.specialization IS DISTINCT FROM NEW.specialization
+                                   OR (OLD.deleted_at IS NULL) <> (NEW.deleted_at IS NULL))
+                EXECUTE FUNCTION doctor_mapping_listing_sync()
+                """,
+                INSERT_LISTING.format(mappings='mappings_patientdoctormapping'),
+            ],
+            reverse_sql=[
+                "DROP TRIGGER IF EXISTS mapping_listing_insert ON mappings_patientdoctormapping",
+                "DROP TRIGGER IF EXISTS mapping_listing_update ON mappings_patientdoctormapping",
+                "DROP TRIGGER IF EXISTS mapping_listing_delete ON mappings_patientdoctormapping",
+                "DROP TRIGGER IF EXISTS patient_mapping_listing ON patients_patient",
+                "DROP TRIGGER IF EXISTS doctor_mapping_listing ON doctors_doctor",
+                "DROP FUNCTION IF EXISTS mapping_listing_sync()",
+                "DROP FUNCTION IF EXISTS patient_mapping_listing_sync()",
+                "DROP FUNCTION IF EXISTS doctor_mapping_listing_sync()",
+            ],
+        )),
+    ]
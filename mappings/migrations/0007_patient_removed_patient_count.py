@@ -0,0 +1,46 @@
+from django.db import migrations
+
+from healthcare.operations import PostgresOnly
+
+# Hard-deleting a live patient lets ON DELETE CASCADE remove its mappings.
+# By then the patient row is gone, so doctor_patient_count_sync() cannot
+# tell they belonged to a live patient: take them off the counts first.
+PATIENT_REMOVED_FUNCTION = """
+CREATE OR REPLACE FUNCTION patient_removed_patient_count_sync() RETURNS trigger AS $$
+BEGIN
+    UPDATE doctors_doctor AS d SET patient_count = d.patient_count - c.n
+    FROM (
+        SELECT doctor_id, count(*) AS n FROM mappings_patientdoctormapping
+        WHERE patient_id = OLD.id GROUP BY doctor_id
+    ) AS c
+    WHERE d.id = c.doctor_id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mappings', '0006_mapping_listing'),
+        ('patients', '0010_purge'),
+    ]
+
+    operations = [
+        PostgresOnly(migrations.RunSQL(
+            sql=[
+                PATIENT_REMOVED_FUNCTION,
+                """
+                CREATE TRIGGER patient_removed_patient_count
+                BEFORE DELETE ON patients_patient
+                FOR EACH ROW WHEN (OLD.deleted_at IS NULL)
+                EXECUTE FUNCTION patient_removed_patient_count_sync()
+                """,
+            ],
+            reverse_sql=[
+                "DROP TRIGGER IF EXISTS patient_removed_patient_count ON patients_patient",
+                "DROP FUNCTION IF EXISTS patient_removed_patient_count_sync()",
+            ],
+        )),
+    ]
@@ -3,13 +3,54 @@ from patients.models import Patient
 from doctors.models import Doctor
 
 
+class LiveMappingManager(models.Manager):
+    """Hides assignments whose patient or doctor is soft-deleted."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(patient__deleted_at__isnull=True, doctor__deleted_at__isnull=True)
+
+
 class PatientDoctorMapping(models.Model):
-    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='doctor_mappings')
-    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='patient_mappings')
+    # Both FK indexes are redundant: (patient, doctor) is covered by the
+    # unique constraint and doctor by doctor_assigned_idx below.
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='doctor_mappings', db_index=False)
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='patient_mappings', db_index=False)
     assigned_at = models.DateTimeField(auto_now_add=True)
 
+    objects = LiveMappingManager()
+    all_objects = models.Manager()
+
     class Meta:
         unique_together = ('patient', 'doctor')
+        indexes = [
+            models.Index(fields=['assigned_at', 'id'], name='mapping_assigned_idx'),
+            models.Index(fields=['doctor', 'assigned_at', 'id'], include=['patient'], name='mapping_doctor_assigned_idx'),
+        ]
 
     def __str__(self):
         return f"{self.patient.name} -> Dr. {self.doctor.name}"
+
+
+class MappingListing(models.Model):
+    """
+    Read model behind ``GET /api/mappings/?view=compact``: one row per live
+    assignment with the names the mappings page shows, so a page is one
+    index range scan without joins.
+
+    PostgreSQL triggers (migration 0006) keep it in step with mappings,
+    patients and doctors. Other databases leave it empty and the view joins
+    instead.
+    """
+    id = models.BigIntegerField(primary_key=True)  # the mapping's id
+    patient = models.ForeignKey(Patient, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    patient_name = models.CharField(max_length=200)
+    doctor = models.ForeignKey(Doctor, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    doctor_name = models.CharField(max_length=200)
+    doctor_specialization = models.CharField(max_length=200)
+    assigned_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['assigned_at', 'id'], name='listing_assigned_idx'),
+        ]
@@ -1,9 +1,30 @@
 from rest_framework import serializers
-from .models import PatientDoctorMapping
+
+from healthcare.serializers import ValuesSerializer
+from .models import MappingListing, PatientDoctorMapping
+from patients.models import Patient
 from patients.serializers import PatientSerializer
+from doctors.models import Doctor
 from doctors.serializers import DoctorSerializer
 
 
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves primary keys against ``context['prefetched'][field_name]``, a
+    dict of objects the view loaded with one ``in_bulk`` query.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return self.context['prefetched'][self.field_name][int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
 class MappingSerializer(serializers.ModelSerializer):
     class Meta:
         model = PatientDoctorMapping
@@ -11,6 +32,15 @@ class MappingSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'assigned_at']
 
 
+class BulkMappingSerializer(MappingSerializer):
+    patient = PrefetchedPrimaryKeyRelatedField(queryset=Patient.objects.all())
+    doctor = PrefetchedPrimaryKeyRelatedField(queryset=Doctor.objects.all())
+
+    class Meta(MappingSerializer.Meta):
+        # Duplicates are detected for the whole batch in one query instead.
+        validators = []
+
+
 class MappingDetailSerializer(serializers.ModelSerializer):
     patient = PatientSerializer(read_only=True)
     doctor = DoctorSerializer(read_only=True)
@@ -18,3 +48,38 @@ class MappingDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = PatientDoctorMapping
         fields = ['id', 'patient', 'doctor', 'assigned_at']
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Join patient and doctor and load only the columns rendered above."""
+        columns = ['id', 'patient', 'doctor', 'assigned_at']
+        columns += [f'patient__{name}' for name in PatientSerializer.Meta.fields]
+        columns += [f'doctor__{name}' for name in DoctorSerializer.Meta.fields]
+        return queryset.select_related('patient', 'doctor').only(*columns)
+
+
+mapping_values = ValuesSerializer(MappingDetailSerializer)
+
+
+class MappingCompactSerializer(serializers.ModelSerializer):
+    """An assignment with just the names the mappings page shows (``?view=compact``)."""
+
+    class Meta:
+        model = MappingListing
+        fields = ['id', 'patient', 'patient_name', 'doctor', 'doctor_name', 'doctor_specialization', 'assigned_at']
+        read_only_fields = fields
+
+
+mapping_compact_values = ValuesSerializer(MappingCompactSerializer)
+
+
+class DoctorPatientSerializer(serializers.ModelSerializer):
+    """A doctor's assignment as seen from the doctor: the patient and when."""
+    patient = PatientSerializer(read_only=True)
+
+    class Meta:
+        model = PatientDoctorMapping
+        fields = ['id', 'patient', 'assigned_at']
+
+
+doctor_patient_values = ValuesSerializer(DoctorPatientSerializer)
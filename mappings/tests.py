@@ -0,0 +1,137 @@
+import csv
+from io import StringIO
+
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from doctors.models import Doctor
+from healthcare.bulk import create_valid
+from healthcare.testing import AuthenticatedTestCase, QueryCountTestCase, assign, make_doctors, make_patients
+from patients.models import Patient
+
+from .models import PatientDoctorMapping
+from .serializers import MappingSerializer
+
+
+class MappingListQueryCountTests(QueryCountTestCase):
+    def setUp(self):
+        super().setUp()
+        self.doctor = make_doctors(self.user, 1)[0]
+        self.patient = make_patients(self.user, 1)[0]
+
+    def add_mappings(self, count):
+        # New patients and doctors each time, so joined rows differ
+        assign(make_patients(self.user, count), [self.doctor])
+
+    def test_list(self):
+        response = self.assertConstantQueries('/api/mappings/?page_size=100', self.add_mappings)
+        self.assertEqual(len(response.data['results']), 50)
+
+    def test_compact_list(self):
+        response = self.assertConstantQueries('/api/mappings/?view=compact&page_size=100', self.add_mappings)
+        self.assertEqual(len(response.data['results']), 50)
+
+    def test_list_with_nested_projection(self):
+        url = '/api/mappings/?page_size=100&fields=id,patient.name,doctor.name'
+        response = self.assertConstantQueries(url, self.add_mappings)
+        self.assertEqual(response.data['results'][0]['patient'], {'name': 'Patient 0'})
+
+    def test_by_patient(self):
+        def add_doctors(count):
+            assign([self.patient], make_doctors(self.user, count))
+
+        response = self.assertConstantQueries(f'/api/mappings/patient/{self.patient.pk}/', add_doctors)
+        self.assertEqual(len(response.data), 50)
+
+    def test_doctor_patients(self):
+        url = f'/api/doctors/{self.doctor.pk}/patients/?page_size=100'
+        response = self.assertConstantQueries(url, self.add_mappings)
+        self.assertEqual(len(response.data['results']), 50)
+
+
+@override_settings(AUTH_USER_CACHE={'TIMEOUT': 0, 'MAX_ENTRIES': 0})
+class AsyncListQueryCountTests(QueryCountTestCase):
+    """The ``/api/async/`` lists, which authenticate with a JWT themselves."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.doctor = make_doctors(self.user, 1)[0]
+
+    def add_mappings(self, count):
+        assign(make_patients(self.user, count), [self.doctor])
+
+    def test_patients(self):
+        response = self.assertConstantQueries(
+            '/api/async/patients/?page_size=100', lambda count: make_patients(self.user, count),
+        )
+        self.assertEqual(len(response.json()['results']), 50)
+
+    def test_doctors(self):
+        response = self.assertConstantQueries(
+            '/api/async/doctors/?page_size=100', lambda count: make_doctors(self.user, count),
+        )
+        self.assertEqual(len(response.json()['results']), 51)
+
+    def test_mappings(self):
+        response = self.assertConstantQueries('/api/async/mappings/?page_size=100', self.add_mappings)
+        self.assertEqual(len(response.json()['results']), 50)
+
+    def test_compact_mappings(self):
+        response = self.assertConstantQueries('/api/async/mappings/?view=compact&page_size=100', self.add_mappings)
+        self.assertEqual(len(response.json()['results']), 50)
+
+
+class MappingBulkTests(AuthenticatedTestCase):
+    def test_concurrent_duplicate_is_reported_per_item(self):
+        patients = make_patients(self.user, 2)
+        doctor = make_doctors(self.user, 1)[0]
+        items = [{'patient': patient.pk, 'doctor': doctor.pk} for patient in patients]
+        serializers = [MappingSerializer(data=item) for item in items]
+        self.assertTrue(all(serializer.is_valid() for serializer in serializers))
+        # Written by another request after the view checked for duplicates
+        assign(patients[:1], [doctor])
+
+        results = create_valid(PatientDoctorMapping, list(enumerate(serializers)), [None, None])
+        self.assertEqual([result['status'] for result in results], [409, 201])
+        self.assertEqual(PatientDoctorMapping.objects.count(), 2)
+
+
+class LiveMappingManagerTests(AuthenticatedTestCase):
+    def test_hides_mappings_of_soft_deleted_rows(self):
+        patients = make_patients(self.user, 2)
+        doctors = make_doctors(self.user, 2)
+        assign(patients, doctors)
+        Patient.objects.filter(pk=patients[0].pk).soft_delete()
+        Doctor.objects.filter(pk=doctors[0].pk).soft_delete()
+
+        live = PatientDoctorMapping.objects.values_list('patient', 'doctor')
+        self.assertEqual(list(live), [(patients[1].pk, doctors[1].pk)])
+        self.assertEqual(PatientDoctorMapping.all_objects.count(), 4)
+
+    @override_settings(SOFT_DELETE=True)
+    def test_list_endpoints_hide_them(self):
+        patients = make_patients(self.user, 2)
+        doctor = make_doctors(self.user, 1)[0]
+        assign(patients, [doctor])
+        self.client.delete(f'/api/patients/{patients[0].pk}/')
+
+        for url in ['/api/mappings/', '/api/mappings/?view=compact', f'/api/doctors/{doctor.pk}/patients/']:
+            with self.subTest(url):
+                results = self.client.get(url).json()['results']
+                self.assertEqual(len(results), 1)
+        self.assertEqual(self.client.get(f'/api/mappings/patient/{patients[0].pk}/').status_code, 404)
+
+
+class MappingExportTests(AuthenticatedTestCase):
+    def test_csv_flattens_nested_rows(self):
+        assign(make_patients(self.user, 2), make_doctors(self.user, 1))
+        response = self.client.get('/api/mappings/export/', {'type': 'csv'})
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+
+        mappings = PatientDoctorMapping.objects.order_by('id')
+        self.assertEqual([row['id'] for row in rows], [str(mapping.pk) for mapping in mappings])
+        self.assertEqual(rows[0]['patient.name'], mappings[0].patient.name)
+        self.assertEqual(rows[0]['doctor.specialization'], 'Cardiology')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="mappings.csv"')
@@ -1,8 +1,13 @@
 from django.urls import path
-from .views import MappingListCreateView, MappingByPatientView, MappingDeleteView
+from .views import (
+    MappingListCreateView, MappingByPatientView, MappingDeleteView, MappingBulkView,
+    MappingExportView,
+)
 
 urlpatterns = [
     path('', MappingListCreateView.as_view(), name='mapping-list-create'),
     path('<int:pk>/', MappingDeleteView.as_view(), name='mapping-delete'),
+    path('bulk/', MappingBulkView.as_view(), name='mapping-bulk'),
+    path('export/', MappingExportView.as_view(), name='mapping-export'),
     path('patient/<int:patient_id>/', MappingByPatientView.as_view(), name='mapping-by-patient'),
 ]
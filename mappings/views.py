@@ -1,20 +1,90 @@
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from django.db import connection
+from django.db.models import F
 from django.shortcuts import get_object_or_404
 
-from .models import PatientDoctorMapping
-from .serializers import MappingSerializer, MappingDetailSerializer
+from doctors.models import Doctor
+from healthcare.bulk import (
+    bulk_delete, bulk_response, create_valid, error_result, get_bulk_items,
+    validate_items,
+)
+from healthcare.conditional import check_preconditions, collection_etag
+from healthcare.export import export_response
+from healthcare.pagination import KeysetPagination
+from healthcare.renderers import FastJSONRenderer
+from patients.models import Patient
+from .models import MappingListing, PatientDoctorMapping
+from .serializers import (
+    BulkMappingSerializer, MappingSerializer, MappingDetailSerializer, doctor_patient_values,
+    mapping_compact_values, mapping_values,
+)
+
+
+# Mapping listings embed the patient and doctor, so edits to either change them
+MAPPING_TIMESTAMPS = ('assigned_at', 'patient__updated_at', 'doctor__updated_at')
+
+
+def compact_listing(values):
+    """
+    Source of ``?view=compact``: ``(queryset, timestamp fields)`` for the
+    ETag, and the rows to page through with ``values``, a (projected)
+    ``mapping_compact_values``.
+    """
+    if connection.vendor == 'postgresql':
+        # Kept current by triggers: listing_assigned_idx, no joins
+        listings = MappingListing.objects.all()
+        return listings, ('updated_at',), values.values(listings, *MappingPagination.ordering)
+    # No listing triggers elsewhere: join the same columns instead
+    mappings = PatientDoctorMapping.objects.all()
+    rows = mappings.values(
+        'id', 'patient', 'doctor', 'assigned_at', patient_name=F('patient__name'),
+        doctor_name=F('doctor__name'), doctor_specialization=F('doctor__specialization'),
+    )
+    return mappings, MAPPING_TIMESTAMPS, rows
+
+
+class MappingPagination(KeysetPagination):
+    ordering = ('assigned_at', 'id')
 
 
 class MappingListCreateView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = MappingPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
     def get(self, request):
+        if request.query_params.get('view') == 'compact':
+            return self.get_compact(request)
+        values = mapping_values.project(request)
         mappings = PatientDoctorMapping.objects.all()
-        serializer = MappingDetailSerializer(mappings, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        etag = collection_etag(request, mappings, *MAPPING_TIMESTAMPS)
+        response = check_preconditions(request, etag)
+        if response is not None:
+            return response
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(values.values(mappings, *paginator.ordering), request, view=self)
+        response = paginator.get_paginated_response(values.to_representation(page))
+        response['ETag'] = etag
+        return response
+
+    def get_compact(self, request):
+        values = mapping_compact_values.project(request)
+        mappings, timestamps, rows = compact_listing(values)
+        etag = collection_etag(request, mappings, *timestamps)
+        response = check_preconditions(request, etag)
+        if response is not None:
+            return response
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        response = paginator.get_paginated_response(values.to_representation(page))
+        response['ETag'] = etag
+        return response
 
     def post(self, request):
         serializer = MappingSerializer(data=request.data)
@@ -34,16 +104,46 @@ class MappingListCreateView(APIView):
 
 class MappingByPatientView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
     def get(self, request, patient_id):
+        values = mapping_values.project(request)
         mappings = PatientDoctorMapping.objects.filter(patient_id=patient_id)
-        if not mappings.exists():
+        etag = collection_etag(request, mappings, *MAPPING_TIMESTAMPS)
+        response = check_preconditions(request, etag)
+        if response is not None:
+            return response
+
+        mappings = values.to_representation(values.values(mappings))
+        if not mappings:
             return Response(
                 {'message': 'No doctors assigned to this patient.'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        serializer = MappingDetailSerializer(mappings, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(mappings, status=status.HTTP_200_OK, headers={'ETag': etag})
+
+
+class DoctorPatientsView(APIView):
+    permission_classes = [IsAuthenticated]
+    pagination_class = MappingPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request, pk):
+        values = doctor_patient_values.project(request)
+        # Served by mapping_doctor_assigned_idx: (doctor, assigned_at, id)
+        mappings = PatientDoctorMapping.objects.filter(doctor_id=pk)
+        etag = collection_etag(request, mappings, 'assigned_at', 'patient__updated_at')
+        response = check_preconditions(request, etag)
+        if response is not None:
+            return response
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(values.values(mappings, *paginator.ordering), request, view=self)
+        if not page and not Doctor.objects.filter(pk=pk).exists():
+            return Response({'error': 'Doctor not found.'}, status=status.HTTP_404_NOT_FOUND)
+        response = paginator.get_paginated_response(values.to_representation(page))
+        response['ETag'] = etag
+        return response
 
 
 class MappingDeleteView(APIView):
@@ -56,3 +156,62 @@ class MappingDeleteView(APIView):
             {'message': 'Mapping removed successfully.'},
             status=status.HTTP_204_NO_CONTENT
         )
+
+
+def pk_values(items, key):
+    pks = set()
+    for item in items:
+        try:
+            pks.add(int(item[key]))
+        except (KeyError, TypeError, ValueError):
+            pass
+    return pks
+
+
+class MappingBulkView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        items = get_bulk_items(request)
+        prefetched = {
+            'patient': Patient.objects.in_bulk(pk_values(items, 'patient')),
+            'doctor': Doctor.objects.in_bulk(pk_values(items, 'doctor')),
+        }
+        results, valid = validate_items(
+            BulkMappingSerializer, items, context={'prefetched': prefetched}
+        )
+
+        pairs = {
+            (s.validated_data['patient'].pk, s.validated_data['doctor'].pk) for _, s in valid
+        }
+        assigned = set(PatientDoctorMapping.objects.filter(
+            patient_id__in={patient_id for patient_id, _ in pairs},
+            doctor_id__in={doctor_id for _, doctor_id in pairs},
+        ).values_list('patient_id', 'doctor_id')) if pairs else set()
+
+        unique = []
+        for index, serializer in valid:
+            pair = (serializer.validated_data['patient'].pk, serializer.validated_data['doctor'].pk)
+            if pair in assigned:
+                results[index] = error_result({'error': 'This doctor is already assigned to this patient.'})
+                continue
+            assigned.add(pair)
+            unique.append((index, serializer))
+
+        create_valid(PatientDoctorMapping, unique, results)
+        return bulk_response(results, status.HTTP_201_CREATED)
+
+    def delete(self, request):
+        ids = get_bulk_items(request)
+        results = bulk_delete(PatientDoctorMapping.objects.all(), ids)
+        return bulk_response(results)
+
+
+class MappingExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        mappings = MappingDetailSerializer.setup_eager_loading(
+            PatientDoctorMapping.objects.order_by('id')
+        )
+        return export_response(request, mappings, MappingDetailSerializer, 'mappings')
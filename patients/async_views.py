@@ -0,0 +1,42 @@
+from django.shortcuts import aget_object_or_404
+from rest_framework.request import Request
+
+from healthcare.async_api import async_api_view, render_json
+from healthcare.conditional import acollection_etag, check_preconditions, object_etag
+from healthcare.pagination import KeysetPagination, RankedPagination
+from healthcare.search import search_queryset
+from .models import Patient
+from .serializers import patient_values
+from .views import PatientListCreateView
+
+
+@async_api_view
+async def patient_list(request):
+    values = patient_values.project(request)
+    patients = Patient.objects.filter(created_by=request.user)
+    etag = await acollection_etag(request, patients, 'updated_at')
+    response = check_preconditions(request, etag)
+    if response is not None:
+        return response
+
+    paginator = KeysetPagination()
+    q = request.GET.get('q', '').strip()
+    if q:
+        patients = search_queryset(patients, q, PatientListCreateView.search_fields)
+        paginator = RankedPagination()
+    page = await paginator.apaginate_queryset(values.values(patients, *paginator.ordering), Request(request))
+    data = paginator.get_paginated_response(values.to_representation(page)).data
+    return render_json(data, headers={'ETag': etag})
+
+
+@async_api_view
+async def patient_detail(request, pk):
+    values = patient_values.project(request)
+    patient = await aget_object_or_404(
+        Patient.objects.only('updated_at', *values.columns), pk=pk, created_by=request.user,
+    )
+    etag = object_etag(patient, values.projection)
+    response = check_preconditions(request, etag)
+    if response is not None:
+        return response
+    return render_json(values.serializer(patient).data, headers={'ETag': etag})
@@ -0,0 +1,87 @@
+"""
+Management command that runs EXPLAIN (ANALYZE on PostgreSQL) for the query
+behind every API endpoint and reports sequential scans.
+
+Run it against a seeded database (see ``seed_data --patients``); on tiny
+tables the planner prefers sequential scans and the report is meaningless.
+"""
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from accounts.models import users_by_email
+from doctors.models import Doctor
+from healthcare.search import search_queryset
+from mappings.models import MappingListing, PatientDoctorMapping
+from mappings.serializers import doctor_patient_values, mapping_compact_values, mapping_values
+from patients.models import Patient
+
+SEQ_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (\w+)\b(?! USING)'),
+}
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN every API endpoint query and report sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--fail-on-seq-scan', action='store_true',
+                            help='Exit with an error if any query uses a sequential scan.')
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help='Print the full plan of every query.')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in SEQ_SCAN:
+            raise CommandError(f'Unsupported database backend: {connection.vendor}')
+
+        user = User.objects.annotate(n=Count('patients')).order_by('-n').first()
+        patient = Patient.objects.filter(created_by=user).order_by('id').first()
+        doctor = Doctor.objects.order_by('id').first()
+        if user is None or patient is None or doctor is None:
+            raise CommandError('Seed the database first, e.g. manage.py seed_data --patients 100000 --doctors 500')
+
+        page = options['page_size']
+        queries = [
+            ('POST /api/auth/login/', users_by_email(user.email or 'nobody@example.com')),
+            ('GET /api/patients/', Patient.objects.filter(created_by=user).order_by('created_at', 'id')[:page]),
+            ('GET /api/patients/?q=', search_queryset(
+                Patient.objects.filter(created_by=user), patient.name, ['name', 'phone'])[:page]),
+            ('GET /api/patients/<id>/', Patient.objects.filter(pk=patient.pk, created_by=user)),
+            ('GET /api/doctors/', Doctor.objects.order_by('created_at', 'id')[:page]),
+            ('GET /api/doctors/?q=', search_queryset(
+                Doctor.objects.all(), doctor.specialization, ['name', 'specialization'])[:page]),
+            ('GET /api/doctors/<id>/', Doctor.objects.filter(pk=doctor.pk)),
+            ('GET /api/mappings/', mapping_values.values(
+                PatientDoctorMapping.objects.order_by('assigned_at', 'id'))[:page]),
+            ('GET /api/mappings/?view=compact', mapping_compact_values.values(
+                MappingListing.objects.order_by('assigned_at', 'id'))[:page]),
+            ('GET /api/mappings/patient/<id>/', mapping_values.values(
+                PatientDoctorMapping.objects.filter(patient=patient))),
+            ('GET /api/doctors/<id>/patients/', doctor_patient_values.values(
+                PatientDoctorMapping.objects.filter(doctor=doctor).order_by('assigned_at', 'id'))[:page]),
+        ]
+
+        pattern = SEQ_SCAN[connection.vendor]
+        analyze = connection.vendor == 'postgresql'
+        offenders = []
+        for label, queryset in queries:
+            plan = queryset.explain(analyze=True) if analyze else queryset.explain()
+            tables = sorted(set(pattern.findall(plan)))
+            if tables:
+                offenders.append(label)
+                self.stdout.write(self.style.WARNING(f'  SEQ SCAN  {label}  ({", ".join(tables)})'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'  ok        {label}'))
+            if options['verbose_plans'] or tables:
+                for line in plan.splitlines():
+                    self.stdout.write(f'              {line}')
+
+        self.stdout.write('')
+        if offenders and options['fail_on_seq_scan']:
+            raise CommandError(f'{len(offenders)} of {len(queries)} queries use sequential scans.')
+        self.stdout.write(f'{len(offenders)} of {len(queries)} queries use sequential scans.')
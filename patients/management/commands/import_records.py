@@ -0,0 +1,197 @@
+"""
+Management command that imports patients, doctors or mappings from a CSV or
+NDJSON file, e.g. one produced by the export endpoints:
+
+    python manage.py import_records patients patients.csv --owner dr_admin --copy
+
+Records are validated with the API serializers' rules in batches and
+written one batch per transaction, with bulk_create or (``--copy``)
+PostgreSQL COPY. The position in the file is saved to an
+``ImportCheckpoint`` row in the same transaction as each batch, so an
+interrupted import picks up where it stopped when run again, without
+writing any batch twice. A checkpoint file mirrors that row for people and
+scripts to read. Invalid records are appended to a reject file as NDJSON
+with their line number and errors.
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from doctors.models import Doctor
+from doctors.serializers import DoctorSerializer
+from healthcare.importer import FORMATS, BatchValidator, insert_rows, read_records
+from healthcare.signals import bulk_write
+from mappings.models import PatientDoctorMapping
+from mappings.serializers import MappingSerializer
+from patients.models import ImportCheckpoint, Patient
+from patients.serializers import PatientSerializer
+
+# kind: (model, serializer, whether rows need an owner)
+IMPORTS = {
+    'patients': (Patient, PatientSerializer, True),
+    'doctors': (Doctor, DoctorSerializer, True),
+    'mappings': (PatientDoctorMapping, MappingSerializer, False),
+}
+
+# ImportCheckpoint fields holding an import's progress
+PROGRESS_FIELDS = ('offset', 'line', 'imported', 'rejected', 'complete')
+
+
+class Command(BaseCommand):
+    help = 'Import patients, doctors or mappings from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=IMPORTS)
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='File format; taken from the file extension by default.')
+        parser.add_argument('--owner',
+                            help='Username or email of the user who owns imported patients or doctors.')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Records validated and written per transaction.')
+        parser.add_argument('--copy', action='store_true',
+                            help='Write rows with PostgreSQL COPY instead of bulk_create.')
+        parser.add_argument('--checkpoint',
+                            help='File showing the progress, also read by older versions '
+                                 '(default: <path>.checkpoint).')
+        parser.add_argument('--rejects', help='Reject file (default: <path>.rejects.ndjson).')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore the checkpoint and import the whole file again.')
+
+    def handle(self, *args, **options):
+        kind, path = options['kind'], Path(options['path']).resolve()
+        model, serializer_class, owned = IMPORTS[kind]
+        if not path.is_file():
+            raise CommandError(f'No such file: {path}')
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in FORMATS:
+            raise CommandError('Pass --format csv or --format ndjson.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy requires the PostgreSQL backend.')
+
+        extra = {}
+        if owned:
+            extra['created_by_id'] = self.get_owner(options['owner'])
+
+        checkpoint_path = Path(options['checkpoint'] or f'{path}.checkpoint')
+        state = {'kind': kind, 'path': str(path), 'offset': 0, 'line': 0,
+                 'imported': 0, 'rejected': 0, 'complete': False}
+        if options['restart']:
+            ImportCheckpoint.objects.filter(kind=kind, path=str(path)).delete()
+        else:
+            saved = self.load_progress(kind, path, checkpoint_path)
+            if saved is not None:
+                if saved['complete']:
+                    raise CommandError(f'{path} was already imported; pass --restart to import it again.')
+                state = saved
+                self.stdout.write(f'Resuming after line {state["line"]}')
+
+        rejects_path = Path(options['rejects'] or f'{path}.rejects.ndjson')
+        validator = BatchValidator(serializer_class, blank_is_null=file_format == 'csv')
+        self.started = self.reported = time.monotonic()
+        self.read = 0
+
+        with open(rejects_path, 'a' if state['line'] else 'w') as rejects:
+            batch = []
+            for item in read_records(path, file_format, state['offset'], state['line']):
+                batch.append(item)
+                if len(batch) >= options['batch_size']:
+                    self.write_batch(model, validator, batch, extra, options['copy'], rejects, state, checkpoint_path)
+                    batch = []
+            self.write_batch(model, validator, batch, extra, options['copy'], rejects, state, checkpoint_path)
+            state['complete'] = True
+            self.save_progress(state)
+            self.save_checkpoint(checkpoint_path, state)
+
+        self.report(kind, state, force=True)
+        if state['rejected']:
+            self.stdout.write(self.style.WARNING(f'{state["rejected"]} records rejected; see {rejects_path}'))
+
+    def get_owner(self, identifier):
+        if not identifier:
+            raise CommandError('--owner is required for patients and doctors.')
+        owners = list(User.objects.filter(Q(username=identifier) | Q(email__iexact=identifier))
+                      .values_list('pk', flat=True)[:2])
+        if len(owners) != 1:
+            raise CommandError(f'--owner must match exactly one user, {identifier!r} matches {len(owners)}.')
+        return owners[0]
+
+    def write_batch(self, model, validator, batch, extra, use_copy, rejects, state, checkpoint_path):
+        if not batch:
+            return
+        parsed = [(line, record) for line, record, error, _ in batch if error is None]
+        rows, invalid = validator.validate([record for _, record in parsed])
+        for row in rows:
+            row.update(extra)
+
+        # Rejects first: a crash before the commit below repeats them on
+        # resume, one after it would lose them.
+        entries = [
+            {'line': line, 'errors': {'non_field_errors': [error]}}
+            for line, _, error, _ in batch if error is not None
+        ]
+        entries += [
+            {'line': parsed[index][0], 'record': parsed[index][1], 'errors': errors}
+            for index, errors in invalid
+        ]
+        for entry in sorted(entries, key=lambda entry: entry['line']):
+            rejects.write(json.dumps(entry, default=str) + '\n')
+        rejects.flush()
+
+        progress = dict(state, imported=state['imported'] + len(rows),
+                        rejected=state['rejected'] + len(batch) - len(rows),
+                        line=batch[-1][0], offset=batch[-1][3])
+        with transaction.atomic():
+            insert_rows(model, rows, use_copy)
+            self.save_progress(progress)
+        if rows:
+            bulk_write.send(sender=model)
+
+        self.read += len(batch)
+        state.update(progress)
+        self.save_checkpoint(checkpoint_path, state)
+        self.report(state['kind'], state)
+
+    def load_progress(self, kind, path, checkpoint_path):
+        saved = ImportCheckpoint.objects.filter(kind=kind, path=str(path)).values(*PROGRESS_FIELDS).first()
+        if saved is not None:
+            return {'kind': kind, 'path': str(path), **saved}
+        if not checkpoint_path.exists():
+            return None
+        # Only a file: an import started before checkpoints were kept in the database
+        saved = json.loads(checkpoint_path.read_text())
+        if (saved.get('kind'), saved.get('path')) != (kind, str(path)):
+            raise CommandError(f'{checkpoint_path} belongs to another import; pass --checkpoint or --restart.')
+        return saved
+
+    def save_progress(self, state):
+        ImportCheckpoint.objects.update_or_create(
+            kind=state['kind'], path=state['path'],
+            defaults={field: state[field] for field in PROGRESS_FIELDS},
+        )
+
+    def save_checkpoint(self, checkpoint_path, state):
+        # A copy of the ImportCheckpoint row. Written then renamed, so a crash
+        # never leaves a half-written file.
+        partial = checkpoint_path.with_name(checkpoint_path.name + '.tmp')
+        partial.write_text(json.dumps(state))
+        os.replace(partial, checkpoint_path)
+
+    def report(self, kind, state, force=False):
+        now = time.monotonic()
+        if not force and now - self.reported < 1:
+            return
+        self.reported = now
+        elapsed = now - self.started
+        self.stdout.write(
+            f'  {kind}: line {state["line"]}, {state["imported"]} imported, {state["rejected"]} rejected '
+            f'({self.read / elapsed if elapsed else 0:,.0f} records/s)'
+        )
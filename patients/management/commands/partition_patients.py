@@ -0,0 +1,52 @@
+"""
+Management command that hash-partitions the patients table on
+``created_by_id`` (PostgreSQL 13+), for databases migrated before
+``PATIENT_PARTITIONS`` was set:
+
+    python manage.py partition_patients --partitions 32
+
+The table stays readable and writable while rows are copied; writes only
+wait for the final swap. Interrupted runs resume where they stopped. See
+``patients/partitioning.py``.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from patients.models import Patient
+from patients.partitioning import is_partitioned, partition_counts, partition_table
+
+
+class Command(BaseCommand):
+    help = 'Hash-partition the patients table by owner'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--partitions', type=int, default=settings.PATIENT_PARTITIONS or 16,
+                            help='Number of hash partitions (default: PATIENT_PARTITIONS or 16).')
+        parser.add_argument('--batch-size', type=int, default=50000,
+                            help='Rows copied per transaction.')
+        parser.add_argument('--keep-old', action='store_true', default=True,
+                            help='Keep the flat table as patients_patient_unpartitioned (default).')
+        parser.add_argument('--drop-old', action='store_false', dest='keep_old',
+                            help='Drop the flat table in the swap instead of keeping it.')
+        parser.add_argument('--status', action='store_true',
+                            help='Only show the partitions and their estimated row counts.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Partitioning requires the PostgreSQL backend.')
+        if options['status']:
+            with connection.cursor() as cursor:
+                partitioned = is_partitioned(cursor, Patient._meta.db_table)
+            if not partitioned:
+                self.stdout.write(f'{Patient._meta.db_table} is not partitioned.')
+            for name, rows in partition_counts(Patient):
+                self.stdout.write(f'{name:<32} {rows:>12,}')
+            return
+        if options['partitions'] < 2 or options['batch_size'] < 1:
+            raise CommandError('--partitions must be at least 2 and --batch-size positive.')
+
+        partition_table(
+            Patient, options['partitions'], batch_size=options['batch_size'],
+            keep_old=options['keep_old'], log=self.stdout.write,
+        )
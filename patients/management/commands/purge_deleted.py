@@ -0,0 +1,138 @@
+"""
+Management command that hard-deletes soft-deleted patients and doctors,
+and trims old sync tombstones.
+
+Rows are removed in short transactions so no batch holds its locks for
+long. A batch deletes up to ``--batch-size`` rows, counting the parent rows
+plus the mappings that PostgreSQL's ON DELETE CASCADE removes with them.
+After every batch the size is adjusted so batches take about
+``--target-ms``. A parent with more mappings than one batch allows, such as
+a doctor with 50k assignments, first has its mappings deleted in batches of
+their own.
+
+Rows and tombstones deleted less than ``SYNC_TOKEN_MAX_DAYS`` ago are
+kept, so every valid sync token can still report them; ``--older-than``
+may only raise that. Purged rows leave tombstones of their own. Each run
+that trims tombstones is recorded as a ``Purge``, and sync answers 410 to
+tokens issued before its cutoff.
+
+Run it from cron, e.g. every few minutes:
+
+    python manage.py purge_deleted
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from doctors.models import Doctor
+from healthcare.softdelete import delete_rows
+from mappings.models import PatientDoctorMapping
+from patients.models import Patient, Purge
+from sync.models import Tombstone
+
+MIN_BATCH_SIZE = 10
+MAX_BATCH_SIZE = 50000
+
+
+class Command(BaseCommand):
+    help = 'Hard-delete soft-deleted patients and doctors in small batches and trim old tombstones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=float, default=settings.SYNC_TOKEN_MAX_DAYS,
+                            help='Only purge rows and tombstones deleted at least this many days ago '
+                                 '(default and minimum: SYNC_TOKEN_MAX_DAYS).')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows deleted by the first batch.')
+        parser.add_argument('--target-ms', type=float, default=100,
+                            help='Batch duration to aim for, in milliseconds.')
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to wait between batches.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['target_ms'] <= 0:
+            raise CommandError('--batch-size and --target-ms must be positive.')
+        if options['older_than'] < settings.SYNC_TOKEN_MAX_DAYS:
+            raise CommandError(
+                f'--older-than must be at least SYNC_TOKEN_MAX_DAYS ({settings.SYNC_TOKEN_MAX_DAYS}), '
+                'or sync clients would miss deletions.'
+            )
+        self.batch_size = options['batch_size']
+        self.target = options['target_ms'] / 1000
+        self.pause = options['sleep']
+        # Without database-level cascades, mappings are deleted explicitly first.
+        self.cascades = connection.vendor == 'postgresql'
+        cutoff = timezone.now() - timedelta(days=options['older_than'])
+
+        for model, field in ((Patient, 'patient'), (Doctor, 'doctor')):
+            parents, mappings = self.purge(model, field, cutoff)
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {parents} purged, {mappings} mappings removed')
+        self.stdout.write(f'tombstones: {self.trim(cutoff)} trimmed')
+
+    def purge(self, model, field, cutoff):
+        candidates = model.all_objects.filter(deleted_at__lte=cutoff).order_by('pk')
+        mappings = PatientDoctorMapping.all_objects
+        purged = removed = 0
+        while True:
+            pks = list(candidates.values_list('pk', flat=True)[:self.batch_size])
+            if not pks:
+                return purged, removed
+            fanout = dict(
+                mappings.filter(**{f'{field}__in': pks}).order_by()
+                .values_list(field).annotate(n=Count('pk'))
+            )
+
+            chunk, rows = [], 0
+            for pk in pks:
+                size = 1 + fanout.get(pk, 0)
+                if chunk and rows + size > self.batch_size:
+                    break
+                chunk.append(pk)
+                rows += size
+
+            started = time.perf_counter()
+            with transaction.atomic():
+                if rows > self.batch_size:
+                    # One parent with too many mappings: trim them first.
+                    doomed = list(
+                        mappings.filter(**{field: chunk[0]}).values_list('pk', flat=True)[:self.batch_size]
+                    )
+                    removed += delete_rows(PatientDoctorMapping, 'id', doomed)
+                    rows = len(doomed)
+                else:
+                    if not self.cascades:
+                        delete_rows(PatientDoctorMapping, f'{field}_id', chunk)
+                    purged += delete_rows(model, 'id', chunk)
+                    removed += rows - len(chunk)
+            self.adjust(time.perf_counter() - started)
+            if self.pause:
+                time.sleep(self.pause)
+
+    def trim(self, cutoff):
+        candidates = Tombstone.objects.filter(deleted_at__lte=cutoff).order_by('pk')
+        run, trimmed = None, 0
+        while True:
+            pks = list(candidates.values_list('pk', flat=True)[:self.batch_size])
+            if not pks:
+                return trimmed
+            started = time.perf_counter()
+            with transaction.atomic():
+                deleted = delete_rows(Tombstone, 'id', pks)
+                # In the batch's transaction: sync must never miss a committed trim
+                if run is None:
+                    run = Purge.objects.create(cutoff=cutoff, purged=deleted)
+                else:
+                    Purge.objects.filter(pk=run.pk).update(purged=F('purged') + deleted)
+                trimmed += deleted
+            self.adjust(time.perf_counter() - started)
+            if self.pause:
+                time.sleep(self.pause)
+
+    def adjust(self, elapsed):
+        # At most double per batch, so one fast batch cannot overshoot the target.
+        factor = min(2.0, self.target / elapsed) if elapsed > 0 else 2.0
+        self.batch_size = max(MIN_BATCH_SIZE, min(MAX_BATCH_SIZE, int(self.batch_size * factor)))
@@ -2,18 +2,80 @@
 Management command to seed the database with synthetic healthcare data.
 Inserts users, patients, doctors, and patient-doctor mappings directly
 through Django ORM (actual database entries, not via API).
+
+Without options it inserts a small fixed dataset and can be re-run safely.
+With --patients/--doctors it generates a deterministic load-testing dataset
+of any size in batched inserts, optionally through Postgres COPY:
+
+    python manage.py seed_data --patients 1000000 --doctors 2000 \
+        --mappings-per-patient 2 --seed 42 --copy
 """
-from django.core.management.base import BaseCommand
+import csv
+import io
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
 from patients.models import Patient
 from doctors.models import Doctor
 from mappings.models import PatientDoctorMapping
+from healthcare.db import copy_from
+
+FIRST_NAMES = [
+    'Aarav', 'Vivaan', 'Aditya', 'Arjun', 'Sai', 'Reyansh', 'Krishna', 'Ishaan',
+    'Ananya', 'Diya', 'Saanvi', 'Aadhya', 'Meera', 'Kavya', 'Priya', 'Lakshmi',
+    'Rohan', 'Karthik', 'Fatima', 'Deepa', 'Sanjay', 'Anita', 'Ravi', 'Sneha',
+]
+LAST_NAMES = [
+    'Sharma', 'Verma', 'Patel', 'Reddy', 'Nair', 'Iyer', 'Gupta', 'Singh',
+    'Kumar', 'Menon', 'Joshi', 'Desai', 'Kulkarni', 'Mishra', 'Begum', 'Rao',
+]
+CITIES = [
+    'Bangalore, Karnataka', 'Mumbai, Maharashtra', 'Chennai, Tamil Nadu',
+    'Hyderabad, Telangana', 'New Delhi', 'Pune, Maharashtra',
+    'Lucknow, Uttar Pradesh', 'Kolkata, West Bengal',
+]
+CONDITIONS = [
+    'Hypertension', 'Type 2 Diabetes', 'Asthma', 'Migraine', 'Hypothyroidism',
+    'Osteoarthritis', 'Seasonal allergies', 'Iron deficiency anemia',
+    'Coronary artery disease', 'No significant past history',
+]
+SPECIALIZATIONS = [
+    'Cardiology', 'Dermatology', 'Orthopedics', 'Pediatrics', 'Neurology',
+    'Ophthalmology', 'General Medicine', 'Gynecology', 'Psychiatry', 'Oncology',
+]
+GENDERS = ['Male', 'Female', 'Other']
+LOAD_USER_PASSWORD = 'Load@1234'
 
 
 class Command(BaseCommand):
     help = 'Seed database with synthetic healthcare data'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=0,
+                            help='Generate this many synthetic patients instead of the fixed dataset.')
+        parser.add_argument('--doctors', type=int, default=0,
+                            help='Generate this many synthetic doctors.')
+        parser.add_argument('--mappings-per-patient', type=int, default=0,
+                            help='Assign each generated patient to this many distinct doctors.')
+        parser.add_argument('--users', type=int, default=10,
+                            help='Number of load-test users that own the generated records.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed; the same seed produces the same data.')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows per INSERT/COPY batch.')
+        parser.add_argument('--copy', action='store_true',
+                            help='Load rows with Postgres COPY instead of bulk_create.')
+
     def handle(self, *args, **options):
+        if options['patients'] or options['doctors']:
+            self.seed_synthetic(**options)
+            return
+
         self.stdout.write(self.style.NOTICE('Seeding database with synthetic data...'))
 
         # ── 1. Create Users ──────────────────────────────────────────────
@@ -293,3 +355,121 @@ class Command(BaseCommand):
         for u in users_data:
             self.stdout.write(f'  {u["username"]} / {u["password"]}  ({u["email"]})')
         self.stdout.write('')
+
+    # ── Synthetic load-testing data ──────────────────────────────────────
+    def seed_synthetic(self, **options):
+        patient_total = options['patients']
+        doctor_total = options['doctors']
+        per_patient = options['mappings_per_patient']
+        batch_size = options['batch_size']
+        use_copy = options['copy']
+
+        if doctor_total and per_patient > doctor_total:
+            raise CommandError('--mappings-per-patient cannot exceed --doctors.')
+        if use_copy and connection.vendor != 'postgresql':
+            raise CommandError('--copy requires the PostgreSQL backend.')
+
+        rng = random.Random(options['seed'])
+        started = time.monotonic()
+        insert = self.copy_rows if use_copy else self.bulk_create_rows
+
+        users = self.create_load_users(options['users'])
+        self.stdout.write(self.style.SUCCESS(f'  Load-test users ready: {len(users)} (password {LOAD_USER_PASSWORD})'))
+
+        doctor_ids = []
+        for offset in range(0, doctor_total, batch_size):
+            rows = [self.fake_doctor(rng, users) for _ in range(min(batch_size, doctor_total - offset))]
+            with transaction.atomic():
+                doctor_ids += insert(Doctor, rows)
+            self.progress('Doctors', len(doctor_ids), doctor_total, started)
+        created_doctors = len(doctor_ids)
+        if not doctor_ids and per_patient:
+            # Spread the new patients over the doctors that already exist.
+            doctor_ids = list(Doctor.objects.values_list('id', flat=True))
+
+        created_patients = created_mappings = 0
+        for offset in range(0, patient_total, batch_size):
+            rows = [self.fake_patient(rng, users) for _ in range(min(batch_size, patient_total - offset))]
+            with transaction.atomic():
+                patient_ids = insert(Patient, rows)
+                mappings = [
+                    {'patient_id': patient_id, 'doctor_id': doctor_id}
+                    for patient_id in patient_ids
+                    for doctor_id in rng.sample(doctor_ids, min(per_patient, len(doctor_ids)))
+                ]
+                insert(PatientDoctorMapping, mappings)
+            created_patients += len(patient_ids)
+            created_mappings += len(mappings)
+            self.progress('Patients', created_patients, patient_total, started)
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {created_doctors} doctors, {created_patients} patients '
+            f'and {created_mappings} mappings in {time.monotonic() - started:.1f}s'
+        ))
+
+    def create_load_users(self, count):
+        # Hash once: every load-test user shares the same password.
+        password = make_password(LOAD_USER_PASSWORD)
+        User.objects.bulk_create(
+            [User(username=f'load_user_{i}', email=f'load_user_{i}@healthcare.com', password=password)
+             for i in range(count)],
+            ignore_conflicts=True,
+        )
+        return list(User.objects.filter(username__startswith='load_user_')
+                    .order_by('id').values_list('id', flat=True)[:count])
+
+    def fake_doctor(self, rng, users):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        return {
+            'created_by_id': rng.choice(users),
+            'name': f'{first} {last}',
+            'specialization': rng.choice(SPECIALIZATIONS),
+            'phone': f'+91-9{rng.randrange(10 ** 9):09d}',
+            'email': f'{first}.{last}.{rng.randrange(10 ** 6)}@hospital.com'.lower(),
+            'experience_years': rng.randint(0, 40),
+        }
+
+    def fake_patient(self, rng, users):
+        return {
+            'created_by_id': rng.choice(users),
+            'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            'age': rng.randint(0, 95),
+            'gender': rng.choice(GENDERS),
+            'phone': f'+91-9{rng.randrange(10 ** 9):09d}',
+            'address': f'{rng.randint(1, 999)}, {rng.choice(CITIES)}',
+            'medical_history': ', '.join(rng.sample(CONDITIONS, rng.randint(1, 3))) + '.',
+        }
+
+    def bulk_create_rows(self, model, rows):
+        objects = model.objects.bulk_create([model(**row) for row in rows])
+        return [obj.pk for obj in objects]
+
+    def copy_rows(self, model, rows):
+        if not rows:
+            return []
+        table = model._meta.db_table
+        now = timezone.now()
+        timestamps = [f.column for f in model._meta.concrete_fields
+                      if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)]
+        columns = ['id'] + list(rows[0]) + timestamps
+
+        with connection.cursor() as cursor:
+            # COPY cannot return generated keys, so reserve them up front.
+            cursor.execute(
+                'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+                [table, 'id', len(rows)],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for pk, row in zip(ids, rows):
+                writer.writerow([pk, *row.values(), *([now] * len(timestamps))])
+            buffer.seek(0)
+            copy_from(cursor, f'COPY {table} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer)
+        return ids
+
+    def progress(self, label, done, total, started):
+        elapsed = time.monotonic() - started
+        self.stdout.write(f'  {label}: {done}/{total} ({done / elapsed if elapsed else 0:,.0f} rows/s)')
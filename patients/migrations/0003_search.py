@@ -0,0 +1,50 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:13
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from healthcare.operations import PostgresOnly
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0002_patient_patient_owner_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='patient',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        PostgresOnly(migrations.AddIndex(
+            model_name='patient',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='patient_search_idx'),
+        )),
+        PostgresOnly(migrations.AddIndex(
+            model_name='patient',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='patient_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        )),
+        PostgresOnly(migrations.AddIndex(
+            model_name='patient',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['phone'], name='patient_phone_trgm_idx', opclasses=['gin_trgm_ops']),
+        )),
+        PostgresOnly(migrations.RunSQL(
+            sql=[
+                """
+                CREATE TRIGGER patient_search_vector_trigger
+                BEFORE INSERT OR UPDATE OF name, phone ON patients_patient
+                FOR EACH ROW EXECUTE FUNCTION
+                tsvector_update_trigger(search_vector, 'pg_catalog.simple', name, phone)
+                """,
+                "UPDATE patients_patient SET search_vector = to_tsvector('pg_catalog.simple', coalesce(name, '') || ' ' || coalesce(phone, ''))",
+            ],
+            reverse_sql="DROP TRIGGER IF EXISTS patient_search_vector_trigger ON patients_patient",
+        )),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:17
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+from healthcare.operations import PostgresOnly
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0004_query_pattern_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        PostgresOnly(migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(models.F('created_by'), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('name'), name='text_pattern_ops'), name='patient_owner_name_prefix_idx'),
+        )),
+    ]
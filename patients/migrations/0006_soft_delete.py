@@ -0,0 +1,45 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:40
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+from healthcare.operations import PostgresOnly
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0005_lookup_prefix_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patient',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['created_by', 'created_at', 'id'], name='patient_live_created_idx'),
+        ),
+        PostgresOnly(migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(models.F('created_by'), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('name'), name='text_pattern_ops'), condition=models.Q(('deleted_at__isnull', True)), name='patient_live_name_prefix_idx'),
+        )),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='patient_deleted_idx'),
+        ),
+        # Drop the old indexes once their partial replacements exist.
+        migrations.RemoveIndex(
+            model_name='patient',
+            name='patient_owner_created_idx',
+        ),
+        PostgresOnly(migrations.RemoveIndex(
+            model_name='patient',
+            name='patient_owner_name_prefix_idx',
+        )),
+    ]
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db import migrations
+
+from patients.partitioning import partition_table
+
+
+def partition(apps, schema_editor):
+    # Opt-in: a no-op unless PATIENT_PARTITIONS is set, and on SQLite.
+    if settings.PATIENT_PARTITIONS and schema_editor.connection.vendor == 'postgresql':
+        # Only partition_patients, run on live data, keeps the flat table
+        partition_table(
+            apps.get_model('patients', 'Patient'), settings.PATIENT_PARTITIONS, keep_old=False,
+            log=lambda message: None, connection=schema_editor.connection,
+        )
+
+
+class Migration(migrations.Migration):
+    # The copy commits batch by batch.
+    atomic = False
+
+    dependencies = [
+        ('patients', '0006_soft_delete'),
+        ('mappings', '0005_cascade_and_soft_delete'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+from healthcare.operations import AddFieldInPlace, PostgresOnly
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0007_change_seq'),
+        ('patients', '0007_partition_by_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddFieldInPlace(
+            model_name='patient',
+            name='change_seq',
+            field=models.BigIntegerField(db_default=0, default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['created_by', 'change_seq', 'id'], name='patient_sync_idx'),
+        ),
+        # record_change_seq() comes from doctors 0007
+        PostgresOnly(migrations.RunSQL(
+            sql=[
+                """
+                CREATE TRIGGER patient_change_seq_insert BEFORE INSERT ON patients_patient
+                FOR EACH ROW EXECUTE FUNCTION record_change_seq()
+                """,
+                """
+                CREATE TRIGGER patient_change_seq_update BEFORE UPDATE ON patients_patient
+                FOR EACH ROW WHEN (OLD.updated_at IS DISTINCT FROM NEW.updated_at
+                                   OR OLD.deleted_at IS DISTINCT FROM NEW.deleted_at)
+                EXECUTE FUNCTION record_change_seq()
+                """,
+            ],
+            reverse_sql=[
+                "DROP TRIGGER IF EXISTS patient_change_seq_insert ON patients_patient",
+                "DROP TRIGGER IF EXISTS patient_change_seq_update ON patients_patient",
+            ],
+        )),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.11 on 2026-10-18 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0009_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Purge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cutoff', models.DateTimeField()),
+                ('purged', models.BigIntegerField()),
+                ('ran_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -1,9 +1,16 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
+from django.db.models.functions import Lower
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+
+from healthcare.softdelete import SoftDeleteManager
 
 
 class Patient(models.Model):
-    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='patients')
+    # Indexed through patient_live_created_idx, which leads with created_by
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='patients', db_index=False)
     name = models.CharField(max_length=200)
     age = models.PositiveIntegerField()
     gender = models.CharField(max_length=10, choices=[
@@ -16,6 +23,71 @@ class Patient(models.Model):
     medical_history = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger from name and phone (PostgreSQL only)
+    search_vector = SearchVectorField(null=True, editable=False)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Id of the last transaction that wrote the row, for /api/sync/ (PostgreSQL only)
+    change_seq = models.BigIntegerField(default=0, db_default=0, editable=False)
+
+    objects = SoftDeleteManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        # Queries go through ``objects``, so the btree indexes skip deleted rows.
+        indexes = [
+            models.Index(
+                fields=['created_by', 'created_at', 'id'], condition=Q(deleted_at__isnull=True),
+                name='patient_live_created_idx',
+            ),
+            GinIndex(fields=['search_vector'], name='patient_search_idx'),
+            GinIndex(fields=['name'], name='patient_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['phone'], name='patient_phone_trgm_idx', opclasses=['gin_trgm_ops']),
+            models.Index(
+                'created_by', OpClass(Lower('name'), name='text_pattern_ops'),
+                condition=Q(deleted_at__isnull=True), name='patient_live_name_prefix_idx',
+            ),
+            models.Index(fields=['deleted_at'], condition=Q(deleted_at__isnull=False), name='patient_deleted_idx'),
+            # Deleted rows included: they are the tombstones /api/sync/ reports
+            models.Index(fields=['created_by', 'change_seq', 'id'], name='patient_sync_idx'),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class ImportCheckpoint(models.Model):
+    """
+    How far ``manage.py import_records`` got through a file. Saved in the
+    same transaction as each batch's rows, so a resumed import never writes
+    a committed batch twice.
+    """
+    kind = models.CharField(max_length=20)
+    path = models.CharField(max_length=1024)
+    offset = models.BigIntegerField(default=0)
+    line = models.BigIntegerField(default=0)
+    imported = models.BigIntegerField(default=0)
+    rejected = models.BigIntegerField(default=0)
+    complete = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'path'], name='import_checkpoint_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.path} @ line {self.line}'
+
+
+class Purge(models.Model):
+    """
+    A ``manage.py purge_deleted`` run that trimmed sync tombstones.
+    Deletions at or before ``cutoff`` are forgotten, so sync tokens issued
+    before it can no longer report them.
+    """
+    cutoff = models.DateTimeField()
+    purged = models.BigIntegerField()
+    ran_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.purged} tombstones trimmed before {self.cutoff}'
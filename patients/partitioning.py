@@ -0,0 +1,237 @@
+"""
+Hash partitioning of the patients table on ``created_by_id`` (PostgreSQL 13+).
+
+Patients are always read through their owner, so once the table is split
+into hash partitions the planner prunes each request to one partition,
+whose indexes are a fraction of the size of the flat table's. The model,
+queries and migrations work the same on either layout.
+
+``partition_table`` converts the table while it stays in use:
+
+1. A trigger starts recording the ids of rows written during the
+   conversion, and an empty partitioned copy of the table is created.
+2. Rows are copied over in id-ordered batches, one transaction each, and
+   the copy is indexed. An interrupted run resumes after the last batch.
+3. Under a short exclusive lock, the recorded rows are copied again, the
+   tables are swapped and the table's triggers are recreated.
+
+A unique key on a partitioned table must include the partition key, so
+tables such as mappings can no longer reference ``patients(id)`` with a
+foreign key. Their foreign keys are replaced by triggers: writes check
+that the patient exists, and deleting a patient deletes its rows there.
+Like a foreign key, the check takes a ``FOR KEY SHARE`` lock on the
+patient row, so a concurrent delete of that patient waits for the write to
+commit (and then removes its rows) instead of leaving them orphaned.
+
+The flat table is kept as ``<table>_unpartitioned`` unless ``keep_old`` is
+false; drop it once the partitioned table has been checked.
+"""
+from django.db import connection as default_connection
+from django.db import transaction
+
+
+def is_partitioned(cursor, table):
+    cursor.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = %s::regclass", [table])
+    return cursor.fetchone()[0]
+
+
+def partition_counts(model, connection=default_connection):
+    """``(partition, rows)`` for each partition of ``model``'s table."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, c.reltuples::bigint FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass ORDER BY c.relname
+            """,
+            [model._meta.db_table],
+        )
+        return cursor.fetchall()
+
+
+def referencing_columns(model):
+    """``(table, column)`` of every foreign key pointing at ``model``."""
+    return [
+        (rel.related_model._meta.db_table, rel.field.column)
+        for rel in model._meta.related_objects
+        if rel.one_to_many and rel.field.concrete
+    ]
+
+
+def partition_table(model, partitions, batch_size=50000, keep_old=True, log=print,
+                    connection=default_connection):
+    table = model._meta.db_table
+    names = {
+        'table': table,
+        'new': f'{table}_partitioned',
+        'old': f'{table}_unpartitioned',
+        'changes': f'{table}_changes',
+        'sequence': f'{table}_partitioned_id_seq',
+        'key': model._meta.get_field('created_by').column,
+    }
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        if is_partitioned(cursor, table):
+            log(f'{table} is already partitioned.')
+            return
+        cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [names['new']])
+        resuming = cursor.fetchone()[0]
+
+    if resuming:
+        log(f'Resuming the copy into {names["new"]}.')
+    else:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            create_partitioned_copy(cursor, names, partitions)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT coalesce(max(id), 0) FROM {quote(table)}')
+        last_id = cursor.fetchone()[0]
+        cursor.execute(f'SELECT coalesce(max(id), 0) FROM {quote(names["new"])}')
+        copied_id = cursor.fetchone()[0]
+
+    while copied_id < last_id:
+        upper = min(copied_id + batch_size, last_id)
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {quote(names["new"])} SELECT * FROM {quote(table)} WHERE id > %s AND id <= %s',
+                [copied_id, upper],
+            )
+        copied_id = upper
+        log(f'  copied ids up to {copied_id} of {last_id}')
+
+    temporary = create_indexes(model, names['new'], connection)
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {quote(names["new"])}')
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        swap(cursor, model, names, temporary, keep_old)
+    log(f'{table} is now hash partitioned on {names["key"]} into {partitions} partitions.')
+
+
+def create_partitioned_copy(cursor, names, partitions):
+    table, new = names['table'], names['new']
+    cursor.execute(f'CREATE TABLE {names["changes"]} (id bigint PRIMARY KEY)')
+    cursor.execute(f"""
+        CREATE FUNCTION {table}_record_change() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO {names["changes"]}
+            VALUES (CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END)
+            ON CONFLICT DO NOTHING;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER {table}_record_change AFTER INSERT OR UPDATE OR DELETE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {table}_record_change()
+    """)
+    # Columns, NOT NULL and CHECK constraints, but not the identity: ids
+    # come from a sequence so rows keep theirs.
+    cursor.execute(
+        f'CREATE TABLE {new} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY HASH ({names["key"]})'
+    )
+    cursor.execute(f'CREATE SEQUENCE {names["sequence"]} OWNED BY {new}.id')
+    cursor.execute(f"ALTER TABLE {new} ALTER COLUMN id SET DEFAULT nextval('{names['sequence']}')")
+    cursor.execute(f'ALTER TABLE {new} ADD PRIMARY KEY (id, {names["key"]})')
+    cursor.execute(f"""
+        SELECT pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'f'
+    """, [table])
+    for (definition,) in cursor.fetchall():
+        cursor.execute(f'ALTER TABLE {new} ADD {definition}')
+    for remainder in range(partitions):
+        cursor.execute(
+            f'CREATE TABLE {table}_p{remainder} PARTITION OF {new} '
+            f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+        )
+
+
+def create_indexes(model, new, connection):
+    """Build ``model``'s indexes on ``new`` under temporary names; returns ``{temporary: name}``."""
+    temporary = {}
+    with connection.schema_editor(atomic=False) as schema_editor:
+        for index in model._meta.indexes:
+            clone = index.clone()
+            clone.name = f'{index.name}_new'
+            statement = clone.create_sql(model, schema_editor)
+            statement.rename_table_references(model._meta.db_table, new)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT to_regclass(%s) IS NULL', [clone.name])
+                if cursor.fetchone()[0]:
+                    schema_editor.execute(statement)
+            temporary[clone.name] = index.name
+    return temporary
+
+
+def swap(cursor, model, names, temporary, keep_old):
+    table, new = names['table'], names['new']
+    cursor.execute(f'LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE')
+    cursor.execute(f'DELETE FROM {new} WHERE id IN (SELECT id FROM {names["changes"]})')
+    cursor.execute(f'INSERT INTO {new} SELECT * FROM {table} WHERE id IN (SELECT id FROM {names["changes"]})')
+    cursor.execute(f"SELECT setval('{names['sequence']}', greatest((SELECT max(id) FROM {new}), 1))")
+
+    cursor.execute(f'DROP TRIGGER {table}_record_change ON {table}')
+    cursor.execute(f'DROP FUNCTION {table}_record_change()')
+    cursor.execute(f'DROP TABLE {names["changes"]}')
+    cursor.execute("""
+        SELECT tgname, pg_get_triggerdef(oid) FROM pg_trigger
+        WHERE tgrelid = %s::regclass AND NOT tgisinternal
+    """, [table])
+    triggers = cursor.fetchall()
+
+    references = referencing_columns(model)
+    for related_table, _ in references:
+        cursor.execute("""
+            SELECT conname FROM pg_constraint
+            WHERE conrelid = %s::regclass AND confrelid = %s::regclass AND contype = 'f'
+        """, [related_table, table])
+        for (constraint,) in cursor.fetchall():
+            cursor.execute(f'ALTER TABLE {related_table} DROP CONSTRAINT {constraint}')
+
+    if keep_old:
+        for name, _ in triggers:
+            cursor.execute(f'DROP TRIGGER {name} ON {table}')
+        cursor.execute(f'ALTER TABLE {table} RENAME TO {names["old"]}')
+        for name in temporary.values():
+            cursor.execute(f'ALTER INDEX IF EXISTS {name} RENAME TO {name}_old')
+    else:
+        cursor.execute(f'DROP TABLE {table}')
+    cursor.execute(f'ALTER TABLE {new} RENAME TO {table}')
+    for temporary_name, name in temporary.items():
+        cursor.execute(f'ALTER INDEX {temporary_name} RENAME TO {name}')
+    for _, definition in triggers:
+        cursor.execute(definition)
+
+    for related_table, column in references:
+        cursor.execute(f"""
+            CREATE OR REPLACE FUNCTION {related_table}_{column}_exists() RETURNS trigger AS $$
+            BEGIN
+                PERFORM 1 FROM {table} WHERE id = NEW.{column} FOR KEY SHARE;
+                IF NOT FOUND THEN
+                    RAISE foreign_key_violation USING MESSAGE = format(
+                        'Key ({column})=(%s) is not present in table "{table}".', NEW.{column});
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        cursor.execute(f"""
+            CREATE CONSTRAINT TRIGGER {related_table}_{column}_exists
+            AFTER INSERT OR UPDATE OF {column} ON {related_table}
+            DEFERRABLE INITIALLY DEFERRED
+            FOR EACH ROW EXECUTE FUNCTION {related_table}_{column}_exists()
+        """)
+        cursor.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_delete_{related_table}() RETURNS trigger AS $$
+            BEGIN
+                DELETE FROM {related_table} WHERE {column} = OLD.id;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER {table}_delete_{related_table} AFTER DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_delete_{related_table}()
+        """)
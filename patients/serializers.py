@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from healthcare.serializers import ValuesSerializer
 from .models import Patient
 
 
@@ -8,3 +10,6 @@ class PatientSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'age', 'gender', 'phone', 'address',
                   'medical_history', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+patient_values = ValuesSerializer(PatientSerializer)
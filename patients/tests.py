@@ -0,0 +1,265 @@
+import csv
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from doctors.models import Doctor
+from healthcare.testing import (
+    AuthenticatedTestCase, QueryCountTestCase, assign, make_doctors, make_patients, make_user,
+)
+from mappings.models import PatientDoctorMapping
+from sync.models import Tombstone
+
+from .management.commands.import_records import Command as ImportRecords
+from .models import ImportCheckpoint, Patient, Purge
+from .serializers import PatientSerializer
+
+
+class PatientListQueryCountTests(QueryCountTestCase):
+    def add_patients(self, count):
+        make_patients(self.user, count, start=self.user.patients.count())
+
+    def test_list(self):
+        response = self.assertConstantQueries('/api/patients/?page_size=100', self.add_patients)
+        self.assertEqual(len(response.data['results']), 50)
+
+    def test_list_with_projection(self):
+        response = self.assertConstantQueries('/api/patients/?page_size=100&fields=id,name', self.add_patients)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+
+    def test_lookup(self):
+        self.assertConstantQueries('/api/patients/lookup/?q=Patient', self.add_patients)
+
+
+class PatientPaginationTests(AuthenticatedTestCase):
+    def pages(self, url):
+        ids, links = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+            links.append(url)
+        return ids, links[:-1]
+
+    def test_rows_with_equal_timestamps_are_neither_repeated_nor_skipped(self):
+        patients = make_patients(self.user, 11)
+        Patient.objects.update(created_at=timezone.now())
+
+        ids, links = self.pages('/api/patients/?page_size=3&fields=id,name')
+        self.assertEqual(ids, [patient.pk for patient in patients])
+        self.assertEqual(len(links), 3)
+        for link in links:
+            self.assertIn('page_size=3', link)
+            self.assertIn('fields=id%2Cname', link)
+
+    def test_invalid_cursor(self):
+        for cursor in ['not-base64!', 'WzFd', 'WyJ4IiwgMV0']:
+            with self.subTest(cursor):
+                response = self.client.get('/api/patients/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class PatientSearchTests(AuthenticatedTestCase):
+    """``?q=`` on SQLite: the ``icontains`` fallback with ``RankedPagination``."""
+
+    def setUp(self):
+        super().setUp()
+        self.matches = make_patients(self.user, 7)
+        Patient.objects.create(created_by=self.user, name='Someone Else', age=40, gender='Male')
+        make_patients(make_user('other'), 2)
+        Patient.objects.update(created_at=timezone.now())
+
+    def test_pages_are_stable(self):
+        ids, url = [], '/api/patients/?q=patient&page_size=2&fields=id'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+            if url:
+                self.assertIn('q=patient', url)
+        self.assertEqual(ids, [patient.pk for patient in self.matches])
+
+    def test_no_terms(self):
+        response = self.client.get('/api/patients/', {'q': '!!'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/patients/', {'q': 'patient', 'cursor': 'WyJ4Il0'})
+        self.assertEqual(response.status_code, 404)
+
+
+class PatientExportTests(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.patients = make_patients(self.user, 3)
+        Patient.objects.filter(pk=self.patients[0].pk).update(phone=None, address='1 Main St, "Flat 2"\nTown')
+        make_patients(make_user('other'), 2, start=3)
+
+    def export(self, **params):
+        response = self.client.get('/api/patients/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def serialized(self):
+        return PatientSerializer(Patient.objects.filter(created_by=self.user).order_by('id'), many=True).data
+
+    def test_ndjson(self):
+        lines = self.export().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], json.loads(json.dumps(self.serialized())))
+
+    def test_csv(self):
+        rows = list(csv.DictReader(StringIO(self.export(type='csv'))))
+        expected = [
+            {key: '' if value is None else str(value) for key, value in row.items()}
+            for row in self.serialized()
+        ]
+        self.assertEqual(rows, expected)
+
+    def test_unknown_type(self):
+        response = self.client.get('/api/patients/export/', {'type': 'xml'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('type', response.data)
+
+
+class PatientBulkTests(AuthenticatedTestCase):
+    def test_boolean_ids_are_not_primary_keys(self):
+        # id 1, the row that True would select if it were taken as an id
+        patient = Patient.objects.create(id=1, created_by=self.user, name='Patient 0', age=30, gender='Female')
+        item = {'name': 'Renamed', 'age': 40, 'gender': 'Male'}
+
+        response = self.client.put('/api/patients/bulk/', [{'id': True, **item}], format='json')
+        self.assertEqual(response.data['results'][0]['status'], 404)
+        response = self.client.delete('/api/patients/bulk/', [True], format='json')
+        self.assertEqual(response.data['results'][0]['status'], 404)
+
+        patient.refresh_from_db()
+        self.assertEqual(patient.name, 'Patient 0')
+        self.assertIsNone(patient.deleted_at)
+
+
+class PatientPreconditionTests(AuthenticatedTestCase):
+    def test_write_with_stale_etag_fails(self):
+        patient = make_patients(self.user, 1)[0]
+        url = f'/api/patients/{patient.pk}/'
+        etag = self.client.get(url)['ETag']
+        item = {'name': 'First', 'age': 40, 'gender': 'Male'}
+
+        response = self.client.put(url, item, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        # A second writer still holding the original ETag
+        response = self.client.put(url, {**item, 'name': 'Second'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        response = self.client.delete(url, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+
+        patient.refresh_from_db()
+        self.assertEqual(patient.name, 'First')
+        self.assertIsNone(patient.deleted_at)
+
+
+class PurgeDeletedTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.patients = make_patients(self.user, 30)
+        self.doctors = make_doctors(self.user, 3)
+        # doctors[0] has more assignments than one batch allows
+        assign(self.patients, self.doctors[:1])
+        assign(self.patients[:5], self.doctors[1:])
+
+    def purge(self, **options):
+        out = StringIO()
+        call_command('purge_deleted', batch_size=10, stdout=out, **options)
+        return out.getvalue()
+
+    def test_purges_in_batches(self):
+        long_ago = timezone.now() - timedelta(days=8)
+        deleted = [patient.pk for patient in self.patients[:12]]
+        Patient.all_objects.filter(pk__in=deleted).update(deleted_at=long_ago)
+        Doctor.all_objects.filter(pk=self.doctors[0].pk).update(deleted_at=long_ago)
+
+        out = self.purge()
+        # 12 patients with 12 + 2 * 5 assignments, then the doctor with its
+        # 18 remaining ones, trimmed in batches first
+        self.assertIn('patients: 12 purged, 22 mappings removed', out)
+        self.assertIn('doctors: 1 purged, 18 mappings removed', out)
+        self.assertFalse(Patient.all_objects.filter(pk__in=deleted).exists())
+        self.assertEqual(Patient.all_objects.count(), 18)
+        self.assertEqual(list(Doctor.all_objects.values_list('pk', flat=True)), [d.pk for d in self.doctors[1:]])
+        self.assertEqual(PatientDoctorMapping.all_objects.count(), 0)
+        # Purged rows leave tombstones, so sync still reports them
+        self.assertCountEqual(Tombstone.objects.filter(model='patients').values_list('object_id', flat=True), deleted)
+        self.assertEqual(Tombstone.objects.filter(model='doctors').count(), 1)
+        self.assertFalse(Purge.objects.exists())
+
+    def test_trims_old_tombstones(self):
+        Tombstone.objects.create(model='patients', object_id=1, deleted_at=timezone.now() - timedelta(days=8))
+        Tombstone.objects.create(model='patients', object_id=2, deleted_at=timezone.now() - timedelta(days=6))
+
+        self.assertIn('tombstones: 1 trimmed', self.purge())
+        self.assertEqual(list(Tombstone.objects.values_list('object_id', flat=True)), [2])
+        self.assertEqual(list(Purge.objects.values_list('purged', flat=True)), [1])
+
+    def test_keeps_deletions_for_the_sync_token_lifetime(self):
+        Patient.all_objects.filter(pk=self.patients[0].pk).update(deleted_at=timezone.now() - timedelta(days=10))
+        Patient.objects.filter(pk=self.patients[1].pk).soft_delete()
+        Patient.all_objects.filter(pk=self.patients[2].pk).update(deleted_at=timezone.now() - timedelta(days=6))
+
+        self.assertIn('patients: 1 purged, 3 mappings removed', self.purge())
+        self.assertEqual(
+            list(Patient.all_objects.filter(deleted_at__isnull=False).order_by('pk').values_list('pk', flat=True)),
+            [self.patients[1].pk, self.patients[2].pk],
+        )
+
+    def test_refuses_a_shorter_retention(self):
+        with self.assertRaisesMessage(CommandError, 'at least SYNC_TOKEN_MAX_DAYS (7)'):
+            self.purge(older_than=1)
+        self.assertIn('patients: 0 purged', self.purge(older_than=30))
+        self.assertFalse(Purge.objects.exists())
+
+
+class ImportResumeTests(TransactionTestCase):
+    """Each batch commits with its checkpoint row, like a real import."""
+
+    def setUp(self):
+        self.user = make_user()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'patients.ndjson'
+        self.path.write_text(''.join(
+            json.dumps({'name': f'Patient {i}', 'age': 30, 'gender': 'Male'}) + '\n' for i in range(10)
+        ))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_import(self, *args):
+        call_command('import_records', 'patients', str(self.path), '--owner', 'owner', '--batch-size', '4',
+                     *args, stdout=StringIO())
+
+    def test_crash_after_commit_does_not_duplicate_the_batch(self):
+        # Dies after the first batch committed, before the checkpoint file
+        with mock.patch.object(ImportRecords, 'save_checkpoint', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_import()
+        self.assertEqual(Patient.objects.count(), 4)
+        self.assertFalse(Path(f'{self.path}.checkpoint').exists())
+
+        self.run_import()
+        names = sorted(Patient.objects.values_list('name', flat=True))
+        self.assertEqual(names, sorted(f'Patient {i}' for i in range(10)))
+        checkpoint = ImportCheckpoint.objects.get(kind='patients', path=str(self.path.resolve()))
+        self.assertEqual((checkpoint.imported, checkpoint.complete), (10, True))
+        self.assertEqual(json.loads(Path(f'{self.path}.checkpoint').read_text())['imported'], 10)
+
+    def test_restart_imports_again(self):
+        self.run_import()
+        self.run_import('--restart')
+        self.assertEqual(Patient.objects.count(), 20)
@@ -1,7 +1,13 @@
 from django.urls import path
-from .views import PatientListCreateView, PatientDetailView
+from .views import (
+    PatientListCreateView, PatientDetailView, PatientBulkView, PatientExportView,
+    PatientLookupView,
+)
 
 urlpatterns = [
     path('', PatientListCreateView.as_view(), name='patient-list-create'),
     path('<int:pk>/', PatientDetailView.as_view(), name='patient-detail'),
+    path('bulk/', PatientBulkView.as_view(), name='patient-bulk'),
+    path('export/', PatientExportView.as_view(), name='patient-export'),
+    path('lookup/', PatientLookupView.as_view(), name='patient-lookup'),
 ]
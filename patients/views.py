@@ -1,20 +1,51 @@
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat
 from django.shortcuts import get_object_or_404
 
+from healthcare.bulk import (
+    bulk_delete, bulk_response, create_valid, get_bulk_items,
+    update_valid, validate_items, validate_updates,
+)
+from healthcare.conditional import check_preconditions, collection_etag, object_etag
+from healthcare.export import export_response
+from healthcare.lookup import lookup_response
+from healthcare.pagination import KeysetPagination, RankedPagination
+from healthcare.renderers import FastJSONRenderer
+from healthcare.search import search_queryset
+from healthcare.softdelete import delete_object
 from .models import Patient
-from .serializers import PatientSerializer
+from .serializers import PatientSerializer, patient_values
 
 
 class PatientListCreateView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    search_fields = ['name', 'phone']
 
     def get(self, request):
+        values = patient_values.project(request)
         patients = Patient.objects.filter(created_by=request.user)
-        serializer = PatientSerializer(patients, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        etag = collection_etag(request, patients, 'updated_at')
+        response = check_preconditions(request, etag)
+        if response is not None:
+            return response
+
+        paginator = self.pagination_class()
+        q = request.query_params.get('q', '').strip()
+        if q:
+            patients = search_queryset(patients, q, self.search_fields)
+            paginator = RankedPagination()
+        page = paginator.paginate_queryset(values.values(patients, *paginator.ordering), request, view=self)
+        response = paginator.get_paginated_response(values.to_representation(page))
+        response['ETag'] = etag
+        return response
 
     def post(self, request):
         serializer = PatientSerializer(data=request.data)
@@ -27,26 +58,82 @@ class PatientListCreateView(APIView):
 class PatientDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get_object(self, pk, user):
-        return get_object_or_404(Patient, pk=pk, created_by=user)
+    def get_object(self, pk, user, queryset=Patient.objects):
+        return get_object_or_404(queryset, pk=pk, created_by=user)
 
     def get(self, request, pk):
-        patient = self.get_object(pk, request.user)
-        serializer = PatientSerializer(patient)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        values = patient_values.project(request)
+        # Only the rendered columns, and updated_at for the ETag, are read
+        patient = self.get_object(pk, request.user, Patient.objects.only('updated_at', *values.columns))
+        etag = object_etag(patient, values.projection)
+        response = check_preconditions(request, etag)
+        if response is not None:
+            return response
+        return Response(values.serializer(patient).data, status=status.HTTP_200_OK, headers={'ETag': etag})
 
+    @transaction.atomic
     def put(self, request, pk):
-        patient = self.get_object(pk, request.user)
+        # Locked until commit: a concurrent write waits, then fails If-Match
+        patient = self.get_object(pk, request.user, Patient.objects.select_for_update())
+        response = check_preconditions(request, object_etag(patient))
+        if response is not None:
+            return response
         serializer = PatientSerializer(patient, data=request.data)
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return Response(serializer.data, status=status.HTTP_200_OK, headers={'ETag': object_etag(patient)})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @transaction.atomic
     def delete(self, request, pk):
-        patient = self.get_object(pk, request.user)
-        patient.delete()
+        patient = self.get_object(pk, request.user, Patient.objects.select_for_update())
+        response = check_preconditions(request, object_etag(patient))
+        if response is not None:
+            return response
+        delete_object(patient)
         return Response(
             {'message': 'Patient record deleted successfully.'},
             status=status.HTTP_204_NO_CONTENT
         )
+
+
+class PatientBulkView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        items = get_bulk_items(request)
+        results, valid = validate_items(PatientSerializer, items)
+        create_valid(Patient, valid, results, created_by=request.user)
+        return bulk_response(results, status.HTTP_201_CREATED)
+
+    def put(self, request):
+        items = get_bulk_items(request)
+        queryset = Patient.objects.filter(created_by=request.user)
+        results, valid = validate_updates(queryset, PatientSerializer, items)
+        update_valid(Patient, valid, results)
+        return bulk_response(results)
+
+    def delete(self, request):
+        ids = get_bulk_items(request)
+        results = bulk_delete(Patient.objects.filter(created_by=request.user), ids)
+        return bulk_response(results)
+
+
+class PatientExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        patients = Patient.objects.filter(created_by=request.user).order_by('id')
+        return export_response(request, patients, PatientSerializer, 'patients')
+
+
+class PatientLookupView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        label = Concat(
+            'name', Value(' (Age: '), Cast('age', CharField()), Value(')'),
+            output_field=CharField(),
+        )
+        patients = Patient.objects.filter(created_by=request.user)
+        return lookup_response(request, patients, label, ['name'])
@@ -0,0 +1,28 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = 'stats:version'
+
+
+def get_cached_stats(user_id):
+    if not settings.STATS_CACHE_TIMEOUT:
+        return None
+    return cache.get(_stats_key(user_id))
+
+
+def set_cached_stats(user_id, stats):
+    if settings.STATS_CACHE_TIMEOUT:
+        cache.set(_stats_key(user_id), stats, settings.STATS_CACHE_TIMEOUT)
+
+
+def invalidate_stats():
+    # Counts of doctors and mappings are shared by every user, so any write
+    # retires all cached entries at once by switching to a new version.
+    cache.set(VERSION_KEY, uuid4().hex, None)
+
+
+def _stats_key(user_id):
+    version = cache.get_or_set(VERSION_KEY, uuid4().hex, None)
+    return f'stats:{version}:{user_id}'
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from doctors.models import Doctor
+from healthcare.signals import bulk_write
+from mappings.models import PatientDoctorMapping
+from patients.models import Patient
+
+from .cache import invalidate_stats
+
+
+@receiver(post_save, sender=Patient)
+@receiver(post_delete, sender=Patient)
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_save, sender=PatientDoctorMapping)
+@receiver(post_delete, sender=PatientDoctorMapping)
+@receiver(bulk_write)
+def invalidate_stats_on_write(sender, **kwargs):
+    invalidate_stats()
@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.test import override_settings
+
+from doctors.models import Doctor
+from healthcare.testing import AuthenticatedTestCase, assign, make_doctors, make_patients, make_user
+from mappings.models import PatientDoctorMapping
+from patients.models import Patient
+
+
+class StatsTests(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.patients = make_patients(self.user, 3)
+        self.doctors = make_doctors(self.user, 2)
+        assign(self.patients[:2], self.doctors)
+        # Another user's patients count for them only
+        make_patients(make_user('other'), 4, start=3)
+
+    def stats(self):
+        response = self.client.get('/api/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_counts(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.stats(), {'patients': 3, 'doctors': 2, 'mappings': 4})
+
+    @override_settings(STATS_CACHE_TIMEOUT=60)
+    def test_cached_until_a_write(self):
+        self.assertEqual(self.stats()['patients'], 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.stats()['patients'], 3)
+
+        writes = [
+            ('patient saved', lambda: Patient.objects.create(created_by=self.user, name='New', age=5, gender='Male'),
+             'patients', 4),
+            ('patient deleted', lambda: Patient.objects.get(pk=self.patients[2].pk).delete(), 'patients', 3),
+            ('doctor saved', lambda: Doctor.objects.create(created_by=self.user, name='New', specialization='ENT'),
+             'doctors', 3),
+            ('mapping deleted', lambda: PatientDoctorMapping.objects.order_by('pk').first().delete(), 'mappings', 3),
+            ('bulk write', lambda: self.client.post('/api/doctors/bulk/', [
+                {'name': 'Bulk', 'specialization': 'ENT'},
+            ], format='json'), 'doctors', 4),
+        ]
+        for name, write, key, expected in writes:
+            with self.subTest(name):
+                write()
+                self.assertEqual(self.stats()[key], expected)
+                with self.assertNumQueries(0):
+                    self.stats()
+
+    @override_settings(STATS_CACHE_TIMEOUT=60)
+    def test_entries_are_per_user(self):
+        self.assertEqual(self.stats()['patients'], 3)
+        self.client.force_authenticate(make_user('third'))
+        self.assertEqual(self.stats()['patients'], 0)
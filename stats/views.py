@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from doctors.models import Doctor
+from mappings.models import PatientDoctorMapping
+from patients.models import Patient
+
+from .cache import get_cached_stats, set_cached_stats
+
+
+def count_subquery(queryset):
+    counts = (
+        queryset.order_by()
+        .annotate(group=Value(1))
+        .values('group')
+        .annotate(total=Count('*'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class StatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        stats = get_cached_stats(request.user.pk)
+        if stats is None:
+            # One round trip: each count is a scalar subquery on the user row.
+            counts = User.objects.filter(pk=request.user.pk).values(
+                patient_count=count_subquery(Patient.objects.filter(created_by=OuterRef('pk'))),
+                doctor_count=count_subquery(Doctor.objects.all()),
+                mapping_count=count_subquery(PatientDoctorMapping.objects.all()),
+            ).get()
+            stats = {
+                'patients': counts['patient_count'],
+                'doctors': counts['doctor_count'],
+                'mappings': counts['mapping_count'],
+            }
+            set_cached_stats(request.user.pk, stats)
+        return Response(stats, status=status.HTTP_200_OK)
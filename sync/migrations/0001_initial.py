@@ -0,0 +1,89 @@
+# Generated by Django 5.2.11 on 2026-10-18 21:44
+
+import django.db.models.deletion
+import django.db.models.functions.datetime
+from django.conf import settings
+from django.db import migrations, models
+
+from healthcare.operations import PostgresOnly, SQLiteOnly
+
+# (table, model name, column holding the owner or None)
+DELETED_TABLES = [
+    ('patients_patient', 'patients', 'created_by_id'),
+    ('doctors_doctor', 'doctors', None),
+]
+
+# TG_ARGV: the model name, then the owner column if rows have one
+TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sync_tombstone (model, object_id, owner_id, deleted_at, change_seq)
+    VALUES (
+        TG_ARGV[0], OLD.id,
+        CASE WHEN TG_NARGS > 1 THEN (to_jsonb(OLD) ->> TG_ARGV[1])::bigint END,
+        now(), pg_current_xact_id()::text::bigint
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def postgresql_trigger(table, name, owner):
+    arguments = f"'{name}'" + (f", '{owner}'" if owner else '')
+    return f"""
+        CREATE TRIGGER {table}_tombstone AFTER DELETE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION record_tombstone({arguments})
+    """
+
+
+# Microseconds, as Django writes them, so equal timestamps compare equal
+def sqlite_trigger(table, name, owner):
+    return f"""
+        CREATE TRIGGER {table}_tombstone AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO sync_tombstone (model, object_id, owner_id, deleted_at, change_seq)
+            VALUES ('{name}', OLD.id, {f'OLD.{owner}' if owner else 'NULL'},
+                    STRFTIME('%Y-%m-%d %H:%M:%f', 'now') || '000', 0);
+        END
+    """
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('doctors', '0007_change_seq'),
+        ('patients', '0010_purge'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+                ('change_seq', models.BigIntegerField(db_default=0, default=0)),
+                ('owner', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'owner', 'change_seq', 'id'], name='tombstone_sync_idx'), models.Index(fields=['deleted_at'], name='tombstone_deleted_idx')],
+            },
+        ),
+        # Triggers rather than signals: purges and hard deletes are plain
+        # SQL and send none. Tables partitioned later keep them.
+        PostgresOnly(migrations.RunSQL(
+            sql=[TOMBSTONE_FUNCTION] + [postgresql_trigger(*table) for table in DELETED_TABLES],
+            reverse_sql=[
+                f'DROP TRIGGER IF EXISTS {table}_tombstone ON {table}' for table, _, _ in DELETED_TABLES
+            ] + ['DROP FUNCTION IF EXISTS record_tombstone()'],
+        )),
+        SQLiteOnly(migrations.RunSQL(
+            sql=[sqlite_trigger(*table) for table in DELETED_TABLES],
+            reverse_sql=[f'DROP TRIGGER IF EXISTS {table}_tombstone' for table, _, _ in DELETED_TABLES],
+        )),
+    ]
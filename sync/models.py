@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.db import models
+from django.db.models.functions import Now
+
+
+class Tombstone(models.Model):
+    """
+    A deleted patient or doctor, for /api/sync/. Written by database
+    triggers on every delete, whatever issued it: the API, ``hard_delete``,
+    ``purge_deleted`` or a cascade. ``purge_deleted`` trims them once they
+    are older than ``SYNC_TOKEN_MAX_DAYS``.
+    """
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    # The patient's owner; doctors are synced to everyone. No foreign key:
+    # deleting a user writes its patients' tombstones after the user is gone.
+    owner = models.ForeignKey(
+        User, null=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+',
+    )
+    deleted_at = models.DateTimeField(db_default=Now())
+    # Id of the deleting transaction, as for the rows (PostgreSQL only)
+    change_seq = models.BigIntegerField(default=0, db_default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'owner', 'change_seq', 'id'], name='tombstone_sync_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id} deleted at {self.deleted_at}'
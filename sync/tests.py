@@ -0,0 +1,90 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from doctors.models import Doctor
+from healthcare.softdelete import hard_delete
+from healthcare.testing import AuthenticatedTestCase, make_doctors, make_patients, make_user
+from patients.models import Patient
+
+from .models import Tombstone
+
+
+class SyncDeletionTests(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.patients = make_patients(self.user, 3)
+
+    def first_sync(self, days_ago=0):
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() - timedelta(days=days_ago)):
+            response = self.client.get('/api/sync/')
+        self.assertEqual(len(response.data['patients']), Patient.objects.filter(created_by=self.user).count())
+        return response.data['next']
+
+    def sync(self, token):
+        response = self.client.get('/api/sync/', {'since': token})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_reports_hard_deletions(self):
+        token = self.first_sync()
+        self.client.delete(f'/api/patients/{self.patients[0].pk}/')
+        data = self.sync(token)
+        self.assertEqual(data['deleted'], {'patients': [self.patients[0].pk], 'doctors': []})
+        self.assertEqual(self.sync(data['next'])['deleted']['patients'], [])
+
+    @override_settings(SOFT_DELETE=True)
+    def test_reports_soft_deletions(self):
+        token = self.first_sync()
+        self.client.delete(f'/api/patients/{self.patients[0].pk}/')
+        self.assertEqual(self.sync(token)['deleted']['patients'], [self.patients[0].pk])
+
+    def test_reports_deleted_doctors(self):
+        doctor = make_doctors(make_user('other'), 1)[0]
+        token = self.first_sync()
+        hard_delete(Doctor, [doctor.pk])
+        self.assertEqual(self.sync(token)['deleted']['doctors'], [doctor.pk])
+
+    def test_skips_other_users_and_earlier_deletions(self):
+        other = make_patients(make_user('other'), 1)[0]
+        hard_delete(Patient, [self.patients[0].pk])
+        token = self.first_sync()
+        hard_delete(Patient, [other.pk])
+        self.assertEqual(self.sync(token)['deleted']['patients'], [])
+
+    def test_pages_deletions(self):
+        token = self.first_sync()
+        hard_delete(Patient, [patient.pk for patient in self.patients])
+        with self.settings(SYNC_PAGE_SIZE=2):
+            data = self.sync(token)
+            self.assertTrue(data['more'])
+            self.assertEqual(data['deleted']['patients'], [patient.pk for patient in self.patients[:2]])
+            data = self.sync(data['next'])
+        self.assertFalse(data['more'])
+        self.assertEqual(data['deleted']['patients'], [self.patients[2].pk])
+
+    @override_settings(SOFT_DELETE=True)
+    def test_reports_purged_rows(self):
+        token = self.first_sync(days_ago=10)
+        Patient.all_objects.filter(pk=self.patients[0].pk).update(deleted_at=timezone.now() - timedelta(days=9))
+        call_command('purge_deleted', stdout=StringIO())
+
+        # SYNC_TOKEN_MAX_DAYS raised after the purge: the row is gone, but
+        # its tombstone still reports it
+        with self.settings(SYNC_TOKEN_MAX_DAYS=30):
+            self.assertEqual(self.sync(token)['deleted']['patients'], [self.patients[0].pk])
+
+    def test_token_issued_before_a_purge_is_gone(self):
+        token = self.first_sync(days_ago=10)
+        hard_delete(Patient, [self.patients[0].pk])
+        Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=9))
+        call_command('purge_deleted', stdout=StringIO())
+
+        with self.settings(SYNC_TOKEN_MAX_DAYS=30):
+            response = self.client.get('/api/sync/', {'since': token})
+        self.assertEqual(response.status_code, 410)
+        self.assertIn('purged', response.data['error'])
@@ -0,0 +1,171 @@
+"""
+``GET /api/sync/?since=<token>``: the user's patients and the doctors
+created, updated or deleted since an earlier sync, for offline clients.
+
+Each response holds up to ``SYNC_PAGE_SIZE`` changed rows and as many
+deleted ids per model, and a ``next`` token. Clients repeat the request
+with ``since=<next>`` while ``more`` is true, then keep the last token for
+their next sync.
+
+Deletions come from soft-deleted rows and from ``Tombstone`` rows, which
+database triggers write whenever a patient or doctor is deleted, with
+``SOFT_DELETE`` on or off. A client may hear of a deletion twice. A
+``since`` token is refused with 410 (sync again without it) when it has
+expired, or when it was issued before the cutoff of a later
+``purge_deleted`` run that trimmed tombstones.
+
+Rows and tombstones are walked in ``(change_seq, id)`` order. On
+PostgreSQL ``change_seq`` is the id of the transaction that wrote them, and
+those of transactions that may not have committed yet are held back until
+a later sync, so none are skipped. Other databases walk ``updated_at`` and
+``deleted_at``.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max, Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from doctors.models import Doctor
+from doctors.serializers import doctor_values
+from healthcare.renderers import FastJSONRenderer
+from patients.models import Patient, Purge
+from patients.serializers import patient_values
+
+from .models import Tombstone
+
+# name: (rows the user may sync, renderer)
+SOURCES = {
+    'patients': (lambda user: Patient.all_objects.filter(created_by=user), patient_values),
+    'doctors': (lambda user: Doctor.all_objects.all(), doctor_values),
+}
+
+# Token positions: each source's rows, then its tombstones
+STREAMS = [*SOURCES, *(f'{name}:deleted' for name in SOURCES)]
+
+
+def tombstones(name, user):
+    return Tombstone.objects.filter(model=name, owner=user if name == 'patients' else None)
+
+
+def encode_token(state):
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode().rstrip('=')
+
+
+def decode_token(token, key):
+    """``(issued, {stream: (key value, id) or None})`` from a sync token."""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        issued = datetime.fromisoformat(state['issued'])
+        if issued.tzinfo is None:
+            raise ValueError
+        positions = {}
+        for name in STREAMS:
+            if state[name] is None:
+                positions[name] = None
+                continue
+            value, pk = state[name]
+            if key != 'change_seq':
+                value = datetime.fromisoformat(value)
+            positions[name] = (value, int(pk))
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValidationError({'since': ['Invalid sync token.']})
+    return issued, positions
+
+
+def stale_token_error(issued):
+    """Why a token issued at ``issued`` can no longer report every deletion, if it can't."""
+    if timezone.now() - issued > timedelta(days=settings.SYNC_TOKEN_MAX_DAYS):
+        return 'Sync token expired; sync again without since.'
+    purged_before = Purge.objects.aggregate(cutoff=Max('cutoff'))['cutoff']
+    if purged_before is not None and issued < purged_before:
+        return 'Deletions were purged since this token was issued; sync again without since.'
+    return None
+
+
+def walk(queryset, key, position, horizon):
+    """``queryset`` in ``(key, id)`` order, after ``position`` and below ``horizon``."""
+    queryset = queryset.order_by(key, 'id')
+    if position is not None:
+        value, pk = position
+        queryset = queryset.filter(Q(**{f'{key}__gt': value}) | Q(**{key: value, 'id__gt': pk}))
+    if horizon is not None:
+        queryset = queryset.filter(change_seq__lt=horizon)
+    return queryset
+
+
+def token_position(position):
+    if position is None:
+        return None
+    value, pk = position
+    return [value.isoformat() if isinstance(value, datetime) else value, pk]
+
+
+class SyncView(APIView):
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request):
+        if connection.vendor == 'postgresql':
+            key = deleted_key = 'change_seq'
+        else:
+            key, deleted_key = 'updated_at', 'deleted_at'
+        since = request.query_params.get('since')
+        positions = dict.fromkeys(STREAMS)
+        if since:
+            issued, positions = decode_token(since, key)
+            error = stale_token_error(issued)
+            if error:
+                return Response({'error': error}, status=status.HTTP_410_GONE)
+
+        horizon = None
+        if key == 'change_seq':
+            # Transactions older than the snapshot's xmin have all finished
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint')
+                horizon = cursor.fetchone()[0]
+
+        data, deleted = {}, {}
+        state = {'issued': timezone.now().isoformat()}
+        size = settings.SYNC_PAGE_SIZE
+        more = False
+        for name, (rows_for, values) in SOURCES.items():
+            queryset = rows_for(request.user)
+            if positions[name] is None:
+                # A first sync has nothing to delete on the client.
+                queryset = queryset.filter(deleted_at__isnull=True)
+            queryset = walk(queryset, key, positions[name], horizon)
+            rows = list(values.values(queryset, key, 'deleted_at')[:size + 1])
+            more = more or len(rows) > size
+            rows = rows[:size]
+            data[name] = values.to_representation([row for row in rows if row['deleted_at'] is None])
+            deleted[name] = [row['id'] for row in rows if row['deleted_at'] is not None]
+            state[name] = token_position((rows[-1][key], rows[-1]['id']) if rows else positions[name])
+
+            stream = f'{name}:deleted'
+            queryset = walk(tombstones(name, request.user), deleted_key, positions[stream], horizon)
+            if since:
+                gone = list(queryset.values_list(deleted_key, 'id', 'object_id')[:size + 1])
+                more = more or len(gone) > size
+                gone = gone[:size]
+                deleted[name] = list(dict.fromkeys(deleted[name] + [object_id for _, _, object_id in gone]))
+                position = gone[-1][:2] if gone else positions[stream]
+            else:
+                # Likewise: start after the latest tombstone
+                position = queryset.reverse().values_list(deleted_key, 'id').first()
+            state[stream] = token_position(position)
+
+        data['deleted'] = deleted
+        data['next'] = encode_token(state)
+        data['more'] = more
+        return Response(data, status=status.HTTP_200_OK)